@@ -1,6 +1,17 @@
 import logging
-from multiprocessing import Pool, cpu_count
-from sqlalchemy import text, create_engine, inspect
+from sqlalchemy import text
+from pipeline_processing_status import STATUS_PENDING, STATUS_CLEANED, STATUS_MODELED, status_count, transition
+from pipeline_scheduler import resolve_worker_count, run_stage_graph, stage_pool_sizes
+from pipeline_worker_runtime import init_worker, get_worker_engine
+from pipeline_partitioner import plan_id_ranges
+from pipeline_dimension_cache import FACT_BUILDERS, FACT_COLUMN_TYPES, build_fact_batch, cache_totals, log_cache_stats
+from pipeline_staging_writer import LoadDataStagingWriter
+from pipeline_schema_cache import get_sql_statements, get_table_columns, invalidate_schema_cache, schema_cache_stats, log_schema_cache_stats
+from pipeline_aggregates import AGGREGATE_TABLE, fact_load_lock, retract_facts, apply_facts, prune_empty_groups, aggregate_stats
+from pipeline_partitions import record_partition_changes, touched_dates
+from pipeline_run_manifest import DEFAULT_MANIFEST_DIR, dimension_high_water, new_dimension_members, record_run_manifest
+from pipeline_modeling_watermark import get_modeling_watermark, advance_modeling_watermark, late_arrivals_sql
+from pipeline_duckdb_backend import is_duckdb
 # Assuming these are defined elsewhere and work correctly
 # from pipeline_logger import log_db, setup_logging
 # from pipeline_utils import execute_sql_file, PipelineError 
@@ -28,21 +39,13 @@ def execute_sql_file(conn, file_path, split_statements=True, params=None, log_pr
         The result object from the execution of the *last* statement in the file, which contains the rowcount.
     """
     logging.info(f"{log_prefix} Executing SQL file: {os.path.basename(file_path)} with params: {params}")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        sql_content = f.read()
-    
     format_params = {k: v for k, v in params.items() if isinstance(v, str)} if params else {}
     bind_params = {k: v for k, v in params.items() if k not in format_params} if params else {}
-    if format_params:
-        sql_content = sql_content.format(**format_params)
 
+    # Read, split and compiled once per process and set of table names.
     result = None
-    if split_statements:
-        statements = [s.strip() for s in sql_content.split(';') if s.strip()]
-        for statement in statements:
-            result = conn.execute(text(statement), bind_params)
-    else:
-        result = conn.execute(text(sql_content), bind_params)
+    for statement in get_sql_statements(file_path, split_statements, format_params):
+        result = conn.execute(statement, bind_params)
 
     return result
 
@@ -50,68 +53,190 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 dimension_script_path = os.path.join(SCRIPT_DIR, "sql", "data_modeling", "populate_dimensions.sql")
 fact_script_path = os.path.join(SCRIPT_DIR, "sql", "data_modeling", "populate_facts.sql")
 
+FACT_LOADS = ('direct', 'staging')
+FACT_COLUMNS = [name for name, _ in FACT_COLUMN_TYPES]
+FACT_COLUMNS_SQL = ', '.join(f"`{col}`" for col in FACT_COLUMNS)
+
+def _create_queue_table(conn, queue_table, limit, incremental):
+    """
+    Creates the queue table of the complaints to model in this run.
+
+    In incremental mode the watermark drives discovery: the queue holds the cleaned complaints above the
+    watermark, read with one seek on the (status, complaint_id) index, and the cleaned late arrivals from
+    `modeling_late_arrivals`. Complaints at or below the watermark are never scanned. The queue is created with
+    its primary key in one statement. Otherwise every cleaned complaint is checked against
+    `consumer_complaints_cleaned` and the key is added after.
+
+    Returns:
+        int: The number of late arrivals queued (always 0 outside incremental mode).
+    """
+    if not incremental:
+        conn.execute(text(f"""
+            CREATE TABLE {queue_table} AS
+            SELECT p.complaint_id
+            FROM record_processing_status p
+            JOIN consumer_complaints_cleaned c ON c.complaint_id = p.complaint_id
+            WHERE p.status = :cleaned
+            ORDER BY p.complaint_id
+            LIMIT :limit;
+        """), {"cleaned": STATUS_CLEANED, "limit": limit})
+        conn.execute(text(f"ALTER TABLE {queue_table} ADD PRIMARY KEY (complaint_id);"))
+        return 0
+
+    watermark = get_modeling_watermark(conn)
+    conn.execute(text(f"""
+        CREATE TABLE {queue_table} (complaint_id INT NOT NULL PRIMARY KEY)
+        SELECT complaint_id FROM (
+            ({late_arrivals_sql(STATUS_CLEANED)} LIMIT :limit)
+            UNION ALL
+            (SELECT complaint_id FROM record_processing_status
+             WHERE status = :cleaned AND complaint_id > :watermark
+             ORDER BY complaint_id LIMIT :limit)
+        ) AS pending
+        ORDER BY complaint_id
+        LIMIT :limit;
+    """), {"cleaned": STATUS_CLEANED, "watermark": watermark, "limit": limit})
+    late_arrivals = conn.execute(
+        text(f"SELECT COUNT(*) FROM {queue_table} WHERE complaint_id <= :watermark"), {"watermark": watermark}
+    ).scalar_one()
+    logging.info(f"Queued complaints above watermark {watermark:,} and {late_arrivals:,} late arrivals.")
+    return late_arrivals
+
+def _upsert_facts_sql(select_sql=None):
+    """
+    Returns the INSERT that writes fact rows into `fact_complaints`, replacing existing facts of re-modeled complaints.
+
+    Args:
+        select_sql (str, optional): A SELECT returning the fact columns in order. Without it, the statement
+                                    takes one row of named parameters per fact column.
+    """
+    update_str = ', '.join(f"`{col}` = VALUES(`{col}`)" for col in FACT_COLUMNS if col != 'complaint_id')
+    source_sql = select_sql or "VALUES (" + ', '.join(f":{col}" for col in FACT_COLUMNS) + ")"
+    return f"INSERT INTO fact_complaints ({FACT_COLUMNS_SQL}) {source_sql} ON DUPLICATE KEY UPDATE {update_str}"
+
+# Compiled once per process and reused by every batch.
+BATCH_BOUNDS_SQL = text("SELECT COUNT(*), MAX(complaint_id) FROM temp_modeling_batch")
+UPSERT_FACT_ROWS_SQL = text(_upsert_facts_sql())
+UPSERT_FACT_BATCH_SQL = text(_upsert_facts_sql(f"SELECT {FACT_COLUMNS_SQL} FROM temp_fact_staging"))
+
 def modeling_worker(args):
     """
-    A worker function that models a partition of data and inserts it into a unique staging table.
-    This worker iterates through its assigned ID range, processing records in batches
-    to keep memory usage low and provide robust, scalable performance.
+    A worker function that models a partition of data batch by batch.
+
+    With `--fact-load staging` the fact rows go into a unique staging table that the consolidation stage copies
+    into `fact_complaints`. With `--fact-load direct` each batch is written straight into `fact_complaints` in a
+    short transaction under the fact load lock, so every fact row is written once. The same transaction moves
+    the batch's complaints between the groups of `agg_daily_complaints`.
+
+    With the 'python' fact builder the dimension keys are resolved from the worker's in-process dimension
+    caches and the fact rows are bulk loaded, instead of joined by `populate_facts.sql`.
+
+    Returns:
+        tuple: The staging table (None if nothing was staged or with the direct load), the dimension cache
+               counters of the range (None with the 'sql' fact builder) and the fact rows loaded directly.
     """
-    worker_id, start_id, end_id, db_url, batch_size, queue_table = args
-    worker_engine = create_engine(db_url)
-    
-    fact_staging_table = f"fact_staging_{worker_id}_{str(uuid.uuid4())[:8]}"
+    worker_id, start_id, end_id, db_url, batch_size, queue_table, fact_builder, fact_load = args
+    # The process's pooled engine has local_infile enabled, as the Python fact builder's staging load requires.
+    worker_engine = get_worker_engine(db_url)
+
+    fact_staging_table = f"fact_staging_{worker_id}_{str(uuid.uuid4())[:8]}" if fact_load == 'staging' else None
     total_staged_in_worker = 0
+    total_loaded_in_worker = 0
+    cache_before = cache_totals()
+    schema_cache_before = schema_cache_stats()
 
-    logging.info(f"[Modeling Worker {worker_id}] Starting partition: IDs {start_id:,} to {end_id:,}. Staging table: {fact_staging_table}")
+    logging.info(f"[Modeling Worker {worker_id}] Starting partition: IDs {start_id:,} to {end_id:,}. Fact load: {fact_load}" + (f", staging table: {fact_staging_table}" if fact_staging_table else ""))
 
     try:
-        with worker_engine.begin() as conn:
-            _create_fact_staging_table(conn, fact_staging_table)
+        staging_writer = staging_insert_sql = None
+        if fact_staging_table:
+            with worker_engine.begin() as conn:
+                _create_fact_staging_table(conn, fact_staging_table)
+            staging_writer = LoadDataStagingWriter(fact_staging_table, FACT_COLUMN_TYPES)
+            staging_insert_sql = text(f"INSERT IGNORE INTO `{fact_staging_table}` ({FACT_COLUMNS_SQL}) SELECT {FACT_COLUMNS_SQL} FROM temp_fact_staging;")
 
         last_id = start_id - 1
         batch_num = 0
-        while True:
-            try:
-                with worker_engine.begin() as conn:
+        with worker_engine.connect() as conn:
+            while True:
+                try:
                     batch_num += 1
-                    params = {
-                        'start_id': start_id,
-                        'end_id': end_id,
-                        'last_id': last_id,
-                        'limit': batch_size,
-                        'fact_staging_table': fact_staging_table,
-                        'queue_table': queue_table
-                    }
+                    batch_start = time.time()
+                    prepare_before = schema_cache_stats()["prepare_seconds"]
                     log_prefix = f"[Modeling Worker {worker_id}, Batch {batch_num}]"
-                    
-                    execute_sql_file(conn, fact_script_path, split_statements=True, params=params, log_prefix=log_prefix)
-                    
-                    rows_in_batch = conn.execute(text("SELECT COUNT(*) FROM temp_modeling_batch")).scalar_one()
-
-                    if rows_in_batch == 0:
-                        logging.info(f"[Modeling Worker {worker_id}] ...finished final batch. Ending partition processing.")
-                        break
+                    facts = None
+                    with conn.begin():
+                        if fact_builder == 'python':
+                            facts = build_fact_batch(conn, queue_table, start_id, end_id, last_id, batch_size)
+                            rows_in_batch = len(facts)
+                            batch_last_id = int(facts['complaint_id'].max()) if rows_in_batch else None
+                        else:
+                            params = {
+                                'start_id': start_id,
+                                'end_id': end_id,
+                                'last_id': last_id,
+                                'limit': batch_size,
+                                'queue_table': queue_table
+                            }
+                            execute_sql_file(conn, fact_script_path, split_statements=True, params=params, log_prefix=log_prefix)
+                            rows_in_batch, batch_last_id = conn.execute(BATCH_BOUNDS_SQL).first()
+
+                        if rows_in_batch == 0 or batch_last_id is None:
+                            logging.info(f"[Modeling Worker {worker_id}] ...finished final batch. Ending partition processing.")
+                            break
+
+                        if fact_staging_table:
+                            if facts is not None:
+                                staging_writer.write(conn, facts)
+                            else:
+                                conn.execute(staging_insert_sql)
+
+                    if fact_load == 'direct':
+                        with fact_load_lock(conn, f"[Modeling Worker {worker_id}]"), conn.begin():
+                            # The batch is the queued IDs in (last_id, batch_last_id].
+                            retract_facts(conn, queue_table, last_id, batch_last_id)
+                            if facts is not None:
+                                records = facts.astype(object).where(facts.notna(), None).to_dict('records')
+                                conn.execute(UPSERT_FACT_ROWS_SQL, records)
+                            else:
+                                conn.execute(UPSERT_FACT_BATCH_SQL)
+                            apply_facts(conn, queue_table, last_id, batch_last_id)
+                        total_loaded_in_worker += rows_in_batch
 
                     total_staged_in_worker += rows_in_batch
-                    logging.info(f"[Modeling Worker {worker_id}] ...staged batch of {rows_in_batch:,}. Total for worker: {total_staged_in_worker:,}")
-
-                    last_id = conn.execute(text("SELECT MAX(complaint_id) FROM temp_modeling_batch")).scalar_one_or_none()
-                    if last_id is None: break
-            except Exception as e:
-                logging.error(f"[Modeling Worker {worker_id}] Failed during batch processing for IDs > {last_id}: {e}", exc_info=True)
-                break
+                    prepare_ms = (schema_cache_stats()["prepare_seconds"] - prepare_before) * 1000
+                    logging.info(
+                        f"{log_prefix} ...{'loaded' if fact_load == 'direct' else 'staged'} batch of {rows_in_batch:,} "
+                        f"in {time.time() - batch_start:.2f}s ({prepare_ms:.1f} ms preparing SQL). Total for worker: {total_staged_in_worker:,}"
+                    )
+                    last_id = batch_last_id
+                except Exception as e:
+                    logging.error(f"[Modeling Worker {worker_id}] Failed during batch processing for IDs > {last_id}: {e}", exc_info=True)
+                    raise
     except Exception as e:
         logging.error(f"[Modeling Worker {worker_id}] An unexpected error occurred: {e}", exc_info=True)
-        return None
-    finally:
-        worker_engine.dispose()
-    logging.info(f"[Modeling Worker {worker_id}] Finished partition. Total staged by this worker: {total_staged_in_worker:,}")
-    return fact_staging_table if total_staged_in_worker > 0 else None
+        # Drop the partial staging table; the scheduler retries the whole range. Directly loaded batches are
+        # upserted again on the retry.
+        if fact_staging_table:
+            try:
+                with worker_engine.begin() as conn:
+                    conn.execute(text(f"DROP TABLE IF EXISTS `{fact_staging_table}`;"))
+            except Exception:
+                pass
+        raise
+    logging.info(f"[Modeling Worker {worker_id}] Finished partition. Total modeled by this worker: {total_staged_in_worker:,}")
+    log_schema_cache_stats(f"[Modeling Worker {worker_id}] Schema/SQL cache:", since=schema_cache_before)
+    cache_stats = None
+    if fact_builder == 'python':
+        cache_after = cache_totals()
+        cache_stats = {counter: cache_after[counter] - cache_before[counter] for counter in cache_after}
+        log_cache_stats(cache_after, f"[Modeling Worker {worker_id}] Dimension cache (process total):")
+    staged_table = fact_staging_table if fact_staging_table and total_staged_in_worker > 0 else None
+    return staged_table, cache_stats, total_loaded_in_worker
 
 def _create_fact_staging_table(conn, table_name):
     """Creates a staging table with the same structure as fact_complaints but without foreign keys, which can cause deadlocks."""
-    inspector = inspect(conn)
-    source_cols = [c['name'] for c in inspector.get_columns('fact_complaints') if c['name'] != 'complaint_fact_key']
+    source_cols = [col for col in get_table_columns(conn, 'fact_complaints') if col != 'complaint_fact_key']
     cols_str = ', '.join([f"`{col}`" for col in source_cols])
     
     conn.execute(text(f"CREATE TABLE `{table_name}` AS SELECT {cols_str} FROM fact_complaints LIMIT 0;"))
@@ -119,127 +244,149 @@ def _create_fact_staging_table(conn, table_name):
 def consolidation_worker(args):
     """
     A worker that consolidates data from one staging table into the final fact table and then cleans it up.
+
+    Each batch is written under the fact load lock, together with its delta to `agg_daily_complaints`.
     """
     table_name, db_url, batch_size = args
-    worker_engine = create_engine(db_url)
+    worker_engine = get_worker_engine(db_url)
     total_inserted = 0
     
     logging.info(f"[Consolidation Worker] Consolidating fact table '{table_name}'...")
     
     try:
+        # The staging columns and both statements are prepared once per table, not once per batch.
+        with worker_engine.connect() as conn:
+            staging_cols = [col for col in get_table_columns(conn, table_name) if col != 'complaint_fact_key']
+        cols_str = ', '.join([f"`{col}`" for col in staging_cols])
+        update_str = ', '.join([f"`{col}` = VALUES(`{col}`)" for col in staging_cols if col != 'complaint_id'])
+
+        # Upsert so that re-modeled corrections replace the existing fact row.
+        insert_sql = text(f"""
+            INSERT INTO fact_complaints ({cols_str}) 
+            SELECT {cols_str} FROM `{table_name}`
+            WHERE complaint_id > :last_id AND complaint_id <= :batch_last_id
+            ON DUPLICATE KEY UPDATE {update_str};
+        """)
+        last_id_sql = text(f"SELECT MAX(complaint_id) FROM (SELECT complaint_id FROM `{table_name}` WHERE complaint_id > :last_id ORDER BY complaint_id LIMIT :batch_size) AS t")
+
         last_id = 0
-        while True:
-            with worker_engine.begin() as conn:
-                inspector = inspect(conn)
-                staging_cols = [c['name'] for c in inspector.get_columns(table_name) if c['name'] != 'complaint_fact_key']
-                cols_str = ', '.join([f"`{col}`" for col in staging_cols])
-
-                insert_sql = text(f"""
-                    INSERT IGNORE INTO fact_complaints ({cols_str}) 
-                    SELECT {cols_str} FROM `{table_name}`
-                    WHERE complaint_id > :last_id
-                    ORDER BY complaint_id
-                    LIMIT :batch_size;
-                """)
-                result = conn.execute(insert_sql, {"last_id": last_id, "batch_size": batch_size})
+        with worker_engine.connect() as conn:
+            while True:
+                batch_last_id = conn.execute(last_id_sql, {"last_id": last_id, "batch_size": batch_size}).scalar_one()
+                conn.commit()
+                if batch_last_id is None:
+                    break
+
+                with fact_load_lock(conn, "[Consolidation Worker]"), conn.begin():
+                    retract_facts(conn, table_name, last_id, batch_last_id)
+                    result = conn.execute(insert_sql, {"last_id": last_id, "batch_last_id": batch_last_id})
+                    apply_facts(conn, table_name, last_id, batch_last_id)
                 inserted_in_batch = result.rowcount
                 total_inserted += inserted_in_batch
                 logging.info(f"[Consolidation Worker] ...inserted batch of {inserted_in_batch:,} rows from '{table_name}'.")
-
-                if inserted_in_batch == 0:
-                    break
-
-                last_id = conn.execute(
-                    text(f"SELECT MAX(complaint_id) FROM (SELECT complaint_id FROM `{table_name}` WHERE complaint_id > :last_id ORDER BY complaint_id LIMIT :batch_size) AS t"),
-                    {"last_id": last_id, "batch_size": batch_size}
-                ).scalar_one()
-
-                if last_id is None:
-                    break
+                last_id = batch_last_id
         
         with worker_engine.begin() as conn:
             conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}`;"))
+        invalidate_schema_cache(table_name)
         logging.info(f"[Consolidation Worker] Finished consolidating '{table_name}'. Inserted {total_inserted:,} total rows.")
     except Exception as e:
         logging.error(f"[Consolidation Worker] Failed to consolidate {table_name}: {e}", exc_info=True)
-        return 0 # Return 0 on failure
-    finally:
-        worker_engine.dispose()
+        raise # The scheduler retries the range
     return total_inserted
 
 def timestamp_worker(args):
     """
-    A worker that updates the modeling_timestamp for a given partition of complaint IDs.
+    A worker that marks the queued complaints of a consolidated range as modeled in `record_processing_status`.
     """
-    worker_id, start_id, end_id, db_url, batch_size, _ = args # queue_table is no longer needed
-    worker_engine = create_engine(db_url)
+    worker_id, start_id, end_id, db_url, batch_size, queue_table, *_ = args
+    worker_engine = get_worker_engine(db_url)
     total_updated = 0
     
-    logging.info(f"[Timestamp Worker {worker_id}] Updating timestamps for IDs {start_id:,} to {end_id:,}")
+    logging.info(f"[Timestamp Worker {worker_id}] Marking IDs {start_id:,} to {end_id:,} as modeled")
     
     try:
-        last_id = start_id - 1 # Start just before the partition begins
-        while True:
-            with worker_engine.begin() as conn:
-                update_sql = text(f"""
-                    UPDATE consumer_complaints_raw
-                    SET modeling_timestamp = NOW()
-                    WHERE modeling_timestamp IS NULL
-                      AND complaint_id > :last_id
-                      AND complaint_id <= :end_id
-                    ORDER BY complaint_id
-                    LIMIT :batch_size;
-                """)
-                result = conn.execute(update_sql, {
-                    "last_id": last_id, 
-                    "end_id": end_id, 
-                    "batch_size": batch_size
-                })
-                updated_in_batch = result.rowcount
-                total_updated += updated_in_batch
-                logging.info(f"[Timestamp Worker {worker_id}] ...updated a batch of {updated_in_batch:,} records.")
-
-                if updated_in_batch == 0 or updated_in_batch < batch_size:
-                    break
-                
-                # Find the new last_id for the next iteration by getting the max ID from the updated batch
-                find_last_id_sql = text(f"""
-                    SELECT MAX(complaint_id) FROM (
-                        SELECT complaint_id FROM consumer_complaints_raw
-                        WHERE complaint_id > :last_id AND complaint_id <= :end_id
-                        ORDER BY complaint_id
-                        LIMIT {updated_in_batch}
-                    ) AS t
-                """)
-                last_id = conn.execute(find_last_id_sql, {"last_id": last_id, "end_id": end_id}).scalar_one()
-                if last_id is None:
-                    break
-        logging.info(f"[Timestamp Worker {worker_id}] Marked {total_updated:,} raw records as modeled.")
+        # A range covers at most one batch of the queue, so one UPDATE of the narrow status table marks it.
+        with worker_engine.begin() as conn:
+            total_updated = transition(
+                conn, STATUS_CLEANED, STATUS_MODELED, "q.complaint_id BETWEEN :start_id AND :end_id",
+                {"start_id": start_id, "end_id": end_id},
+                join_sql=f"JOIN {queue_table} q ON q.complaint_id = p.complaint_id"
+            )
+        logging.info(f"[Timestamp Worker {worker_id}] Marked {total_updated:,} records as modeled.")
     except Exception as e:
-        logging.error(f"[Timestamp Worker {worker_id}] Failed to update timestamps: {e}", exc_info=True)
-        return 0 # Return 0 on failure
-    finally:
-        worker_engine.dispose()
+        logging.error(f"[Timestamp Worker {worker_id}] Failed to update processing status: {e}", exc_info=True)
+        raise # The scheduler retries the range
         
     return total_updated
 
-def run(engine, limit=None, batch_size=50000):
+def _innodb_bytes_written(engine):
+    """
+    Returns the server-wide InnoDB data file and redo log bytes written so far.
+
+    The counters are global, so the delta over a step also includes concurrent activity on the server.
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SHOW GLOBAL STATUS WHERE Variable_name IN ('Innodb_data_written', 'Innodb_os_log_written')"
+        )).fetchall()
+    return {name: int(value) for name, value in rows}
+
+def run(engine, limit=None, batch_size=50000, workers=None, incremental=False, fact_builder='sql', fact_load='direct',
+        manifest_dir=DEFAULT_MANIFEST_DIR):
     """
     Runs the data modeling process by transforming cleaned data into a star schema.
 
     This function executes a high-performance, parallel workflow:
-    It pre-populates dimension tables to prevent deadlocks, then uses a multiprocessing
-    Pool to populate the fact table in parallel.
+    It pre-populates dimension tables to prevent deadlocks, then splits the queue into small
+    complaint_id range tasks and streams them through a model -> timestamp stage graph (with a consolidate
+    stage in between for the 'staging' fact load).
+
+    With the DuckDB backend, the dimensions, facts and aggregates of the whole queue are built with a few
+    vectorized statements in one transaction; only `limit` applies.
 
     Args:
-        engine: The SQLAlchemy engine for database connectivity.
+        engine: The SQLAlchemy engine for database connectivity, or a `DuckDBBackend`.
         limit (int, optional): The maximum number of records to model in this run. Defaults to all new records.
         batch_size (int, optional): The number of records to process in each modeling batch.
-                                    This size is passed to the underlying SQL script. Defaults to 50000.
+                                    This size is passed to the underlying SQL script and is also the size
+                                    of each range task. Defaults to 50000.
+        workers (int, optional): Worker processes. Defaults to the host's cores, capped by the free database
+                                 connections.
+        incremental (bool, optional): Discover the queue from the persisted modeling watermark (new complaints
+                                      above it plus late arrivals at or below it) with index seeks only.
+        fact_builder (str, optional): How workers resolve dimension keys: 'sql' (the joins of
+                                      `populate_facts.sql`, default) or 'python' (in-process dimension key
+                                      caches and a bulk load of the fact rows).
+        fact_load (str, optional): Where workers write fact rows: 'direct' (straight into `fact_complaints`,
+                                   one batch at a time under a named lock, default) or 'staging' (per-worker
+                                   staging tables copied into `fact_complaints` by a consolidation stage).
+        manifest_dir (str, optional): The directory of the run manifest JSON files (see `pipeline_run_manifest`).
 
     Raises:
         PipelineError: If any part of the modeling process fails.
     """
+    if fact_builder not in FACT_BUILDERS:
+        raise ValueError(f"Unknown fact builder '{fact_builder}'. Expected one of {FACT_BUILDERS}.")
+    if fact_load not in FACT_LOADS:
+        raise ValueError(f"Unknown fact load '{fact_load}'. Expected one of {FACT_LOADS}.")
+    if is_duckdb(engine):
+        try:
+            start_modeling = time.time()
+            dimension_keys_before = dimension_high_water(engine)
+            stats = engine.model_cleaned(limit=limit)
+            date_counts, dirty_dates = stats.pop("date_counts"), stats.pop("dirty_dates")
+            if stats["total_records_modeled"]:
+                stats["manifest_run_id"] = record_run_manifest(
+                    engine, "model", {"modeled": stats["total_records_modeled"]}, date_counts, dirty_dates,
+                    new_dimension_members(engine, dimension_keys_before), manifest_dir
+                )["run_id"]
+            log_db(engine, "Data Modeling", "SUCCESS", f"Successfully modeled {stats['total_records_modeled']} records.",
+                   duration=time.time() - start_modeling, details=stats)
+            return
+        except Exception as e:
+            logging.error(f"Data modeling pipeline failed: {e}", exc_info=True)
+            raise PipelineError(f"Data modeling failed: {e}")
     all_new_records_table = f"temp_all_new_records_{str(uuid.uuid4())[:8]}"
     worker_staging_tables = []
     try:
@@ -247,111 +394,146 @@ def run(engine, limit=None, batch_size=50000):
         logging.info("Starting parallel data modeling process...")
         start_parallel_modeling = time.time()
 
-        num_workers = min(cpu_count(), 4)
+        consolidate = fact_load == 'staging'
+        num_workers = resolve_worker_count(
+            engine, workers, stage_sizes=lambda count: stage_pool_sizes(count, consolidate=consolidate)
+        )
 
         with engine.connect() as conn:
-            count_sql = text("""
-                SELECT COUNT(c.complaint_id) 
-                FROM consumer_complaints_cleaned c
-                JOIN consumer_complaints_raw r ON c.complaint_id = r.complaint_id
-                WHERE r.modeling_timestamp IS NULL
-            """)
-            total_records = conn.execute(count_sql).scalar_one_or_none() or 0
+            total_records = status_count(conn, STATUS_CLEANED)
 
         if not total_records or total_records == 0:
             logging.info("No new records to model. Skipping.")
+            with engine.begin() as conn:
+                advance_modeling_watermark(conn)
             return
 
         target_model_count = min(total_records, limit) if limit is not None and limit > 0 else total_records
         logging.info(f"Found {total_records:,} records to model. Target for this run: {target_model_count:,}.")
 
         logging.info(f"Creating and populating temporary ID queue '{all_new_records_table}'...")
+        queue_start = time.time()
         with engine.begin() as conn:
-            create_temp_sql = text(f"""
-                CREATE TABLE {all_new_records_table} AS
-                SELECT c.complaint_id 
-                FROM consumer_complaints_cleaned c
-                JOIN consumer_complaints_raw r ON c.complaint_id = r.complaint_id
-                WHERE r.modeling_timestamp IS NULL 
-                ORDER BY c.complaint_id
-                LIMIT :limit;
-            """)
-            conn.execute(create_temp_sql, {"limit": target_model_count})
-
-            conn.execute(text(f"ALTER TABLE {all_new_records_table} ADD PRIMARY KEY (complaint_id);"))
+            late_arrivals = _create_queue_table(conn, all_new_records_table, target_model_count, incremental)
+        queue_duration = time.time() - queue_start
 
+        dimension_keys_before = dimension_high_water(engine)
         logging.info("Pre-populating all dimension tables with new values...")
         with engine.begin() as conn:
             params = {'queue_table': all_new_records_table}
             execute_sql_file(conn, dimension_script_path, split_statements=True, params=params)
         logging.info("Dimension tables pre-populated successfully.")
 
-        logging.info(f"Calculating {num_workers} partitions for parallel modeling...")
-        partitions = []
         with engine.connect() as conn:
-            partition_query = text(f"""
-                SELECT
-                    partition_num,
-                    MIN(complaint_id) AS start_id,
-                    MAX(complaint_id) AS end_id
-                FROM (
-                    SELECT complaint_id, NTILE(:num_workers) OVER (ORDER BY complaint_id) as partition_num
-                    FROM {all_new_records_table}
-                ) AS partitioned_data
-                GROUP BY partition_num
-                ORDER BY partition_num;
-            """)
-            results = conn.execute(partition_query, {"num_workers": num_workers}).fetchall()
-            
-            for i, (part_num, part_start_id, part_end_id) in enumerate(results):
-                if part_start_id is not None and part_end_id is not None:
-                    partitions.append((i, part_start_id, part_end_id, engine.url, batch_size, all_new_records_table))
-
-        logging.info(f"Starting {len(partitions)} parallel modeling worker processes...")
-        with Pool(processes=num_workers, initializer=setup_logging) as pool:
-            worker_staging_tables = pool.map(modeling_worker, partitions)
-        
-        worker_staging_tables = [tbl for tbl in worker_staging_tables if tbl]
+            range_tasks = plan_id_ranges(conn, all_new_records_table, batch_size)
+        partitions = [
+            (i, part_start_id, part_end_id, engine.url, batch_size, all_new_records_table, fact_builder, fact_load)
+            for i, (part_start_id, part_end_id) in enumerate(range_tasks)
+        ]
+
+        def consolidation_args(index, results):
+            staging_table, _, _ = results[0]
+            if not staging_table:
+                return None
+            worker_staging_tables.append(staging_table)
+            return (staging_table, engine.url, batch_size)
+
+        def timestamp_args(index, results):
+            # Only ranges whose facts were consolidated are marked as modeled.
+            if fact_load == 'staging' and results[1] is None:
+                return None
+            return partitions[index]
+
+        # Each range's facts are consolidated as soon as they are staged and its raw rows are marked as soon
+        # as they are consolidated, so the steps overlap instead of waiting for each other. Direct loads need
+        # no consolidation: each fact row is written once, by the worker that built it.
+        pool_sizes = stage_pool_sizes(num_workers, consolidate=consolidate)
+        stages = [("Model", modeling_worker, pool_sizes[0], None)]
+        if consolidate:
+            stages.append(("Consolidate", consolidation_worker, pool_sizes[1], consolidation_args))
+        stages.append(("Timestamp", timestamp_worker, pool_sizes[-1], timestamp_args))
+        # The partitions the queued complaints leave, then (even if a range fails) the ones they land in.
+        with engine.begin() as conn:
+            record_partition_changes(conn, all_new_records_table)
+            left_dates = touched_dates(conn, all_new_records_table)
+        bytes_before = _innodb_bytes_written(engine)
+        fact_load_start = time.time()
+        try:
+            stage_results = run_stage_graph(
+                stages, partitions, "Data Modeling", initializer=init_worker, initargs=(engine.url, setup_logging)
+            )
+        except Exception as e:
+            logging.error(f"Streaming modeling failed: {e}", exc_info=True)
+            with engine.begin() as conn_cleanup:
+                for table_name in worker_staging_tables:
+                    conn_cleanup.execute(text(f"DROP TABLE IF EXISTS `{table_name}`;"))
+            raise
+        finally:
+            with engine.begin() as conn:
+                record_partition_changes(conn, all_new_records_table)
+                landed_dates = touched_dates(conn, all_new_records_table)
+
+        fact_load_duration = time.time() - fact_load_start
+        bytes_after = _innodb_bytes_written(engine)
+        bytes_written = {name: bytes_after[name] - bytes_before.get(name, 0) for name in bytes_after}
+
+        if fact_load == 'staging':
+            total_modeled_count = sum(results[1] or 0 for results in stage_results)
+            logging.info(f"Fact consolidation complete. Total new fact records inserted: {total_modeled_count:,}")
+        else:
+            total_modeled_count = sum(results[0][2] for results in stage_results if results[0])
+            logging.info(f"Direct fact load complete. Total fact records loaded: {total_modeled_count:,}")
+        total_marked = sum(results[-1] or 0 for results in stage_results)
+        logging.info(f"Timestamping complete. Total records marked: {total_marked:,}")
+        logging.info(
+            f"Fact load '{fact_load}' took {fact_load_duration:.2f}s and wrote "
+            f"{bytes_written.get('Innodb_data_written', 0) / 1024 ** 2:,.1f} MB of InnoDB data and "
+            f"{bytes_written.get('Innodb_os_log_written', 0) / 1024 ** 2:,.1f} MB of redo log (server-wide)."
+        )
+
+        cache_stats = None
+        if fact_builder == 'python':
+            range_stats = [results[0][1] for results in stage_results if results[0] and results[0][1]]
+            cache_stats = {counter: sum(stats[counter] for stats in range_stats)
+                           for counter in ("hits", "misses", "inserted", "unresolved")}
+            log_cache_stats(cache_stats, "[Dimension Cache] All workers:")
 
-        total_inserted = 0
-        if worker_staging_tables:
-            logging.info(f"Consolidating data from {len(worker_staging_tables)} worker fact staging tables IN PARALLEL...")
-            try:
-                consolidation_args = [(table, engine.url, batch_size) for table in worker_staging_tables]
-                with Pool(processes=num_workers, initializer=setup_logging) as pool:
-                    inserted_counts = pool.map(consolidation_worker, consolidation_args)
-                
-                total_inserted = sum(inserted_counts)
-
-            except Exception as e:
-                logging.error(f"Parallel fact consolidation failed: {e}", exc_info=True)
-                with engine.begin() as conn_cleanup:
-                    for table_name in worker_staging_tables:
-                        conn_cleanup.execute(text(f"DROP TABLE IF EXISTS `{table_name}`;"))
-                raise
-            
-            logging.info(f"Fact consolidation complete. Total new fact records inserted: {total_inserted:,}")
-
-        total_modeled_count = total_inserted if worker_staging_tables else 0
         total_duration = time.time() - start_parallel_modeling
         overall_rate = total_modeled_count / total_duration if total_duration > 0 else 0
         logging.info(f"Parallel modeling process complete: {total_modeled_count:,} records modeled in {total_duration:.2f}s ({overall_rate:,.0f} records/s).")
-        if total_modeled_count > 0:
-            logging.info("Starting PARALLEL UPDATE for modeling_timestamp on raw records...")
-            timestamp_args = [(p[0], p[1], p[2], engine.url, batch_size, all_new_records_table) for p in partitions]
-            
-            with Pool(processes=num_workers, initializer=setup_logging) as pool:
-                updated_counts = pool.map(timestamp_worker, timestamp_args)
-            
-            total_marked = sum(updated_counts)
-            logging.info(f"Timestamping complete. Total records marked: {total_marked:,}")
-            
+
+        with engine.begin() as conn:
+            watermark = advance_modeling_watermark(conn)
+            pruned_groups = prune_empty_groups(conn)
+            aggregates = aggregate_stats(conn)
+        logging.info(
+            f"[Aggregates] {AGGREGATE_TABLE}: {aggregates['groups']:,} daily groups counting "
+            f"{aggregates['complaints']:,} complaints ({pruned_groups:,} emptied groups removed)."
+        )
+        manifest = record_run_manifest(
+            engine, "model", {"modeled": total_modeled_count, "marked": total_marked}, landed_dates, left_dates,
+            new_dimension_members(engine, dimension_keys_before), manifest_dir
+        )
+
         details = {
             "total_records_modeled": total_modeled_count,
             "target_record_count": target_model_count,
             "num_workers": num_workers,
-            "partitions_created": len(partitions),
-            "batch_size_per_worker": batch_size
+            "range_tasks": len(partitions),
+            "batch_size_per_worker": batch_size,
+            "incremental": incremental,
+            "queue_setup_seconds": round(queue_duration, 3),
+            "late_arrivals": late_arrivals,
+            "modeling_watermark": watermark,
+            "fact_builder": fact_builder,
+            "dimension_cache": cache_stats,
+            "fact_load": fact_load,
+            "fact_load_seconds": round(fact_load_duration, 3),
+            "innodb_data_bytes_written": bytes_written.get('Innodb_data_written'),
+            "innodb_redo_bytes_written": bytes_written.get('Innodb_os_log_written'),
+            "aggregate_groups": aggregates["groups"],
+            "aggregate_complaints": aggregates["complaints"],
+            "manifest_run_id": manifest["run_id"]
         }
         log_db(engine, "Data Modeling", "SUCCESS", f"Successfully modeled {total_modeled_count} records.", duration=total_duration, details=details)
     except BaseException as e:
@@ -0,0 +1,235 @@
+"""
+Exports the star schema as Parquet files for analytical tools.
+
+Runs after the modeling step (`--step export`, included in `--step all`) and writes under the export directory:
+- `fact_complaints/year=YYYY/month=M/part-0.parquet`: the fact table, partitioned by the year and month of
+  `date_received_key` (Hive-style directories, readable as one dataset by DuckDB, Spark, pyarrow or Power BI).
+  Facts without a received date go to `year=__HIVE_DEFAULT_PARTITION__/month=__HIVE_DEFAULT_PARTITION__`.
+- `<table>/part-0.parquet`: every dimension table and `agg_daily_complaints`, rewritten on every export.
+- `manifest.json`: every file with its row count and size, the partitions rewritten and removed by the last
+  export, and `changes_through`, the latest `fact_partition_changes.changed_at` it has exported.
+
+Only the fact partitions that modeling marked as changed after the previous manifest's `changes_through` are
+rewritten (see `pipeline_partitions`); a partition that no longer has any rows is removed. The first export,
+or one run with `--export-full`, rewrites every partition. Each file is written next to its target and
+renamed over it, and the manifest is written last, so a failed export leaves the previous files readable and
+is simply repeated by the next one.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text
+from pipeline_aggregates import AGGREGATE_TABLE
+from pipeline_dimension_cache import DIMENSIONS
+from pipeline_duckdb_backend import is_duckdb
+from pipeline_logger import log_db
+from pipeline_partitions import PARTITION_CHANGES_TABLE, UNKNOWN_PARTITION
+from pipeline_utils import PipelineError
+
+DEFAULT_EXPORT_DIR = os.path.join("data", "export")
+MANIFEST_FILE = "manifest.json"
+FACT_TABLE = 'fact_complaints'
+PART_FILE = "part-0.parquet"
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+# Rewritten in full on every export: they are small next to the fact table.
+TABLE_EXPORTS = list(dict.fromkeys(table for _, _, table, *_ in DIMENSIONS)) + [AGGREGATE_TABLE]
+
+
+def _partition_dir(partition):
+    """Returns the relative directory of a (year, month) fact partition."""
+    if tuple(partition) == UNKNOWN_PARTITION:
+        return f"{FACT_TABLE}/year={HIVE_DEFAULT_PARTITION}/month={HIVE_DEFAULT_PARTITION}"
+    year, month = partition
+    return f"{FACT_TABLE}/year={int(year)}/month={int(month)}"
+
+
+def _partition_where_sql(partition):
+    """Returns the join and filter selecting the fact rows of one partition."""
+    if tuple(partition) == UNKNOWN_PARTITION:
+        return "WHERE f.date_received_key IS NULL"
+    year, month = partition
+    return f"JOIN dim_date d ON d.date_key = f.date_received_key WHERE d.year = {int(year)} AND d.month = {int(month)}"
+
+
+def _fetch_rows(engine, sql):
+    """Runs a query on either backend and returns its rows as tuples."""
+    if is_duckdb(engine):
+        return engine.conn.execute(sql).fetchall()
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(text(sql)).fetchall()]
+
+
+def _fetch_arrow(engine, sql):
+    """Runs a query on either backend and returns its result as a `pyarrow.Table`."""
+    import pyarrow as pa
+    if is_duckdb(engine):
+        return engine.conn.execute(sql).fetch_arrow_table()
+    with engine.connect() as conn:
+        frame = pd.read_sql_query(text(sql), conn, dtype_backend='pyarrow')
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def _write_parquet(table, export_dir, relative_dir):
+    """Writes `table` as the single file of `relative_dir` and returns its manifest entry."""
+    import pyarrow.parquet as pq
+    directory = os.path.join(export_dir, relative_dir)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, PART_FILE)
+    pq.write_table(table, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return {
+        "path": f"{relative_dir}/{PART_FILE}",
+        "rows": table.num_rows,
+        "bytes": os.path.getsize(path),
+        "exported_at": datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def _remove_partition(export_dir, relative_dir):
+    """Deletes the directory of an emptied partition, and its year directory once that is empty too."""
+    directory = os.path.join(export_dir, relative_dir)
+    shutil.rmtree(directory, ignore_errors=True)
+    year_directory = os.path.dirname(directory)
+    if os.path.isdir(year_directory) and not os.listdir(year_directory):
+        os.rmdir(year_directory)
+
+
+def read_manifest(export_dir=DEFAULT_EXPORT_DIR):
+    """Returns the manifest of the last export to `export_dir`, or None if there is none."""
+    path = os.path.join(export_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _write_manifest(export_dir, manifest):
+    path = os.path.join(export_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, default=str)
+    os.replace(path + ".tmp", path)
+
+
+def _partitions_to_export(engine, manifest, full):
+    """
+    Returns the partitions to rewrite and the `changes_through` watermark to record.
+
+    Args:
+        engine: The SQLAlchemy engine or the `DuckDBBackend`.
+        manifest (dict): The previous manifest, or None.
+        full (bool): Rewrite every partition instead of the changed ones.
+
+    Returns:
+        tuple: (sorted list of (year, month) partitions, `changes_through` datetime or None)
+    """
+    changes_through = _fetch_rows(engine, f"SELECT MAX(changed_at) FROM {PARTITION_CHANGES_TABLE}")[0][0]
+    since = (manifest or {}).get("changes_through")
+    if full or manifest is None:
+        partitions = {tuple(row) for row in _fetch_rows(engine, f"""
+            SELECT DISTINCT COALESCE(d.year, {UNKNOWN_PARTITION[0]}), COALESCE(d.month, {UNKNOWN_PARTITION[1]})
+            FROM {FACT_TABLE} f
+            LEFT JOIN dim_date d ON d.date_key = f.date_received_key
+        """)}
+        # Partitions exported before but without rows now are removed.
+        partitions |= {tuple(entry["partition"]) for entry in ((manifest or {}).get("tables", {})
+                                                                .get(FACT_TABLE, {}).get("partitions", {}).values())}
+    elif changes_through is None:
+        partitions = set()
+    else:
+        since_sql = f"AND changed_at > TIMESTAMP '{datetime.fromisoformat(since).isoformat(sep=' ')}'" if since else ""
+        partitions = {tuple(row) for row in _fetch_rows(engine, f"""
+            SELECT partition_year, partition_month FROM {PARTITION_CHANGES_TABLE}
+            WHERE changed_at <= TIMESTAMP '{changes_through.isoformat(sep=' ')}' {since_sql}
+        """)}
+    return sorted(partitions), changes_through
+
+
+def run(engine, export_dir=DEFAULT_EXPORT_DIR, full=False):
+    """
+    Exports the fact partitions changed since the last export, the dimensions and the aggregates as Parquet.
+
+    Args:
+        engine: The SQLAlchemy engine for database connectivity, or a `DuckDBBackend`.
+        export_dir (str, optional): The directory of the Parquet dataset and its manifest.
+        full (bool, optional): Rewrite every fact partition, not only the changed ones.
+
+    Raises:
+        PipelineError: If `pyarrow` is missing or any part of the export fails.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise PipelineError("The export step needs the 'pyarrow' package (pip install pyarrow).") from e
+    try:
+        start_export = time.time()
+        os.makedirs(export_dir, exist_ok=True)
+        manifest = read_manifest(export_dir)
+        partitions, changes_through = _partitions_to_export(engine, manifest, full)
+        full_export = full or manifest is None
+        logging.info(
+            f"[Export] {'Full' if full_export else 'Incremental'} export to '{export_dir}': "
+            f"{len(partitions):,} fact partitions to rewrite."
+        )
+
+        tables = (manifest or {}).get("tables", {})
+        fact_partitions = tables.get(FACT_TABLE, {}).get("partitions", {})
+        rewritten, removed = [], []
+        fact_start = time.time()
+        for partition in partitions:
+            relative_dir = _partition_dir(partition)
+            partition_table = _fetch_arrow(
+                engine, f"SELECT f.* FROM {FACT_TABLE} f {_partition_where_sql(partition)} ORDER BY f.complaint_id"
+            )
+            if partition_table.num_rows:
+                fact_partitions[relative_dir] = {"partition": list(partition), **_write_parquet(partition_table, export_dir, relative_dir)}
+                rewritten.append(relative_dir)
+            else:
+                _remove_partition(export_dir, relative_dir)
+                if fact_partitions.pop(relative_dir, None) is not None:
+                    removed.append(relative_dir)
+        fact_seconds = time.time() - fact_start
+        logging.info(
+            f"[Export] Rewrote {len(rewritten):,} and removed {len(removed):,} fact partitions in {fact_seconds:.2f}s."
+        )
+
+        table_start = time.time()
+        for table_name in TABLE_EXPORTS:
+            tables[table_name] = _write_parquet(_fetch_arrow(engine, f"SELECT * FROM {table_name}"), export_dir, table_name)
+        table_seconds = time.time() - table_start
+        logging.info(f"[Export] Rewrote {len(TABLE_EXPORTS)} dimension and aggregate tables in {table_seconds:.2f}s.")
+
+        tables[FACT_TABLE] = {
+            "partition_by": ["year", "month"],
+            "rows": sum(entry["rows"] for entry in fact_partitions.values()),
+            "partitions": dict(sorted(fact_partitions.items())),
+        }
+        _write_manifest(export_dir, {
+            "generated_at": datetime.now().isoformat(timespec='seconds'),
+            "backend": "duckdb" if is_duckdb(engine) else "mysql",
+            "full_export": full_export,
+            "changes_through": changes_through.isoformat() if changes_through else (manifest or {}).get("changes_through"),
+            "rewritten_partitions": rewritten,
+            "removed_partitions": removed,
+            "tables": tables,
+        })
+
+        total_duration = time.time() - start_export
+        details = {
+            "export_dir": export_dir,
+            "full_export": full_export,
+            "partitions_rewritten": len(rewritten),
+            "partitions_removed": len(removed),
+            "fact_rows_rewritten": sum(fact_partitions[relative_dir]["rows"] for relative_dir in rewritten),
+            "fact_partitions": len(fact_partitions),
+            "fact_seconds": round(fact_seconds, 3),
+            "table_seconds": round(table_seconds, 3),
+        }
+        log_db(engine, "Export", "SUCCESS", f"Exported {len(rewritten)} fact partitions to '{export_dir}'.",
+               duration=total_duration, details=details)
+    except Exception as e:
+        logging.error(f"Export failed: {e}", exc_info=True)
+        raise PipelineError(f"Export failed: {e}")
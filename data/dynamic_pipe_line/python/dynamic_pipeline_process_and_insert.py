@@ -4,268 +4,441 @@ Orchestrates the parallel cleaning and transformation of raw complaint data.
 This module identifies new records in `consumer_complaints_raw`, processes them in parallel using Pandas, and inserts the cleaned results into `consumer_complaints_cleaned`. It is designed for high performance by using a multiprocessing pool and a staging-table-per-worker pattern to avoid database deadlocks.
 
 The workflow is as follows:
-1.  Identifies new raw records (where `cleaned_timestamp` is NULL).
-2.  Partitions the workload by `complaint_id` range for parallel processing.
-3.  Spawns worker processes, each handling a partition of data.
-4.  Each worker reads its partition, cleans it, and writes the results to a unique, temporary staging table.
-5.  The main process waits for all workers and then consolidates data from all staging tables into the final `consumer_complaints_cleaned` table in a single transaction.
-6.  After consolidation, `cleaned_timestamp` is updated in `consumer_complaints_raw` for all processed records.
+1.  Identifies new raw records (pending in `record_processing_status`).
+2.  Splits the workload into many small `complaint_id` range tasks.
+3.  Streams the tasks through a clean -> consolidate -> timestamp stage graph (see `pipeline_scheduler`),
+    retrying failed ranges.
+4.  Each task reads its range, cleans it, and writes the results to a unique, temporary staging table.
+5.  As soon as a range is staged, its staging table is consolidated into the final `consumer_complaints_cleaned` table.
+6.  As soon as a range is consolidated, its records are marked as cleaned in `record_processing_status`.
 """
 import time
 import logging
+import uuid
+from contextlib import nullcontext
 import pandas as pd
-import hashlib
-from multiprocessing import Pool, cpu_count
-from sqlalchemy import text, create_engine, inspect
+import numpy as np
+from multiprocessing import cpu_count
+from sqlalchemy import text
 from pipeline_logger import log_db, setup_logging # Assume these are available
-from pipeline_utils import PipelineError, manage_indexes # Assume this is available
+from pipeline_utils import PipelineError, INDEX_REBUILD_THRESHOLD, manage_indexes, iter_dataframe_batches # Assume this is available
 import data_standardization_mappings as mappings # Assume this is available
-
-def create_partitions(engine, total_records, num_workers):
+from pipeline_staging_writer import get_staging_writer, create_staging_table
+from pipeline_hashing import content_hashes, DEFAULT_HASH_THREADS
+from pipeline_standardization import get_lookup, log_lookup_stats
+from pipeline_run_manifest import DEFAULT_MANIFEST_DIR, record_run_manifest
+from pipeline_processing_status import (
+    STATUS_PENDING, STATUS_CLEANED, STATUS_MODELED, STATUS_QUARANTINED, status_count, status_filter, transition
+)
+from pipeline_scheduler import resolve_worker_count, run_stage_graph, stage_pool_sizes
+from pipeline_worker_runtime import init_worker, get_worker_engine
+from pipeline_partitioner import plan_id_ranges
+from pipeline_schema_cache import get_table_columns, invalidate_schema_cache, schema_cache_stats, log_schema_cache_stats
+from pipeline_duckdb_backend import is_duckdb
+from pipeline_aggregates import fact_load_lock, retract_facts, prune_empty_groups
+from pipeline_partitions import record_partition_changes, touched_dates
+
+# Raw columns read by the cleaning workers, in the order `clean_dataframe` expects them.
+RAW_SOURCE_COLUMNS = [
+    'date_received', 'product', 'sub_product', 'issue', 'sub_issue', 'consumer_complaint_narrative',
+    'company_public_response', 'company', 'state_code', 'zip_code', 'tags', 'consumer_consent_provided',
+    'submitted_via', 'date_sent_to_company', 'company_response_to_consumer', 'timely_response',
+    'consumer_disputed', 'complaint_id'
+]
+
+def create_range_tasks(engine, total_records, task_size):
     """
-    Divides the workload into partitions based on complaint_id ranges using NTILE.
+    Splits the next `total_records` pending raw records into consecutive complaint_id range tasks.
+
+    The boundaries are read with keyset seeks on the (status, complaint_id) index of
+    `record_processing_status`, and the tasks cover exactly the first `total_records` pending records.
 
     Args:
         engine: The SQLAlchemy engine for database connectivity.
-        total_records (int): The total number of records to partition.
-        num_workers (int): The number of partitions to create.
+        total_records (int): The number of pending records to cover.
+        task_size (int): The number of records per task.
 
     Returns:
-        list: A list of tuples, where each tuple contains the start and end ID for a partition.
+        list: A list of tuples, where each tuple contains the start and end ID for a task.
     """
+    if total_records == 0:
+        return []
     with engine.connect() as conn:
-        if total_records == 0:
-            return []
-
-        logging.info(f"Calculating {num_workers} partitions for parallel processing using NTILE...")
-        partitions = []
-        partition_query = text("""
-            SELECT
-                partition_num,
-                MIN(complaint_id) AS start_id,
-                MAX(complaint_id) AS end_id
-            FROM (
-                SELECT complaint_id, NTILE(:num_workers) OVER (ORDER BY complaint_id) as partition_num
-                FROM consumer_complaints_raw
-                WHERE cleaned_timestamp IS NULL AND complaint_id <= (SELECT MAX(complaint_id) FROM consumer_complaints_raw WHERE cleaned_timestamp IS NULL LIMIT :limit)
-            ) AS partitioned_data
-            GROUP BY partition_num
-            ORDER BY partition_num;
-        """)
-        results = conn.execute(partition_query, {"num_workers": num_workers, "limit": total_records}).fetchall() # Limit is applied to the subquery
-        for i, (part_num, start_id, end_id) in enumerate(results):
-            if start_id is not None and end_id is not None:
-                partitions.append((start_id, end_id))
-    return partitions
+        tasks = plan_id_ranges(
+            conn, 'record_processing_status', task_size, limit=total_records,
+            where_sql="status = :pending", params={"pending": STATUS_PENDING}
+        )
+    logging.info(f"Split {total_records:,} records into {len(tasks):,} range tasks of up to {task_size:,} records.")
+    return tasks
+
+
+ZIP_CODE_PATTERN = r'^(\d{5}|\d{3}XX|XXXXX|\d{9}|\d{5}-\d{4})$'
+
+# (column, mapping, default for unmapped or empty values, default for empty originals)
+STANDARDIZED_COLUMNS = [
+    ('company_public_response', mappings.PUB_RESPONSE_MAP, 'N/A', 'N/A'),
+    ('company_response_to_consumer', mappings.COMP_RESPONSE_MAP, 'N/A', 'N/A'),
+    ('tags', mappings.TAGS_MAP, 'General', 'N/A'),
+    ('consumer_consent_provided', mappings.CONSENT_MAP, 'N/A', 'N/A'),
+    ('consumer_disputed', mappings.DISPUTED_MAP, 'N/A', 'N/A'),
+    ('product', mappings.PRODUCT_MAP, 'N/A', 'N/A'),
+    ('issue', mappings.ISSUE_MAP, 'Other/Miscellaneous', 'N/A'),
+    ('sub_product', mappings.SUB_PRODUCT_MAP, 'N/A', 'N/A'),
+    ('sub_issue', mappings.SUB_ISSUE_MAP, 'General/Miscellaneous', 'N/A'),
+]
+
+# Columns with too many distinct values to benefit from factorizing; they are transformed row by row.
+ROW_LEVEL_COLUMNS = {'consumer_complaint_narrative', 'complaint_id'}
+
+# Quarantine checks in the order they are applied; a row is quarantined for the first check it fails.
+QUARANTINE_REASONS = [
+    'Null or empty zip_code',
+    'Invalid zip code format',
+    'Invalid or unparseable date_received',
+    'Invalid or unparseable date_sent_to_company',
+    'Invalid value for timely_response',
+    'Invalid or non-US state code',
+]
+
+CLEANED_FINAL_COLUMNS = [
+    'date_received', 'product', 'product_standardized', 'sub_product', 'sub_product_standardized',
+    'issue', 'issue_standardized', 'sub_issue', 'sub_issue_standardized', 'consumer_complaint_narrative',
+    'company_public_response', 'company', 'state_code', 'zip_code', 'tags', 'tags_standardized',
+    'consumer_consent_provided', 'consumer_consent_provided_standardized', 'submitted_via',
+    'date_sent_to_company', 'company_response_to_consumer', 'company_response_to_consumer_standardized', 'timely_response',
+    'consumer_disputed', 'consumer_disputed_standardized', 'company_public_response_standardized', 'complaint_id',
+    'content_hash'
+]
+
+# Cleaned columns that make up `content_hash`, in hash order.
+CONTENT_HASH_COLUMNS = [
+    'date_received', 'product_standardized', 'sub_product_standardized',
+    'issue_standardized', 'sub_issue_standardized', 'consumer_complaint_narrative', 'company'
+]
+
+# Every cleaned output column, in hash order: `output_hash` changes whenever the cleaned row would.
+OUTPUT_HASH_COLUMNS = [col for col in CLEANED_FINAL_COLUMNS if col not in ('complaint_id', 'content_hash')]
+# Session-scoped table of the modeled complaints of a range whose re-queued version was quarantined.
+STALE_FACTS_TABLE = 'stale_fact_complaints'
+
+
+class _DistinctColumn:
+    """
+    A column factorized once into integer codes and its distinct values.
+
+    Transformations run on the distinct values (hundreds of strings rather than millions of rows) and are
+    expanded back to row level with a single integer take. Missing values are kept as a distinct value of
+    their own, so every transformation sees exactly the values the row-level code would.
+    """
+
+    def __init__(self, series):
+        self.index = series.index
+        self.codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        self.uniques = pd.Series(uniques, dtype=series.dtype)
+        if pd.api.types.is_string_dtype(series):
+            self.uniques = self.uniques.str.strip()
 
+    def expand(self, distinct_values, rows=None):
+        """Expands per-distinct-value results to the rows selected by the boolean array `rows` (all rows if None)."""
+        codes = self.codes if rows is None else self.codes[rows]
+        index = self.index if rows is None else self.index[rows]
+        return pd.Series(distinct_values.array.take(codes), index=index)
 
-def clean_dataframe(df):
+    def mask(self, distinct_mask):
+        """Expands a boolean result per distinct value to a row-level numpy mask."""
+        return np.asarray(distinct_mask, dtype=bool)[self.codes]
+
+
+def clean_dataframe(df, hash_threads=DEFAULT_HASH_THREADS):
     """
     Applies a series of cleaning and standardization rules to a Pandas DataFrame.
 
     This function handles data validation, type conversion, value standardization via mapping tables, and the creation of a content hash for deduplication. Invalid rows are separated and returned for quarantining.
 
+    Low-cardinality columns are factorized once, so stripping, upper-casing, date parsing and mapping run per
+    distinct value. Mapped columns go through the process-wide memoized lookups of `pipeline_standardization`,
+    so values seen in earlier batches are not normalized again. All validity masks are computed up front and
+    invalid rows are split off in one pass.
+    The input frame is not copied or modified.
+
     Args:
         df (pd.DataFrame): The raw DataFrame to be cleaned.
+        hash_threads (int, optional): Threads used to compute `content_hash` in batches.
 
     Returns:
         tuple: A tuple containing:
             - pd.DataFrame: The cleaned and standardized DataFrame.
             - pd.DataFrame or None: A DataFrame of quarantined rows, or None if no rows were quarantined.
     """
-    # Explicitly create a copy to avoid SettingWithCopyWarning.
-    df = df.copy()
+    columns = {
+        col: df[col] if col in ROW_LEVEL_COLUMNS else _DistinctColumn(df[col])
+        for col in df.columns
+    }
+    for col in ROW_LEVEL_COLUMNS & set(df.columns):
+        if pd.api.types.is_string_dtype(df[col]):
+            columns[col] = df[col].str.strip()
 
-    quarantined_dfs = []
+    # --- Per-distinct-value transformations and validity flags ---
+    # `failures` holds the index of the first check (see QUARANTINE_REASONS) each row fails. `stage_versions` maps a
+    # column to (first check from which quarantined rows carry the transformed value, transformed distinct values).
+    failures = np.full(len(df), len(QUARANTINE_REASONS), dtype=np.int8)
+    stage_versions = {}
 
-    for col in df.columns:
-        if pd.api.types.is_string_dtype(df[col]):
-            df[col] = df[col].str.strip()
-            
-    if 'zip_code' in df.columns:
-        null_zip_mask = df['zip_code'].isnull() | (df['zip_code'] == '')
-        if null_zip_mask.any():
-            quarantined = df[null_zip_mask].copy()
-            quarantined['quarantine_reason'] = "Null or empty zip_code"
-            quarantined_dfs.append(quarantined)
-            df = df[~null_zip_mask]
-        
-        sanitized_zips = df['zip_code'].str.replace(r'[^\dXx-]', '', regex=True)
-        
-        valid_zip_pattern = r'^(\d{5}|\d{3}XX|XXXXX|\d{9}|\d{5}-\d{4})$'
-        
-        invalid_zip_mask = ~sanitized_zips.str.match(valid_zip_pattern, na=False)
-        if invalid_zip_mask.any():
-            quarantined = df[invalid_zip_mask].copy()
-            quarantined['quarantine_reason'] = "Invalid zip code format"
-            quarantined_dfs.append(quarantined)
-            df = df[~invalid_zip_mask]
-        df['zip_code'] = sanitized_zips[~invalid_zip_mask]
+    def _fail(stage, row_mask):
+        np.minimum(failures, np.where(row_mask, stage, len(QUARANTINE_REASONS)), out=failures)
 
+    if 'zip_code' in df.columns:
+        zip_col = columns['zip_code']
+        zips = zip_col.uniques
+        _fail(0, zip_col.mask(zips.isnull() | (zips == '')))
+        sanitized_zips = zips.str.replace(r'[^\dXx-]', '', regex=True)
+        _fail(1, zip_col.mask(~sanitized_zips.str.match(ZIP_CODE_PATTERN, na=False)))
+        stage_versions['zip_code'] = (2, sanitized_zips)
 
-    # --- Type Conversion and Standardization ---
     if 'company' in df.columns:
-        df['company'] = df['company'].str.title()
+        stage_versions['company'] = (2, columns['company'].uniques.str.title())
+
+    parsed_dates = {}
+    for stage, col in ((2, 'date_received'), (3, 'date_sent_to_company')):
+        date_col = columns[col]
+        original = date_col.uniques
+        parsed = pd.to_datetime(original, errors='coerce', format='%Y-%m-%d')
+        _fail(stage, date_col.mask(parsed.isnull() & original.notnull() & (original != '')))
+        parsed_dates[col] = parsed.dt.date
+        stage_versions[col] = (stage + 1, parsed_dates[col])
+
+    timely_col = columns['timely_response']
+    timely_upper = timely_col.uniques.str.upper()
+    _fail(4, timely_col.mask(~timely_upper.isin({'YES', 'NO'}) & timely_col.uniques.notna() & (timely_col.uniques != '')))
+    timely_mapped = timely_upper.map({'YES': '1', 'NO': '0'})
+    stage_versions['timely_response'] = (5, timely_mapped)
 
-    original_date_received = df['date_received']
-    df['date_received'] = pd.to_datetime(original_date_received, errors='coerce', format='%Y-%m-%d')
+    if 'state_code' in df.columns:
+        state_col = columns['state_code']
+        state_lookup = get_lookup('state_code', mappings.STATE_MAP)
+        states = state_lookup.standardize(state_col.uniques)
+        _fail(5, state_col.mask(~states.isin(state_lookup.values) & states.notnull()))
+        stage_versions['state_code'] = (5, states)
+
+    keep = failures == len(QUARANTINE_REASONS)
+
+    # --- Assemble the cleaned frame from the surviving rows ---
+    def _kept(col, distinct_values=None):
+        column = columns[col]
+        if isinstance(column, _DistinctColumn):
+            return column.expand(column.uniques if distinct_values is None else distinct_values, keep)
+        return column[keep]
+
+    cleaned = {}
+    for col in df.columns:
+        if col in stage_versions:
+            cleaned[col] = _kept(col, stage_versions[col][1])
+        else:
+            cleaned[col] = _kept(col)
+    if 'state_code' in df.columns:
+        cleaned['state_code'] = cleaned['state_code'].fillna('N/A')
 
-    invalid_date_mask = df['date_received'].isnull() & original_date_received.notnull() & (original_date_received != '')
-    if invalid_date_mask.any():
-        quarantined = df[invalid_date_mask].copy()
-        quarantined['quarantine_reason'] = "Invalid or unparseable date_received"
-        quarantined['date_received'] = original_date_received[invalid_date_mask]
-        quarantined_dfs.append(quarantined)
-        df = df[~invalid_date_mask]
+    for col, mapping, standardized_default, original_default in STANDARDIZED_COLUMNS:
+        distinct = columns[col].uniques
+        standardized = get_lookup(col, mapping, standardized_default).standardize(distinct)
+        originals = distinct.replace(r'^\s*$', pd.NA, regex=True).fillna(original_default)
+        cleaned[f"{col}_standardized"] = _kept(col, standardized)
+        cleaned[col] = _kept(col, originals)
 
-    df['date_received'] = df['date_received'].dt.date
+    # The narrative is already stripped, so "blank" (the `^\s*$` rule used for the distinct values) means empty.
+    narrative = cleaned['consumer_complaint_narrative']
+    cleaned['consumer_complaint_narrative'] = narrative.where(narrative.notna() & (narrative != ''), 'None')
 
-    original_date_sent = df['date_sent_to_company']
-    df['date_sent_to_company'] = pd.to_datetime(original_date_sent, errors='coerce', format='%Y-%m-%d')
+    cleaned['content_hash'] = pd.Series(
+        content_hashes([cleaned[col] for col in CONTENT_HASH_COLUMNS], threads=hash_threads),
+        index=cleaned[CONTENT_HASH_COLUMNS[0]].index
+    )
 
-    invalid_date_mask_sent = df['date_sent_to_company'].isnull() & original_date_sent.notnull() & (original_date_sent != '')
-    if invalid_date_mask_sent.any():
-        quarantined = df[invalid_date_mask_sent].copy()
-        quarantined['quarantine_reason'] = "Invalid or unparseable date_sent_to_company"
-        quarantined['date_sent_to_company'] = original_date_sent[invalid_date_mask_sent]
-        quarantined_dfs.append(quarantined)
-        df = df[~invalid_date_mask_sent]
+    df_final = pd.DataFrame({col: cleaned[col] for col in CLEANED_FINAL_COLUMNS if col in cleaned})
 
-    df['date_sent_to_company'] = df['date_sent_to_company'].dt.date
+    if keep.all():
+        return df_final, None
 
-    # Timely Response
-    valid_timely_response = {'YES', 'NO'}
-    invalid_timely_mask = ~df['timely_response'].str.upper().isin(valid_timely_response) & df['timely_response'].notna() & (df['timely_response'] != '')
-    if invalid_timely_mask.any():
-        quarantined = df[invalid_timely_mask].copy()
-        quarantined['quarantine_reason'] = "Invalid value for timely_response"
+    # --- Quarantined rows, grouped by the first check they failed, in check order ---
+    quarantined_dfs = []
+    for stage, reason in enumerate(QUARANTINE_REASONS):
+        rows = failures == stage
+        if not rows.any():
+            continue
+        quarantined = {}
+        for col in df.columns:
+            column = columns[col]
+            if not isinstance(column, _DistinctColumn):
+                quarantined[col] = column[rows]
+                continue
+            from_stage, transformed = stage_versions.get(col, (None, None))
+            use_transformed = from_stage is not None and stage >= from_stage
+            quarantined[col] = column.expand(transformed if use_transformed else column.uniques, rows)
+        quarantined = pd.DataFrame(quarantined)
+        quarantined['quarantine_reason'] = reason
         quarantined_dfs.append(quarantined)
-        df = df[~invalid_timely_mask]
-    df['timely_response'] = df['timely_response'].str.upper().map({'YES': '1', 'NO': '0'})
-
-    if 'state_code' in df.columns:
-        df['state_code'] = df['state_code'].str.upper().replace(mappings.STATE_MAP)
-        
-        valid_state_codes = set(mappings.STATE_MAP.values())
-        invalid_state_mask = ~df['state_code'].isin(valid_state_codes) & df['state_code'].notnull()
-        if invalid_state_mask.any():
-            quarantined = df[invalid_state_mask].copy()
-            quarantined['quarantine_reason'] = "Invalid or non-US state code"
-            quarantined_dfs.append(quarantined)
-            df = df[~invalid_state_mask]
-        df['state_code'] = df['state_code'].fillna('N/A')
 
-    df['company_public_response_standardized'] = df['company_public_response'].replace('', pd.NA).str.upper().map(mappings.PUB_RESPONSE_MAP).fillna('N/A')
-    df['company_public_response'] = df['company_public_response'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+    return df_final, pd.concat(quarantined_dfs, ignore_index=True)
 
-    df['company_response_to_consumer_standardized'] = df['company_response_to_consumer'].replace('', pd.NA).str.upper().map(mappings.COMP_RESPONSE_MAP).fillna('N/A')
-    df['company_response_to_consumer'] = df['company_response_to_consumer'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
 
-    df['tags_standardized'] = df['tags'].replace('', pd.NA).str.upper().map(mappings.TAGS_MAP).fillna('General')
-    df['tags'] = df['tags'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
-
-    df['consumer_consent_provided_standardized'] = df['consumer_consent_provided'].replace('', pd.NA).str.upper().map(mappings.CONSENT_MAP).fillna('N/A')
-    df['consumer_consent_provided'] = df['consumer_consent_provided'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+def output_hashes(df_cleaned, threads=DEFAULT_HASH_THREADS):
+    """
+    Computes the `output_hash` of each cleaned row: the first 64 bits of the SHA256 over every column in
+    `OUTPUT_HASH_COLUMNS`, hashed like `content_hash`, as decimal text for a BIGINT UNSIGNED column.
+    """
+    digests = content_hashes([df_cleaned[col] for col in OUTPUT_HASH_COLUMNS], threads=threads)
+    return pd.Series([str(int(digest[:16], 16)) for digest in digests], index=df_cleaned.index, dtype=object)
 
-    df['consumer_disputed_standardized'] = df['consumer_disputed'].replace('', pd.NA).str.upper().map(mappings.DISPUTED_MAP).fillna('N/A')
-    df['consumer_disputed'] = df['consumer_disputed'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
 
-    df['consumer_complaint_narrative'] = df['consumer_complaint_narrative'].replace(r'^\s*$', pd.NA, regex=True).fillna('None')
+class UnchangedRowIndex:
+    """
+    Output hashes of the complaints already in `consumer_complaints_cleaned` for one partition, used by
+    `--skip-unchanged`.
+
+    A pending raw row is skipped when its complaint is already cleaned with the same `output_hash`, a digest
+    of every cleaned output column, so the skipped row would have been written back unchanged. The source
+    `row_hash` is not compared: delta ingestion re-queues every row whose raw values changed, including
+    changes that cleaning normalizes away. Rows cleaned before `output_hash` existed are reprocessed once.
+    Keys are held as sorted uint64 arrays, about 16 bytes per complaint.
+    """
 
-    df['product_standardized'] = df['product'].replace('', pd.NA).str.upper().map(mappings.PRODUCT_MAP).fillna('N/A')
-    df['product'] = df['product'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+    def __init__(self, ids, output_keys):
+        order = np.argsort(ids, kind='stable')
+        self.ids = ids[order]
+        self.output_keys = output_keys[order]
+
+    @classmethod
+    def load(cls, engine, start_id, end_id, batch_size, read_mode='stream'):
+        """Preloads the index for complaint IDs `start_id`..`end_id`."""
+        ids, output_keys = [], []
+        for df_batch in iter_dataframe_batches(
+            engine, ['complaint_id', 'output_hash'], 'consumer_complaints_cleaned',
+            "complaint_id BETWEEN :start_id AND :end_id AND output_hash IS NOT NULL",
+            {"start_id": start_id, "end_id": end_id}, batch_size, read_mode=read_mode
+        ):
+            ids.append(df_batch['complaint_id'].to_numpy(dtype=np.int64))
+            output_keys.append(np.asarray(df_batch['output_hash'], dtype=np.uint64))
+        if not ids:
+            return cls(np.array([], dtype=np.int64), np.array([], dtype=np.uint64))
+        return cls(np.concatenate(ids), np.concatenate(output_keys))
+
+    @classmethod
+    def from_cleaned(cls, df_cleaned):
+        """Builds the index from cleaned rows with their `output_hash`, as `load` would find them once written."""
+        return cls(df_cleaned['complaint_id'].to_numpy(dtype=np.int64), _output_keys(df_cleaned))
+
+    def __len__(self):
+        return int(self.ids.size)
+
+    def unchanged_mask(self, df_cleaned):
+        """Returns a boolean mask of the cleaned rows whose output hash is already stored for their complaint."""
+        if not self.ids.size or df_cleaned.empty:
+            return np.zeros(len(df_cleaned), dtype=bool)
+        ids = df_cleaned['complaint_id'].to_numpy(dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.ids, ids), self.ids.size - 1)
+        return (self.ids[positions] == ids) & (self.output_keys[positions] == _output_keys(df_cleaned))
+
+
+def _output_keys(df_cleaned):
+    return np.fromiter((int(h) for h in df_cleaned['output_hash']), dtype=np.uint64, count=len(df_cleaned))
+
+
+def _mark_skipped_as_modeled(conn, complaint_ids, batch_size=1000):
+    """
+    Moves skipped complaints straight from pending to modeled when their fact row already exists.
 
-    df['issue_standardized'] = df['issue'].replace('', pd.NA).str.upper().map(mappings.ISSUE_MAP).fillna('Other/Miscellaneous')
-    df['issue'] = df['issue'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+    Delta ingestion re-queues a changed row for both cleaning and modeling; an unchanged row must not be
+    re-modeled either. Complaints that were never modeled are left pending and are marked cleaned as usual.
+    """
+    for i in range(0, len(complaint_ids), batch_size):
+        ids_str = ', '.join(str(int(cid)) for cid in complaint_ids[i:i + batch_size])
+        transition(
+            conn, STATUS_PENDING, STATUS_MODELED,
+            f"p.complaint_id IN ({ids_str}) AND EXISTS (SELECT 1 FROM fact_complaints f WHERE f.complaint_id = p.complaint_id)"
+        )
 
-    df['sub_product_standardized'] = df['sub_product'].replace('', pd.NA).str.upper().map(mappings.SUB_PRODUCT_MAP).fillna('N/A')
-    df['sub_product'] = df['sub_product'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
 
-    df['sub_issue_standardized'] = df['sub_issue'].replace('', pd.NA).str.upper().map(mappings.SUB_ISSUE_MAP).fillna('General/Miscellaneous')
-    df['sub_issue'] = df['sub_issue'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+def _delete_stale_cleaned(conn, complaint_ids, batch_size=1000):
+    """
+    Deletes the previously cleaned rows of complaints whose re-queued version was quarantined.
 
-    hash_cols = [
-        'date_received', 'product_standardized', 'sub_product_standardized',
-        'issue_standardized', 'sub_issue_standardized', 'consumer_complaint_narrative', 'company'
-    ]
-    df_for_hash = df[hash_cols].fillna('').astype(str)
-    
-    combined_string_series = df_for_hash[hash_cols[0]].str.cat(df_for_hash[hash_cols[1:]], sep='||')
-    df['content_hash'] = combined_string_series.apply(lambda x: hashlib.sha256(x.encode('utf-8')).hexdigest())
-
-    final_cols = [
-        'date_received', 'product', 'product_standardized', 'sub_product', 'sub_product_standardized',
-        'issue', 'issue_standardized', 'sub_issue', 'sub_issue_standardized', 'consumer_complaint_narrative',
-        'company_public_response', 'company', 'state_code', 'zip_code', 'tags', 'tags_standardized',
-        'consumer_consent_provided', 'consumer_consent_provided_standardized', 'submitted_via',
-        'date_sent_to_company', 'company_response_to_consumer', 'company_response_to_consumer_standardized', 'timely_response',
-        'consumer_disputed', 'consumer_disputed_standardized', 'company_public_response_standardized', 'complaint_id',
-        'content_hash'
-    ]
-    df_final = df[[col for col in final_cols if col in df.columns]]
-
-    if quarantined_dfs:
-        final_quarantined_df = pd.concat(quarantined_dfs, ignore_index=True)
-        return df_final, final_quarantined_df
-    else:
-        return df_final, None
+    Without this the old cleaned row would make the timestamp stage mark the complaint as cleaned, and
+    modeling would re-model it from stale data.
+    """
+    deleted = 0
+    for i in range(0, len(complaint_ids), batch_size):
+        ids_str = ', '.join(str(int(cid)) for cid in complaint_ids[i:i + batch_size])
+        deleted += conn.execute(text(f"DELETE FROM consumer_complaints_cleaned WHERE complaint_id IN ({ids_str})")).rowcount
+    return deleted
 
 
 def processing_worker(args):
-    worker_id, start_id, end_id, db_url, batch_size = args
+    worker_id, start_id, end_id, db_url, batch_size, staging_writer_name, read_mode, hash_threads, skip_unchanged = args
     setup_logging()
 
-    worker_staging_table = f"staging_cleaned_{worker_id}_{int(time.time())}"
-    worker_engine = create_engine(db_url)
+    worker_staging_table = f"staging_cleaned_{worker_id}_{uuid.uuid4().hex[:8]}"
+    # The process's pooled engine has local_infile enabled, as the LOAD DATA staging writer requires.
+    worker_engine = get_worker_engine(db_url)
+    staging_writer = get_staging_writer(staging_writer_name, worker_staging_table)
     total_rows_staged = 0
+    total_skipped = 0
+    schema_cache_before = schema_cache_stats()
 
     logging.info(f"[Processing Worker {worker_id}] Starting partition: IDs {start_id:,} to {end_id:,}")
 
-    query = f"""
-        SELECT 
-            date_received,
-            product,
-            sub_product,
-            issue,
-            sub_issue,
-            consumer_complaint_narrative,
-            company_public_response,
-            company,
-            state_code,
-            zip_code,
-            tags,
-            consumer_consent_provided,
-            submitted_via,
-            date_sent_to_company,
-            company_response_to_consumer,
-            timely_response,
-            consumer_disputed,
-            complaint_id
-        FROM consumer_complaints_raw
-        WHERE complaint_id BETWEEN {start_id} AND {end_id} AND cleaned_timestamp IS NULL
-    """
+    where_sql = f"complaint_id BETWEEN :start_id AND :end_id AND {status_filter(STATUS_PENDING)}"
+    # The source row hash is read as text: a BIGINT UNSIGNED column with NULLs would otherwise become float64.
+    read_columns = RAW_SOURCE_COLUMNS + ['CAST(row_hash AS CHAR) AS row_hash']
     
+    skipped_ids = []
     try:
+        unchanged_index = None
+        if skip_unchanged:
+            unchanged_index = UnchangedRowIndex.load(worker_engine, start_id, end_id, batch_size, read_mode)
+            logging.info(f"[Processing Worker {worker_id}] Preloaded hashes of {len(unchanged_index):,} cleaned complaints.")
+
+        # Raw rows are read on their own connection (server-side cursor by default) while cleaned batches are
+        # written in a single transaction on this one, so memory is bounded by batch_size, not partition size.
         with worker_engine.connect() as conn:
             with conn.begin():
-                chunk_iterator = pd.read_sql_query(sql=query, con=conn, chunksize=batch_size)
+                chunk_iterator = iter_dataframe_batches(
+                    worker_engine, read_columns, 'consumer_complaints_raw', where_sql,
+                    {"start_id": start_id, "end_id": end_id}, batch_size, read_mode=read_mode
+                )
                 for i, df_chunk in enumerate(chunk_iterator):
                     if df_chunk.empty:
                         continue
                     logging.info(f"[Processing Worker {worker_id}] ...processing batch {i+1} ({len(df_chunk):,} records).")
-                    df_cleaned, df_quarantined = clean_dataframe(df_chunk)
+                    batch_start = time.time()
+                    source_row_hashes = df_chunk.pop('row_hash')
+                    df_cleaned, df_quarantined = clean_dataframe(df_chunk, hash_threads=hash_threads)
+                    df_cleaned['source_row_hash'] = source_row_hashes.reindex(df_cleaned.index)
+                    df_cleaned['output_hash'] = output_hashes(df_cleaned, threads=hash_threads)
+
+                    if unchanged_index is not None:
+                        unchanged = unchanged_index.unchanged_mask(df_cleaned)
+                        if unchanged.any():
+                            skipped_ids.extend(df_cleaned['complaint_id'].to_numpy()[unchanged].tolist())
+                            total_skipped += int(unchanged.sum())
+                            df_cleaned = df_cleaned[~unchanged]
                     
                     if not df_cleaned.empty:
-                        df_cleaned.to_sql(worker_staging_table, conn, if_exists='append', index=False)
-                        total_rows_staged += len(df_cleaned)
+                        total_rows_staged += staging_writer.write(conn, df_cleaned)
                     
                     if df_quarantined is not None and not df_quarantined.empty:
-                        quarantine_cols = [c['name'] for c in inspect(conn).get_columns('consumer_complaints_quarantined')]
+                        quarantine_cols = get_table_columns(conn, 'consumer_complaints_quarantined')
                         quarantine_cols_in_df = [col for col in df_quarantined.columns if col in quarantine_cols]
                         
                         df_quarantined_final = df_quarantined[quarantine_cols_in_df]
                         df_quarantined_final.to_sql('consumer_complaints_quarantined', conn, if_exists='append', index=False)
+                        _delete_stale_cleaned(conn, pd.to_numeric(df_quarantined['complaint_id']).tolist())
                         logging.warning(f"[Processing Worker {worker_id}] ...quarantined {len(df_quarantined):,} records.")
+                    logging.info(f"[Processing Worker {worker_id}] ...batch {i+1} cleaned and staged in {time.time() - batch_start:.2f}s.")
+
+        # Marked in a short transaction of its own so the status counters are not locked while batches are written.
+        if skipped_ids:
+            with worker_engine.begin() as conn:
+                _mark_skipped_as_modeled(conn, skipped_ids)
     except Exception as e:
         logging.error(f"[Processing Worker {worker_id}] Failed during processing: {e}", exc_info=True)
         try:
@@ -274,39 +447,144 @@ def processing_worker(args):
             logging.warning(f"[Processing Worker {worker_id}] Cleaned up failed staging table.")
         except:
             pass
-        return None
-    finally:
-        worker_engine.dispose()
+        raise
+
+    log_lookup_stats(f"[Processing Worker {worker_id}]")
+    log_schema_cache_stats(f"[Processing Worker {worker_id}] Schema/SQL cache:", since=schema_cache_before)
+    logging.info(
+        f"[Processing Worker {worker_id}] Finished partition. Staged {total_rows_staged:,} records to '{worker_staging_table}'"
+        f" and skipped {total_skipped:,} unchanged records."
+    )
+    return (worker_staging_table if total_rows_staged > 0 else None), total_skipped
+
+def sql_processing_worker(args):
+    """
+    The `--clean-engine sql` counterpart of `processing_worker`.
+
+    Cleans the partition inside the database, `batch_size` pending complaint IDs at a time, with set-based
+    `INSERT ... SELECT` statements into the worker's staging table. Takes the same arguments and returns the
+    same (staging table or None, skipped count) as `processing_worker`; the read mode, staging writer and hash
+    threads do not apply.
+    """
+    # Imported here: pipeline_sql_cleaning builds its SQL from this module's cleaning rules.
+    from pipeline_sql_cleaning import clean_range_in_database
+
+    worker_id, start_id, end_id, db_url, batch_size, _, _, _, skip_unchanged = args
+    setup_logging()
+
+    worker_staging_table = f"staging_cleaned_{worker_id}_{uuid.uuid4().hex[:8]}"
+    worker_engine = get_worker_engine(db_url)
+    total_rows_staged = 0
+    total_quarantined = 0
+    total_skipped = 0
+
+    logging.info(f"[SQL Processing Worker {worker_id}] Starting partition: IDs {start_id:,} to {end_id:,}")
+
+    next_batch_end_sql = text("""
+        SELECT MAX(complaint_id) FROM (
+            SELECT complaint_id FROM record_processing_status
+            WHERE status = :pending AND complaint_id > :last_id AND complaint_id <= :end_id
+            ORDER BY complaint_id
+            LIMIT :batch_size
+        ) AS t
+    """)
+    try:
+        with worker_engine.begin() as conn:
+            create_staging_table(conn, worker_staging_table)
+            last_id = start_id - 1
+            batch_num = 0
+            while True:
+                batch_end = conn.execute(
+                    next_batch_end_sql,
+                    {"pending": STATUS_PENDING, "last_id": last_id, "end_id": end_id, "batch_size": batch_size}
+                ).scalar_one()
+                if batch_end is None:
+                    break
+                batch_num += 1
+                staged, quarantined, skipped = clean_range_in_database(
+                    conn, worker_staging_table, last_id + 1, batch_end, skip_unchanged=skip_unchanged
+                )
+                total_rows_staged += staged
+                total_quarantined += quarantined
+                total_skipped += skipped
+                logging.info(
+                    f"[SQL Processing Worker {worker_id}] ...batch {batch_num} (IDs up to {batch_end:,}): staged {staged:,}, "
+                    f"quarantined {quarantined:,}, skipped {skipped:,} unchanged."
+                )
+                last_id = batch_end
+
+            if total_rows_staged == 0:
+                conn.execute(text(f"DROP TABLE IF EXISTS `{worker_staging_table}`;"))
+    except Exception as e:
+        logging.error(f"[SQL Processing Worker {worker_id}] Failed during processing: {e}", exc_info=True)
+        try:
+            with worker_engine.begin() as conn_fail:
+                conn_fail.execute(text(f"DROP TABLE IF EXISTS `{worker_staging_table}`;"))
+            logging.warning(f"[SQL Processing Worker {worker_id}] Cleaned up failed staging table.")
+        except:
+            pass
+        raise
+
+    logging.info(
+        f"[SQL Processing Worker {worker_id}] Finished partition. Staged {total_rows_staged:,} records to '{worker_staging_table}',"
+        f" quarantined {total_quarantined:,} and skipped {total_skipped:,} unchanged records."
+    )
+    return (worker_staging_table if total_rows_staged > 0 else None), total_skipped
+
+def _hash_storage_columns(staging_cols, hash_storage):
+    """
+    Maps staging columns to the cleaned table's columns for the chosen `content_hash` storage mode.
 
-    logging.info(f"[Processing Worker {worker_id}] Finished partition. Staged {total_rows_staged:,} records to '{worker_staging_table}'.")
-    return worker_staging_table if total_rows_staged > 0 else None
+    Staging tables always hold the hex digest. In 'binary' mode it is stored as `UNHEX(content_hash)` in
+    `content_hash_bin` and `content_hash` is left NULL; in 'hex' mode `content_hash_bin` is cleared, so an
+    upserted row never keeps a stale digest from the other mode.
+
+    Returns:
+        tuple: (insert column names, matching SELECT expressions)
+    """
+    select_exprs = [f"`{col}`" for col in staging_cols]
+    if 'content_hash' not in staging_cols:
+        return staging_cols, select_exprs
+    if hash_storage == 'binary':
+        select_exprs = ["NULL" if col == 'content_hash' else expr for col, expr in zip(staging_cols, select_exprs)]
+        return staging_cols + ['content_hash_bin'], select_exprs + ["UNHEX(`content_hash`)"]
+    return staging_cols + ['content_hash_bin'], select_exprs + ["NULL"]
 
 def consolidation_worker(args):
     """
     A worker that consolidates data from one staging table into the final cleaned table.
     It connects, inserts the data, and then drops its assigned staging table.
     """
-    table_name, db_url, batch_size = args
-    worker_engine = create_engine(db_url)
+    table_name, db_url, batch_size, hash_storage = args
+    worker_engine = get_worker_engine(db_url)
     total_inserted = 0
     
     logging.info(f"[Consolidation Worker] Consolidating table '{table_name}'...")
     
     try:
+        # The staging columns and both statements are prepared once per table, not once per batch.
+        with worker_engine.connect() as conn:
+            staging_cols_list = get_table_columns(conn, table_name)
+        insert_cols, select_exprs = _hash_storage_columns(staging_cols_list, hash_storage)
+        cols_str = ', '.join([f"`{col}`" for col in insert_cols])
+        select_str = ', '.join(select_exprs)
+
+        update_str = ', '.join([f"`{col}` = VALUES(`{col}`)" for col in insert_cols if col != 'complaint_id'])
+
+        # Upsert so that corrections re-queued by delta ingestion replace the previously cleaned row.
+        insert_sql = text(f"""
+            INSERT INTO consumer_complaints_cleaned ({cols_str}) 
+            SELECT {select_str} FROM `{table_name}`
+            WHERE complaint_id > :last_id
+            ORDER BY complaint_id
+            LIMIT :batch_size
+            ON DUPLICATE KEY UPDATE {update_str};
+        """)
+        last_id_sql = text(f"SELECT MAX(complaint_id) FROM (SELECT complaint_id FROM `{table_name}` WHERE complaint_id > :last_id ORDER BY complaint_id LIMIT :batch_size) AS t")
+
         last_id = 0
         while True:
             with worker_engine.begin() as conn:
-                inspector = inspect(conn)
-                staging_cols_list = [c['name'] for c in inspector.get_columns(table_name)]
-                cols_str = ', '.join([f"`{col}`" for col in staging_cols_list])
-
-                insert_sql = text(f"""
-                    INSERT IGNORE INTO consumer_complaints_cleaned ({cols_str}) 
-                    SELECT {cols_str} FROM `{table_name}`
-                    WHERE complaint_id > :last_id
-                    ORDER BY complaint_id
-                    LIMIT :batch_size;
-                """)
                 result = conn.execute(insert_sql, {"last_id": last_id, "batch_size": batch_size})
                 inserted_in_batch = result.rowcount
                 total_inserted += inserted_in_batch
@@ -315,91 +593,163 @@ def consolidation_worker(args):
                 if inserted_in_batch == 0:
                     break
 
-                last_id = conn.execute(
-                    text(f"SELECT MAX(complaint_id) FROM (SELECT complaint_id FROM `{table_name}` WHERE complaint_id > :last_id ORDER BY complaint_id LIMIT :batch_size) AS t"),
-                    {"last_id": last_id, "batch_size": batch_size}
-                ).scalar_one()
+                last_id = conn.execute(last_id_sql, {"last_id": last_id, "batch_size": batch_size}).scalar_one()
 
                 if last_id is None:
                     break
         with worker_engine.begin() as conn:
             conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}`;"))
+        invalidate_schema_cache(table_name)
         logging.info(f"[Consolidation Worker] Finished consolidating '{table_name}'. Inserted {total_inserted:,} total rows.")
     except Exception as e:
         logging.error(f"[Consolidation Worker] Failed to consolidate {table_name}: {e}", exc_info=True)
-        return 0 # Return 0 on failure
-    finally:
-        worker_engine.dispose()
+        raise # The scheduler retries the range
     return total_inserted
 
 def timestamp_worker(args):
     """
-    A worker that updates the cleaned_timestamp for a given partition of complaint IDs.
+    A worker that marks the pending complaints of a consolidated range as cleaned, or as quarantined when
+    they have no cleaned row. Cleaning deletes the old cleaned row of a complaint whose re-queued version is
+    quarantined, so a cleaned row here always holds the complaint's current version.
+
+    A quarantined complaint that was modeled before also loses its fact row, in the same transaction and under
+    the fact load lock: its delta is retracted from `agg_daily_complaints` and its partition is recorded in
+    `fact_partition_changes`, so the aggregates and the export no longer count its old version.
+
+    A range covers at most one batch of pending IDs, so each transition is a single range UPDATE on the
+    narrow `record_processing_status` table instead of batched UPDATEs of the wide raw rows.
+
+    Returns:
+        tuple: (records marked, cleaned rows per received date, received dates of the retracted facts)
+               for the run manifest.
     """
     worker_id, start_id, end_id, db_url, batch_size = args
-    worker_engine = create_engine(db_url)
+    worker_engine = get_worker_engine(db_url)
+    log_prefix = f"[Timestamp Worker {worker_id}]"
     total_updated = 0
-    
-    logging.info(f"[Timestamp Worker {worker_id}] Updating cleaned_timestamps for IDs {start_id:,} to {end_id:,}")
-    last_id = start_id - 1 # Start just before the partition begins
+    dirty_dates = {}
+
+    logging.info(f"{log_prefix} Marking IDs {start_id:,} to {end_id:,} as cleaned")
     try:
-        while True:
-            with worker_engine.begin() as conn:
-                update_sql = text("""
-                    UPDATE consumer_complaints_raw
-                    SET cleaned_timestamp = NOW()
-                    WHERE cleaned_timestamp IS NULL
-                      AND complaint_id > :last_id
-                      AND complaint_id <= :end_id
-                    ORDER BY complaint_id
-                    LIMIT :batch_size;
-                """)
-                result = conn.execute(update_sql, {"last_id": last_id, "end_id": end_id, "batch_size": batch_size})
-                updated_in_batch = result.rowcount
-                total_updated += updated_in_batch
-                logging.info(f"[Timestamp Worker {worker_id}] ...updated a batch of {updated_in_batch:,} records.")
-
-                if updated_in_batch == 0 or updated_in_batch < batch_size:
-                    break # Last batch was processed
-
-                # Find the new last_id for the next iteration by getting the max ID from the updated batch
-                find_last_id_sql = text(f"""
-                    SELECT MAX(complaint_id) FROM (
-                        SELECT complaint_id FROM consumer_complaints_raw
-                        WHERE complaint_id > :last_id AND complaint_id <= :end_id
-                        ORDER BY complaint_id LIMIT {updated_in_batch}
-                    ) as t;
-                """)
-                last_id = conn.execute(find_last_id_sql, {"last_id": last_id, "end_id": end_id}).scalar_one()
-        logging.info(f"[Timestamp Worker {worker_id}] Marked {total_updated:,} raw records as cleaned.")
+        params = {"start_id": start_id, "end_id": end_id}
+        in_range = "p.complaint_id BETWEEN :start_id AND :end_id"
+        not_cleaned = "NOT EXISTS (SELECT 1 FROM consumer_complaints_cleaned c WHERE c.complaint_id = p.complaint_id)"
+        stale_facts_sql = f"""
+            SELECT p.complaint_id FROM record_processing_status p
+            JOIN fact_complaints f ON f.complaint_id = p.complaint_id
+            WHERE p.status = {STATUS_PENDING} AND {in_range} AND {not_cleaned}
+        """
+        with worker_engine.connect() as conn:
+            # Only ranges with quarantined re-queues of modeled complaints write facts and take the lock.
+            has_stale_facts = conn.execute(text(f"{stale_facts_sql} LIMIT 1"), params).first() is not None
+            conn.commit()
+            with (fact_load_lock(conn, log_prefix) if has_stale_facts else nullcontext()), conn.begin():
+                date_counts = dict(conn.execute(text("""
+                    SELECT c.date_received, COUNT(*)
+                    FROM record_processing_status p
+                    JOIN consumer_complaints_cleaned c ON c.complaint_id = p.complaint_id
+                    WHERE p.status = :pending AND p.complaint_id BETWEEN :start_id AND :end_id
+                    GROUP BY c.date_received
+                """), {**params, "pending": STATUS_PENDING}).fetchall())
+                if has_stale_facts:
+                    dirty_dates = _retract_stale_facts(conn, stale_facts_sql, params, log_prefix)
+                quarantined = transition(conn, STATUS_PENDING, STATUS_QUARANTINED, f"{in_range} AND {not_cleaned}", params)
+                cleaned = transition(conn, STATUS_PENDING, STATUS_CLEANED, in_range, params)
+        total_updated = cleaned + quarantined
+        logging.info(f"{log_prefix} Marked {cleaned:,} records as cleaned and {quarantined:,} as quarantined.")
     except Exception as e:
-        logging.error(f"[Timestamp Worker {worker_id}] Failed to update timestamps: {e}", exc_info=True)
-        return 0 # Return 0 on failure
+        logging.error(f"{log_prefix} Failed to update processing status: {e}", exc_info=True)
+        raise # The scheduler retries the range
+
+    return total_updated, date_counts, dirty_dates
+
+
+def _retract_stale_facts(conn, stale_facts_sql, params, log_prefix):
+    """
+    Deletes the fact rows selected by `stale_facts_sql` and retracts them from the aggregates.
+
+    Call it in the status transaction, under the fact load lock.
+
+    Returns:
+        dict: Retracted fact rows per received date.
+    """
+    conn.execute(text(f"DROP TEMPORARY TABLE IF EXISTS {STALE_FACTS_TABLE}"))
+    conn.execute(text(f"""
+        CREATE TEMPORARY TABLE {STALE_FACTS_TABLE} (complaint_id INT PRIMARY KEY)
+        {stale_facts_sql}
+    """), params)
+    try:
+        record_partition_changes(conn, STALE_FACTS_TABLE)
+        dirty_dates = touched_dates(conn, STALE_FACTS_TABLE)
+        retract_facts(conn, STALE_FACTS_TABLE, params["start_id"] - 1, params["end_id"])
+        deleted = conn.execute(text(f"""
+            DELETE f FROM fact_complaints f
+            JOIN {STALE_FACTS_TABLE} s ON s.complaint_id = f.complaint_id
+        """)).rowcount
+        prune_empty_groups(conn)
     finally:
-        worker_engine.dispose()
-        
-    return total_updated
+        conn.execute(text(f"DROP TEMPORARY TABLE IF EXISTS {STALE_FACTS_TABLE}"))
+    logging.info(f"{log_prefix} Deleted {deleted:,} fact rows of quarantined complaints.")
+    return dirty_dates
 
 
-def run(engine, limit=None, batch_size=50000):
+def run(engine, limit=None, batch_size=50000, staging_writer='load_data', read_mode='stream', hash_storage='hex',
+        skip_unchanged=False, clean_engine='pandas', workers=None, index_rebuild_threshold=INDEX_REBUILD_THRESHOLD,
+        manifest_dir=DEFAULT_MANIFEST_DIR):
     """
     Manages the parallel execution of the Stage, Clean, and Insert workflow.
 
+    With the DuckDB backend, pending rows are cleaned in batches of `batch_size` with `clean_dataframe` and
+    upserted set-based; only `limit` and `batch_size` apply.
+
     Args:
-        engine: The SQLAlchemy engine for database connectivity.
+        engine: The SQLAlchemy engine for database connectivity, or a `DuckDBBackend`.
         limit (int, optional): Max number of records to process. Defaults to all new records.
         batch_size (int, optional): Number of records per batch. Defaults to 10000.
+        staging_writer (str, optional): How workers stage cleaned batches: 'load_data' (bulk LOAD DATA, default)
+                                        or 'to_sql' (pandas executemany INSERTs).
+        read_mode (str, optional): How workers read raw rows: 'stream' (server-side cursor, default),
+                                   'keyset' (one bounded query per batch) or 'buffered'.
+        hash_storage (str, optional): Store `content_hash` as 'hex' (VARCHAR(64), default) or 'binary'
+                                      (BINARY(32) in `content_hash_bin`, read through `consumer_complaints_cleaned_hex`).
+        skip_unchanged (bool, optional): Skip pending rows whose output hash matches the already
+                                         cleaned complaint, before staging, consolidation and modeling.
+        clean_engine (str, optional): 'pandas' (default) cleans in the worker processes; 'sql' cleans with
+                                      set-based INSERT ... SELECT statements inside the database.
+        workers (int, optional): Worker processes. Defaults to the host's cores, capped by the free database
+                                 connections.
+        index_rebuild_threshold (float, optional): Drop and rebuild the secondary indexes of
+                                                   `consumer_complaints_cleaned` only when the run targets at
+                                                   least this share of its rows. Defaults to 0.1.
+        manifest_dir (str, optional): The directory of the run manifest JSON files (see `pipeline_run_manifest`).
 
     Raises:
         PipelineError: If the processing pipeline fails.
     """
+    if is_duckdb(engine):
+        try:
+            start_time = time.time()
+            stats = engine.clean_pending(limit=limit, batch_size=batch_size)
+            date_counts = stats.pop("date_counts")
+            dirty_dates = stats.pop("dirty_dates")
+            if stats["cleaned"] or stats["quarantined"]:
+                stats["manifest_run_id"] = record_run_manifest(
+                    engine, "process", {"cleaned": stats["cleaned"], "quarantined": stats["quarantined"]},
+                    date_counts, dirty_dates, manifest_dir=manifest_dir
+                )["run_id"]
+            log_db(engine, "Process and Insert", "SUCCESS", f"Successfully processed and inserted {stats['cleaned']:,} records.",
+                   duration=time.time() - start_time, details=stats)
+            return
+        except Exception as e:
+            logging.error(f"Unified processing pipeline failed: {e}", exc_info=True)
+            raise PipelineError(f"Unified processing failed: {e}")
+
     try:
         logging.info("Starting parallel processing and insertion...")
         start_time = time.time()
 
         with engine.connect() as conn:
-            id_range_sql = "SELECT MIN(complaint_id), MAX(complaint_id), COUNT(complaint_id) FROM consumer_complaints_raw WHERE cleaned_timestamp IS NULL"
-            min_id, max_id, total_records = conn.execute(text(id_range_sql)).first()
+            total_records = status_count(conn, STATUS_PENDING)
 
         if not total_records or total_records == 0:
             logging.info("No new records to process. Skipping.")
@@ -408,63 +758,103 @@ def run(engine, limit=None, batch_size=50000):
         target_process_count = min(total_records, limit) if limit is not None and limit > 0 else total_records
         logging.info(f"Found {total_records:,} new records. Target for this run: {target_process_count:,}.")
 
-        num_workers = min(cpu_count(), 4)
-        partitions = create_partitions(engine, target_process_count, num_workers)
-        worker_args = [(i, part_start, part_end, engine.url, batch_size) for i, (part_start, part_end) in enumerate(partitions)]
-
-        with Pool(processes=num_workers) as pool:
-            worker_staging_tables = pool.map(processing_worker, worker_args)
-
-        worker_staging_tables = [tbl for tbl in worker_staging_tables if tbl]
-
-        total_inserted = 0
-        if worker_staging_tables:
-            indexes_to_manage = [
-                'idx_cleaned_date_received', 'idx_cleaned_date_sent', 'idx_cleaned_product_std',
-                'idx_cleaned_sub_product_std', 'idx_cleaned_issue_std', 'idx_cleaned_sub_issue_std',
-                'idx_cleaned_company', 'idx_cleaned_state_code', 'idx_cleaned_zip_code',
-                'idx_cleaned_submitted_via', 'idx_cleaned_comp_resp_std', 'idx_cleaned_pub_resp_std',
-                'idx_cleaned_consent_std', 'idx_cleaned_disputed_std', 'idx_cleaned_tags_std'
-            ]
-
-            with manage_indexes(engine, 'consumer_complaints_cleaned', indexes_to_manage):
-                logging.info(f"Consolidating data from {len(worker_staging_tables)} worker staging tables IN PARALLEL...")
-                try:
-                    consolidation_args = [(table, engine.url, batch_size) for table in worker_staging_tables]
-                    with Pool(processes=num_workers) as pool:
-                        inserted_counts = pool.map(consolidation_worker, consolidation_args)
-                    
-                    total_inserted = sum(inserted_counts)
-
-                except Exception as e:
-                    logging.error(f"Parallel consolidation failed: {e}", exc_info=True)
-                    with engine.begin() as conn_cleanup:
-                        for table_name in worker_staging_tables:
-                            conn_cleanup.execute(text(f"DROP TABLE IF EXISTS `{table_name}`;"))
-                    raise
-
-                logging.info(f"Consolidation complete. Total new unique records inserted: {total_inserted:,}")
+        num_workers = resolve_worker_count(engine, workers, stage_sizes=stage_pool_sizes)
+        # Each range task covers one batch, so the pool balances itself as workers pull the next free range.
+        range_tasks = create_range_tasks(engine, target_process_count, batch_size)
+
+        worker = processing_worker
+        if clean_engine == 'sql':
+            from pipeline_sql_cleaning import sync_mapping_tables, sync_value_dictionary
+            with engine.begin() as conn:
+                sync_mapping_tables(conn)
+                sync_value_dictionary(conn, status_filter(STATUS_PENDING, "r.complaint_id"), {})
+            worker = sql_processing_worker
+
+        # Split the cores between the worker processes for the batched content_hash threads.
+        hash_threads = max(1, cpu_count() // num_workers)
+        worker_args = [
+            (i, part_start, part_end, engine.url, batch_size, staging_writer, read_mode, hash_threads, skip_unchanged)
+            for i, (part_start, part_end) in enumerate(range_tasks)
+        ]
+
+        indexes_to_manage = [
+            'idx_cleaned_date_received', 'idx_cleaned_date_sent', 'idx_cleaned_product_std',
+            'idx_cleaned_sub_product_std', 'idx_cleaned_issue_std', 'idx_cleaned_sub_issue_std',
+            'idx_cleaned_company', 'idx_cleaned_state_code', 'idx_cleaned_zip_code',
+            'idx_cleaned_submitted_via', 'idx_cleaned_comp_resp_std', 'idx_cleaned_pub_resp_std',
+            'idx_cleaned_consent_std', 'idx_cleaned_disputed_std', 'idx_cleaned_tags_std'
+        ]
+        worker_staging_tables = []
+
+        def consolidation_args(index, results):
+            staging_table, _ = results[0]
+            if not staging_table:
+                return None
+            worker_staging_tables.append(staging_table)
+            return (staging_table, engine.url, batch_size, hash_storage)
+
+        def timestamp_args(index, results):
+            _, part_start, part_end, *_ = worker_args[index]
+            return (index, part_start, part_end, engine.url, batch_size)
+
+        # Each range is consolidated as soon as it is staged and its raw rows are marked as soon as it is
+        # consolidated, so the three steps overlap instead of waiting for each other.
+        clean_pool, consolidate_pool, timestamp_pool = stage_pool_sizes(num_workers)
+        stages = [
+            ("Clean", worker, clean_pool, None),
+            ("Consolidate", consolidation_worker, consolidate_pool, consolidation_args),
+            ("Timestamp", timestamp_worker, timestamp_pool, timestamp_args),
+        ]
+        with manage_indexes(
+            engine, 'consumer_complaints_cleaned', indexes_to_manage,
+            expected_rows=target_process_count, threshold=index_rebuild_threshold
+        ) as index_stats:
+            try:
+                stage_results = run_stage_graph(
+                    stages, worker_args, "Process and Insert", initializer=init_worker, initargs=(engine.url, setup_logging)
+                )
+            except Exception as e:
+                logging.error(f"Streaming processing failed: {e}", exc_info=True)
+                with engine.begin() as conn_cleanup:
+                    for table_name in worker_staging_tables:
+                        conn_cleanup.execute(text(f"DROP TABLE IF EXISTS `{table_name}`;"))
+                raise
+
+        total_skipped = sum(skipped for (_, skipped), _, _ in stage_results)
+        if skip_unchanged:
+            logging.info(f"Skipped {total_skipped:,} unchanged records before staging.")
+        total_inserted = sum(inserted or 0 for _, inserted, _ in stage_results)
+        logging.info(f"Consolidation complete. Total new unique records inserted: {total_inserted:,}")
+        total_marked = sum(marked[0] for _, _, marked in stage_results if marked)
+        logging.info(f"Timestamping complete. Total records marked as cleaned: {total_marked:,}")
+        date_counts = {}
+        dirty_dates = set()
+        for _, _, marked in stage_results:
+            for day, rows in (marked[1] if marked else {}).items():
+                date_counts[day] = date_counts.get(day, 0) + rows
+            dirty_dates.update(marked[2] if marked else ())
+        manifest = record_run_manifest(
+            engine, "process", {"inserted": total_inserted, "marked": total_marked, "skipped_unchanged": total_skipped},
+            date_counts, dirty_dates, manifest_dir=manifest_dir
+        )
 
         details = {
             "total_records_inserted": total_inserted,
             "target_record_count": target_process_count,
-            "batch_size_per_worker": batch_size
+            "batch_size_per_worker": batch_size,
+            "staging_writer": staging_writer,
+            "read_mode": read_mode,
+            "hash_storage": hash_storage,
+            "skipped_unchanged": total_skipped,
+            "clean_engine": clean_engine,
+            "num_workers": num_workers,
+            "range_tasks": len(range_tasks),
+            "index_maintenance": index_stats,
+            "manifest_run_id": manifest["run_id"]
         }
-        
+
         total_duration = time.time() - start_time
         logging.info(f"Parallel processing and insertion complete in {total_duration:.2f}s.")
-        
-        if worker_staging_tables:
-            logging.info("Starting PARALLEL UPDATE for cleaned_timestamp on raw records...")
-            timestamp_args = [(i, part_start, part_end, engine.url, batch_size) for i, (part_start, part_end) in enumerate(partitions)]
-            
-            with Pool(processes=num_workers) as pool:
-                updated_counts = pool.map(timestamp_worker, timestamp_args)
-            
-            total_marked = sum(updated_counts)
-            logging.info(f"Timestamping complete. Total records marked as cleaned: {total_marked:,}")
-
-
 
         log_db(engine, "Process and Insert", "SUCCESS", f"Successfully processed and inserted {total_inserted:,} records.", duration=total_duration, details=details)
 
@@ -0,0 +1,140 @@
+"""
+Incrementally maintained daily aggregates of `fact_complaints`.
+
+The dashboard's headline measures (`Complaints`, `Untimely Response Complaints`, `Monetary Relief Complaints`
+and the disputed rates) only group complaints by received date, product, company, state, company response,
+disputed status and timeliness. `agg_daily_complaints` keeps the number of complaints for every such group,
+so the dashboard can import it instead of the whole fact table.
+
+The table is never rebuilt. Every transaction that writes fact rows also applies their delta:
+1. `retract_facts` subtracts the current fact rows of the batch (complaints being re-modeled),
+2. the fact rows are upserted,
+3. `apply_facts` adds the new fact rows of the batch.
+A re-modeled complaint therefore moves from its old group to its new one, and a retried batch nets to zero.
+Writers must hold the fact load lock (`fact_load_lock`), so concurrent deltas cannot deadlock on the same groups.
+`seed_aggregates` fills the table once from existing facts, the first time it is created.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import text
+
+AGGREGATE_TABLE = 'agg_daily_complaints'
+# Serializes writes to fact_complaints and agg_daily_complaints across workers and steps.
+FACT_LOAD_LOCK = 'fact_complaints_load'
+FACT_LOAD_LOCK_TIMEOUT = 600
+
+# Fact columns of the aggregate grain. NULL keys are stored as 0, a NULL timely_response as -1.
+GRAIN_COLUMNS = (
+    'date_received_key', 'product_key', 'company_key', 'state_key',
+    'company_response_key', 'disputed_key', 'timely_response',
+)
+UNKNOWN_TIMELY_RESPONSE = -1
+
+_GRAIN_SQL = ', '.join(f"`{column}`" for column in GRAIN_COLUMNS)
+_GRAIN_SELECT_SQL = ', '.join(
+    f"COALESCE(f.`{column}`, {UNKNOWN_TIMELY_RESPONSE if column == 'timely_response' else 0})"
+    for column in GRAIN_COLUMNS
+)
+
+
+@contextmanager
+def fact_load_lock(conn, log_prefix):
+    """
+    Holds the named lock that serializes loads into `fact_complaints` and `agg_daily_complaints` across workers.
+
+    The lock is session-scoped, so it is released only after the load's transaction has committed.
+    Serialized loads cannot deadlock on the unique `complaint_id` index, the foreign key checks or the
+    aggregate groups they share, which is what the per-worker staging tables originally avoided.
+
+    Raises:
+        TimeoutError: If the lock is not acquired within `FACT_LOAD_LOCK_TIMEOUT` seconds.
+    """
+    wait_start = time.time()
+    acquired = conn.execute(
+        text("SELECT GET_LOCK(:name, :timeout)"), {"name": FACT_LOAD_LOCK, "timeout": FACT_LOAD_LOCK_TIMEOUT}
+    ).scalar()
+    conn.commit()
+    if acquired != 1:
+        raise TimeoutError(f"{log_prefix} Timed out after {FACT_LOAD_LOCK_TIMEOUT}s waiting for lock '{FACT_LOAD_LOCK}'.")
+    logging.info(f"{log_prefix} Acquired fact load lock after {time.time() - wait_start:.2f}s.")
+    try:
+        yield
+    finally:
+        conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": FACT_LOAD_LOCK})
+        conn.commit()
+
+
+@lru_cache(maxsize=None)
+def _delta_sql(sign, join_sql, where_sql):
+    """Returns the compiled upsert that adds (`sign` 1) or subtracts (-1) the selected fact rows."""
+    return text(f"""
+        INSERT INTO {AGGREGATE_TABLE} ({_GRAIN_SQL}, complaint_count)
+        SELECT {_GRAIN_SELECT_SQL}, {int(sign)} * COUNT(*)
+        FROM fact_complaints f
+        {join_sql}
+        WHERE {where_sql}
+        GROUP BY {_GRAIN_SELECT_SQL}
+        ON DUPLICATE KEY UPDATE complaint_count = complaint_count + VALUES(complaint_count)
+    """)
+
+
+def _batch_scope(id_table):
+    join_sql = f"JOIN `{id_table}` b ON b.complaint_id = f.complaint_id"
+    return join_sql, "f.complaint_id > :after_id AND f.complaint_id <= :last_id"
+
+
+def retract_facts(conn, id_table, after_id, last_id):
+    """
+    Subtracts the fact rows of a batch from the aggregates, before the batch's facts are upserted.
+
+    Args:
+        conn: An active SQLAlchemy connection, in the transaction that writes the facts.
+        id_table (str): A table whose `complaint_id` column lists the complaints of the batch
+                        (the modeling queue or a fact staging table).
+        after_id (int): The batch covers IDs above this one ...
+        last_id (int): ... up to and including this one.
+
+    Returns:
+        int: Rows affected in the aggregate table.
+    """
+    join_sql, where_sql = _batch_scope(id_table)
+    return conn.execute(_delta_sql(-1, join_sql, where_sql), {"after_id": after_id, "last_id": last_id}).rowcount
+
+
+def apply_facts(conn, id_table, after_id, last_id):
+    """Adds the fact rows of a batch to the aggregates, after the batch's facts are upserted. See `retract_facts`."""
+    join_sql, where_sql = _batch_scope(id_table)
+    return conn.execute(_delta_sql(1, join_sql, where_sql), {"after_id": after_id, "last_id": last_id}).rowcount
+
+
+def prune_empty_groups(conn):
+    """Deletes the groups whose complaints have all moved to other groups."""
+    return conn.execute(text(f"DELETE FROM {AGGREGATE_TABLE} WHERE complaint_count = 0")).rowcount
+
+
+def seed_aggregates(conn):
+    """
+    Fills the aggregates from the existing fact rows the first time they are used.
+
+    Does nothing once the aggregate table has rows (or there are no facts yet), so it is cheap to call on
+    every setup.
+    """
+    if conn.execute(text(f"SELECT 1 FROM {AGGREGATE_TABLE} LIMIT 1")).first() is not None:
+        return 0
+    if conn.execute(text("SELECT 1 FROM fact_complaints LIMIT 1")).first() is None:
+        return 0
+    logging.info(f"[Aggregates] Seeding {AGGREGATE_TABLE} from fact_complaints...")
+    start = time.time()
+    seeded = conn.execute(_delta_sql(1, "", "1 = 1")).rowcount
+    logging.info(f"[Aggregates] Seeded {seeded:,} daily groups in {time.time() - start:.2f}s.")
+    return seeded
+
+
+def aggregate_stats(conn):
+    """Returns the number of groups and the complaints they count."""
+    groups, complaints = conn.execute(
+        text(f"SELECT COUNT(*), COALESCE(SUM(complaint_count), 0) FROM {AGGREGATE_TABLE}")
+    ).first()
+    return {"groups": int(groups), "complaints": int(complaints)}
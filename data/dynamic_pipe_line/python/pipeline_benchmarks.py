@@ -0,0 +1,976 @@
+"""
+Micro-benchmarks for individual pipeline components.
+
+Each benchmark runs against the database configured in `.db_config.env` (through the engine built by
+`run_pipeline`), prints a small results table and records the results in `pipeline_logs` under the
+'Benchmark' step so that runs can be compared over time.
+
+Usage:
+    python pipeline_benchmarks.py staging-writer --rows 200000 --batch_size 50000
+    python pipeline_benchmarks.py read-memory --rows 500000 --batch_size 20000
+    python pipeline_benchmarks.py clean --rows 200000 [--from-db]
+    python pipeline_benchmarks.py clean-engine-parity --rows 100000
+    python pipeline_benchmarks.py skip-unchanged --rows 20000
+    python pipeline_benchmarks.py modeling-setup --rows 10000000 --delta 10000
+    python pipeline_benchmarks.py download --size-mb 8 --workers 4
+
+The `clean` benchmark runs on a generated fixture without a database unless `--from-db` is given. The
+`skip-unchanged` and `download` checks need no database either; the latter runs the ranged downloader against
+a local stand-in server.
+"""
+import argparse
+import logging
+import multiprocessing
+import sys
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, create_engine
+from pipeline_logger import log_db, setup_logging
+from pipeline_utils import PipelineError, READ_MODES, iter_dataframe_batches
+from pipeline_staging_writer import STAGING_WRITERS, get_staging_writer, create_staging_table, CLEANED_COLUMN_TYPES
+from dynamic_pipeline_process_and_insert import RAW_SOURCE_COLUMNS, UnchangedRowIndex, clean_dataframe, output_hashes
+from pipeline_standardization import log_lookup_stats
+from pipeline_sql_cleaning import clean_range_in_database, sync_mapping_tables, sync_value_dictionary
+from pipeline_processing_status import STATUS_CLEANED, STATUS_MODELED
+from pipeline_downloader import DownloadError, download_file
+import data_standardization_mappings as mappings
+
+
+def _load_raw_sample(engine, rows):
+    """Reads the first `rows` raw complaints, the same columns the cleaning workers read."""
+    query = text(f"""
+        SELECT {', '.join(RAW_SOURCE_COLUMNS)}
+        FROM consumer_complaints_raw
+        ORDER BY complaint_id
+        LIMIT :rows
+    """)
+    with engine.connect() as conn:
+        return pd.read_sql_query(query, conn, params={"rows": rows})
+
+
+def _log_results(engine, name, results):
+    """Prints a results table and stores it in `pipeline_logs`."""
+    logging.info(f"[Benchmark] {name}:")
+    for result in results:
+        logging.info(
+            "[Benchmark]   " + ", ".join([f"{key}={value:,.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()])
+        )
+    log_db(engine, "Benchmark", "INFO", f"{name} benchmark completed.", details={"benchmark": name, "results": results})
+
+
+def benchmark_staging_writers(engine, rows=100000, batch_size=50000, writers=STAGING_WRITERS, repeats=3):
+    """
+    Compares the rows/s of the staging writers on real cleaned data.
+
+    Every repeat writes the same cleaned sample, in `batch_size` chunks, into a fresh staging table that is
+    dropped afterwards, so the measurement covers exactly what `processing_worker` does per partition.
+
+    Returns:
+        list: One dict per writer with the best-of-`repeats` duration and rows/s.
+    """
+    df_cleaned, _ = clean_dataframe(_load_raw_sample(engine, rows))
+    if df_cleaned.empty:
+        logging.warning("[Benchmark] No raw rows available to benchmark the staging writers.")
+        return []
+    batches = [df_cleaned.iloc[i:i + batch_size] for i in range(0, len(df_cleaned), batch_size)]
+
+    results = []
+    for writer_name in writers:
+        durations = []
+        for _ in range(repeats):
+            table_name = f"bench_staging_{writer_name}_{uuid.uuid4().hex[:8]}"
+            writer = get_staging_writer(writer_name, table_name)
+            try:
+                with engine.connect() as conn:
+                    with conn.begin():
+                        start = time.perf_counter()
+                        for batch in batches:
+                            writer.write(conn, batch)
+                    durations.append(time.perf_counter() - start)
+            finally:
+                with engine.begin() as conn:
+                    conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}`;"))
+        best = min(durations)
+        results.append({
+            "writer": writer_name,
+            "rows": len(df_cleaned),
+            "best_seconds": best,
+            "rows_per_second": len(df_cleaned) / best if best else 0.0,
+        })
+
+    baseline = next((r for r in results if r["writer"] == 'to_sql'), None)
+    if baseline and baseline["rows_per_second"]:
+        for result in results:
+            result["speedup_vs_to_sql"] = result["rows_per_second"] / baseline["rows_per_second"]
+    _log_results(engine, "staging-writer", results)
+    return results
+
+
+def legacy_clean_dataframe(df):
+    """
+    The original row-at-a-time `clean_dataframe`, kept verbatim as the reference for parity and speed checks.
+
+    This function handles data validation, type conversion, value standardization via mapping tables, and the creation of a content hash for deduplication. Invalid rows are separated and returned for quarantining.
+
+    Args:
+        df (pd.DataFrame): The raw DataFrame to be cleaned.
+
+    Returns:
+        tuple: A tuple containing:
+            - pd.DataFrame: The cleaned and standardized DataFrame.
+            - pd.DataFrame or None: A DataFrame of quarantined rows, or None if no rows were quarantined.
+    """
+    # Explicitly create a copy to avoid SettingWithCopyWarning.
+    df = df.copy()
+
+    quarantined_dfs = []
+
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].str.strip()
+            
+    if 'zip_code' in df.columns:
+        null_zip_mask = df['zip_code'].isnull() | (df['zip_code'] == '')
+        if null_zip_mask.any():
+            quarantined = df[null_zip_mask].copy()
+            quarantined['quarantine_reason'] = "Null or empty zip_code"
+            quarantined_dfs.append(quarantined)
+            df = df[~null_zip_mask]
+        
+        sanitized_zips = df['zip_code'].str.replace(r'[^\dXx-]', '', regex=True)
+        
+        valid_zip_pattern = r'^(\d{5}|\d{3}XX|XXXXX|\d{9}|\d{5}-\d{4})$'
+        
+        invalid_zip_mask = ~sanitized_zips.str.match(valid_zip_pattern, na=False)
+        if invalid_zip_mask.any():
+            quarantined = df[invalid_zip_mask].copy()
+            quarantined['quarantine_reason'] = "Invalid zip code format"
+            quarantined_dfs.append(quarantined)
+            df = df[~invalid_zip_mask]
+        df['zip_code'] = sanitized_zips[~invalid_zip_mask]
+
+
+    # --- Type Conversion and Standardization ---
+    if 'company' in df.columns:
+        df['company'] = df['company'].str.title()
+
+    original_date_received = df['date_received']
+    df['date_received'] = pd.to_datetime(original_date_received, errors='coerce', format='%Y-%m-%d')
+
+    invalid_date_mask = df['date_received'].isnull() & original_date_received.notnull() & (original_date_received != '')
+    if invalid_date_mask.any():
+        quarantined = df[invalid_date_mask].copy()
+        quarantined['quarantine_reason'] = "Invalid or unparseable date_received"
+        quarantined['date_received'] = original_date_received[invalid_date_mask]
+        quarantined_dfs.append(quarantined)
+        df = df[~invalid_date_mask]
+
+    df['date_received'] = df['date_received'].dt.date
+
+    original_date_sent = df['date_sent_to_company']
+    df['date_sent_to_company'] = pd.to_datetime(original_date_sent, errors='coerce', format='%Y-%m-%d')
+
+    invalid_date_mask_sent = df['date_sent_to_company'].isnull() & original_date_sent.notnull() & (original_date_sent != '')
+    if invalid_date_mask_sent.any():
+        quarantined = df[invalid_date_mask_sent].copy()
+        quarantined['quarantine_reason'] = "Invalid or unparseable date_sent_to_company"
+        quarantined['date_sent_to_company'] = original_date_sent[invalid_date_mask_sent]
+        quarantined_dfs.append(quarantined)
+        df = df[~invalid_date_mask_sent]
+
+    df['date_sent_to_company'] = df['date_sent_to_company'].dt.date
+
+    # Timely Response
+    valid_timely_response = {'YES', 'NO'}
+    invalid_timely_mask = ~df['timely_response'].str.upper().isin(valid_timely_response) & df['timely_response'].notna() & (df['timely_response'] != '')
+    if invalid_timely_mask.any():
+        quarantined = df[invalid_timely_mask].copy()
+        quarantined['quarantine_reason'] = "Invalid value for timely_response"
+        quarantined_dfs.append(quarantined)
+        df = df[~invalid_timely_mask]
+    df['timely_response'] = df['timely_response'].str.upper().map({'YES': '1', 'NO': '0'})
+
+    if 'state_code' in df.columns:
+        df['state_code'] = df['state_code'].str.upper().replace(mappings.STATE_MAP)
+        
+        valid_state_codes = set(mappings.STATE_MAP.values())
+        invalid_state_mask = ~df['state_code'].isin(valid_state_codes) & df['state_code'].notnull()
+        if invalid_state_mask.any():
+            quarantined = df[invalid_state_mask].copy()
+            quarantined['quarantine_reason'] = "Invalid or non-US state code"
+            quarantined_dfs.append(quarantined)
+            df = df[~invalid_state_mask]
+        df['state_code'] = df['state_code'].fillna('N/A')
+
+    df['company_public_response_standardized'] = df['company_public_response'].replace('', pd.NA).str.upper().map(mappings.PUB_RESPONSE_MAP).fillna('N/A')
+    df['company_public_response'] = df['company_public_response'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['company_response_to_consumer_standardized'] = df['company_response_to_consumer'].replace('', pd.NA).str.upper().map(mappings.COMP_RESPONSE_MAP).fillna('N/A')
+    df['company_response_to_consumer'] = df['company_response_to_consumer'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['tags_standardized'] = df['tags'].replace('', pd.NA).str.upper().map(mappings.TAGS_MAP).fillna('General')
+    df['tags'] = df['tags'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['consumer_consent_provided_standardized'] = df['consumer_consent_provided'].replace('', pd.NA).str.upper().map(mappings.CONSENT_MAP).fillna('N/A')
+    df['consumer_consent_provided'] = df['consumer_consent_provided'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['consumer_disputed_standardized'] = df['consumer_disputed'].replace('', pd.NA).str.upper().map(mappings.DISPUTED_MAP).fillna('N/A')
+    df['consumer_disputed'] = df['consumer_disputed'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['consumer_complaint_narrative'] = df['consumer_complaint_narrative'].replace(r'^\s*$', pd.NA, regex=True).fillna('None')
+
+    df['product_standardized'] = df['product'].replace('', pd.NA).str.upper().map(mappings.PRODUCT_MAP).fillna('N/A')
+    df['product'] = df['product'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['issue_standardized'] = df['issue'].replace('', pd.NA).str.upper().map(mappings.ISSUE_MAP).fillna('Other/Miscellaneous')
+    df['issue'] = df['issue'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['sub_product_standardized'] = df['sub_product'].replace('', pd.NA).str.upper().map(mappings.SUB_PRODUCT_MAP).fillna('N/A')
+    df['sub_product'] = df['sub_product'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    df['sub_issue_standardized'] = df['sub_issue'].replace('', pd.NA).str.upper().map(mappings.SUB_ISSUE_MAP).fillna('General/Miscellaneous')
+    df['sub_issue'] = df['sub_issue'].replace(r'^\s*$', pd.NA, regex=True).fillna('N/A')
+
+    hash_cols = [
+        'date_received', 'product_standardized', 'sub_product_standardized',
+        'issue_standardized', 'sub_issue_standardized', 'consumer_complaint_narrative', 'company'
+    ]
+    df_for_hash = df[hash_cols].fillna('').astype(str)
+    
+    combined_string_series = df_for_hash[hash_cols[0]].str.cat(df_for_hash[hash_cols[1:]], sep='||')
+    df['content_hash'] = combined_string_series.apply(lambda x: hashlib.sha256(x.encode('utf-8')).hexdigest())
+
+    final_cols = [
+        'date_received', 'product', 'product_standardized', 'sub_product', 'sub_product_standardized',
+        'issue', 'issue_standardized', 'sub_issue', 'sub_issue_standardized', 'consumer_complaint_narrative',
+        'company_public_response', 'company', 'state_code', 'zip_code', 'tags', 'tags_standardized',
+        'consumer_consent_provided', 'consumer_consent_provided_standardized', 'submitted_via',
+        'date_sent_to_company', 'company_response_to_consumer', 'company_response_to_consumer_standardized', 'timely_response',
+        'consumer_disputed', 'consumer_disputed_standardized', 'company_public_response_standardized', 'complaint_id',
+        'content_hash'
+    ]
+    df_final = df[[col for col in final_cols if col in df.columns]]
+
+    if quarantined_dfs:
+        final_quarantined_df = pd.concat(quarantined_dfs, ignore_index=True)
+        return df_final, final_quarantined_df
+    else:
+        return df_final, None
+
+
+# Raw values that exercise every cleaning rule: padding, case, empties, NULLs, unmapped and invalid values.
+_FIXTURE_VALUES = {
+    'date_received': ['2023-01-15', ' 2022-12-01 ', '2021-2-3', '2023-13-01', 'not a date', '', None],
+    'date_sent_to_company': ['2023-01-16', '2022-12-02 ', '', None, '2023/01/16'],
+    'zip_code': ['12345', ' 123XX', 'XXXXX', '123456789', '12345-6789', '12 345', '1234', 'ABCDE', '', None],
+    'state_code': ['CA', ' ny', 'California', 'district of columbia', 'ZZ', '', None],
+    'timely_response': ['Yes', 'No', ' yes ', 'NO', 'maybe', '', None],
+    'company': ['EQUIFAX, INC.', 'bank of america, national association', " o'reilly credit ", '', None],
+    'submitted_via': ['Web', ' Phone', 'Referral', '', None],
+    'consumer_complaint_narrative': [
+        'I was charged twice.', '  padded narrative  ', 'He said "stop"\nand hung up.', 'NULL', '   ', '', None,
+        'Unicode \u00e9t\u00e9 \u2013 dash', 'back\\slash, comma',
+    ],
+}
+
+
+def build_clean_fixture(rows=20000, seed=7):
+    """
+    Builds a deterministic raw DataFrame for `clean_dataframe` parity and throughput checks.
+
+    Standardized columns draw from their mapping keys (in mixed case and padding) plus unmapped, empty and
+    NULL values; the other columns draw from `_FIXTURE_VALUES`.
+    """
+    rng = np.random.default_rng(seed)
+    mapped_pools = {
+        'product': mappings.PRODUCT_MAP, 'sub_product': mappings.SUB_PRODUCT_MAP, 'issue': mappings.ISSUE_MAP,
+        'sub_issue': mappings.SUB_ISSUE_MAP, 'tags': mappings.TAGS_MAP, 'consumer_consent_provided': mappings.CONSENT_MAP,
+        'consumer_disputed': mappings.DISPUTED_MAP, 'company_public_response': mappings.PUB_RESPONSE_MAP,
+        'company_response_to_consumer': mappings.COMP_RESPONSE_MAP,
+    }
+    data = {}
+    for col in RAW_SOURCE_COLUMNS:
+        if col == 'complaint_id':
+            data[col] = np.arange(1, rows + 1)
+            continue
+        if col in mapped_pools:
+            keys = list(mapped_pools[col])
+            pool = keys + [k.title() for k in keys] + [f" {k.lower()} " for k in keys[:3]] + ['Something unmapped', '', None]
+        else:
+            pool = _FIXTURE_VALUES[col]
+        # Mostly valid values so that the cleaned frame is large, with a steady trickle of edge cases.
+        picks = rng.integers(0, len(pool), size=rows)
+        valid = rng.random(rows) < 0.9
+        data[col] = [pool[0] if is_valid and col in _FIXTURE_VALUES else pool[i] for i, is_valid in zip(picks, valid)]
+    return pd.DataFrame(data)
+
+
+def check_clean_parity(df):
+    """
+    Compares `clean_dataframe` with the legacy implementation by their CSV serialization.
+
+    Returns:
+        tuple: (bool, str) whether cleaned and quarantined output are byte-identical, and a description of
+               the first difference if they are not.
+    """
+    expected_cleaned, expected_quarantined = legacy_clean_dataframe(df)
+    actual_cleaned, actual_quarantined = clean_dataframe(df)
+    for label, expected, actual in (
+        ("cleaned", expected_cleaned, actual_cleaned),
+        ("quarantined", expected_quarantined, actual_quarantined),
+    ):
+        expected_csv = expected.to_csv(index=True) if expected is not None else None
+        actual_csv = actual.to_csv(index=True) if actual is not None else None
+        if expected_csv != actual_csv:
+            if expected_csv is None or actual_csv is None:
+                return False, f"{label}: expected {'no' if expected_csv is None else 'some'} rows."
+            for line_no, (a, b) in enumerate(zip(expected_csv.splitlines(), actual_csv.splitlines())):
+                if a != b:
+                    return False, f"{label} line {line_no}: expected {a!r}, got {b!r}"
+            return False, f"{label}: expected {len(expected):,} rows, got {len(actual):,}."
+    return True, ""
+
+
+def check_skip_unchanged(rows=20000, seed=7):
+    """
+    Checks that `--skip-unchanged` skips exactly the re-queued rows whose cleaned output is unchanged.
+
+    The fixture is cleaned once and indexed as `UnchangedRowIndex.load` would find it in the cleaned table.
+    It is then re-queued with a new source `row_hash` for every row, as delta ingestion does after any raw
+    change: a quarter of the rows differ only in padding that cleaning strips, a quarter keep their raw values,
+    a quarter get a new narrative and a quarter only a corrected company response and disputed flag. Only
+    the last two may be cleaned again.
+
+    Returns:
+        dict: Row counts of the re-queued rows, and how many were skipped.
+
+    Raises:
+        PipelineError: If an unchanged row is not skipped or a changed one is.
+    """
+    raw = build_clean_fixture(rows, seed)
+    cleaned, _ = clean_dataframe(raw)
+    cleaned['output_hash'] = output_hashes(cleaned)
+    index = UnchangedRowIndex.from_cleaned(cleaned)
+
+    requeued = raw.copy()
+    group = requeued['complaint_id'] % 4
+    padded = group == 0
+    requeued.loc[padded, 'company'] = "  " + requeued.loc[padded, 'company'].fillna('') + "  "
+    narrative_changed = group == 2
+    requeued.loc[narrative_changed, 'consumer_complaint_narrative'] = (
+        "Corrected narrative of complaint " + requeued.loc[narrative_changed, 'complaint_id'].astype(str)
+    )
+    response_changed = group == 3
+    requeued.loc[response_changed, 'company_response_to_consumer'] = (
+        "Corrected response " + requeued.loc[response_changed, 'complaint_id'].astype(str)
+    )
+    requeued.loc[response_changed, 'consumer_disputed'] = requeued.loc[response_changed, 'consumer_disputed'].map(
+        lambda value: 'No' if value == 'Yes' else 'Yes'
+    )
+    requeued_cleaned, _ = clean_dataframe(requeued)
+    requeued_cleaned['source_row_hash'] = [str(seed * rows + i) for i in range(len(requeued_cleaned))]
+    requeued_cleaned['output_hash'] = output_hashes(requeued_cleaned)
+
+    unchanged = index.unchanged_mask(requeued_cleaned)
+    changed_ids = requeued.loc[narrative_changed | response_changed, 'complaint_id']
+    expected = ~requeued_cleaned['complaint_id'].isin(changed_ids).to_numpy()
+    response_only = requeued_cleaned['complaint_id'].isin(requeued.loc[response_changed, 'complaint_id']).to_numpy()
+    result = {
+        "requeued": len(requeued_cleaned),
+        "content_unchanged": int(expected.sum()),
+        "skipped": int(unchanged.sum()),
+        "response_only_changes": int(response_only.sum()),
+        "response_only_skipped": int((unchanged & response_only).sum()),
+        "skipped_wrongly": int((unchanged & ~expected).sum()),
+        "reprocessed_wrongly": int((~unchanged & expected).sum()),
+    }
+    if result["skipped_wrongly"] or result["reprocessed_wrongly"]:
+        raise PipelineError(f"--skip-unchanged skipped the wrong rows: {result}")
+    logging.info(
+        f"[Benchmark] --skip-unchanged skipped {result['skipped']:,} of {result['requeued']:,} re-queued rows "
+        f"with new source row hashes; the {result['requeued'] - result['skipped']:,} changed ones (including "
+        f"{result['response_only_changes']:,} response-only corrections) are cleaned again."
+    )
+    return result
+
+
+def benchmark_clean_dataframe(rows=200000, repeats=3, df=None):
+    """
+    Checks parity with the legacy cleaner, then compares rows/s of the two implementations.
+
+    Returns:
+        list: One dict per implementation with the best-of-`repeats` duration and rows/s.
+    """
+    df = build_clean_fixture(rows) if df is None else df
+    identical, difference = check_clean_parity(df)
+    if not identical:
+        raise PipelineError(f"clean_dataframe output differs from the legacy implementation: {difference}")
+    logging.info(f"[Benchmark] clean_dataframe output is byte-identical to the legacy implementation on {len(df):,} rows.")
+
+    results = []
+    for name, func in (("legacy", legacy_clean_dataframe), ("vectorized", clean_dataframe)):
+        durations = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(df)
+            durations.append(time.perf_counter() - start)
+        best = min(durations)
+        results.append({"implementation": name, "rows": len(df), "best_seconds": best, "rows_per_second": len(df) / best})
+    results[1]["speedup_vs_legacy"] = results[1]["rows_per_second"] / results[0]["rows_per_second"]
+    log_lookup_stats("[Benchmark]")
+    return results
+
+
+def _rows_missing_from(conn, table_name, other_table):
+    """Counts the rows of `table_name` without an identical row (every column, NULL-safe, byte-exact) in `other_table`."""
+    same_row = ' AND '.join(
+        f"CAST(a.`{col}` AS BINARY) <=> CAST(b.`{col}` AS BINARY)" for col, _ in CLEANED_COLUMN_TYPES
+    )
+    missing_sql = f"""
+        FROM `{table_name}` a
+        LEFT JOIN `{other_table}` b ON b.complaint_id = a.complaint_id AND {same_row}
+        WHERE b.complaint_id IS NULL
+    """
+    count = conn.execute(text(f"SELECT COUNT(*) {missing_sql}")).scalar_one()
+    sample = conn.execute(text(f"SELECT a.complaint_id {missing_sql} ORDER BY a.complaint_id LIMIT 5")).scalars().all()
+    return count, sample
+
+
+def check_clean_engine_parity(engine, rows=100000, batch_size=50000):
+    """
+    Cleans the first `rows` raw complaints with both cleaning engines and compares the cleaned rows.
+
+    Each engine writes to its own scratch staging table, exactly as its workers would before consolidation;
+    nothing is written to `consumer_complaints_cleaned` or the quarantine table, and raw rows are cleaned
+    regardless of their processing status.
+
+    Returns:
+        dict: Row counts, rows found in only one of the outputs and the duration of each engine.
+
+    Raises:
+        PipelineError: If the engines' outputs differ.
+    """
+    with engine.connect() as conn:
+        start_id, end_id = conn.execute(text("""
+            SELECT MIN(complaint_id), MAX(complaint_id) FROM (
+                SELECT complaint_id FROM consumer_complaints_raw ORDER BY complaint_id LIMIT :rows
+            ) AS t
+        """), {"rows": rows}).first()
+    if start_id is None:
+        logging.warning("[Benchmark] No raw rows available to compare the cleaning engines.")
+        return {}
+
+    suffix = uuid.uuid4().hex[:8]
+    pandas_table, sql_table = f"parity_pandas_{suffix}", f"parity_sql_{suffix}"
+    params = {"start_id": start_id, "end_id": end_id}
+    try:
+        start = time.perf_counter()
+        writer = get_staging_writer('to_sql', pandas_table)
+        read_columns = RAW_SOURCE_COLUMNS + ['CAST(row_hash AS CHAR) AS row_hash']
+        with engine.connect() as conn:
+            with conn.begin():
+                create_staging_table(conn, pandas_table)
+                for df_raw in iter_dataframe_batches(
+                    engine, read_columns, 'consumer_complaints_raw', "complaint_id BETWEEN :start_id AND :end_id",
+                    params, batch_size, read_mode='keyset'
+                ):
+                    source_row_hashes = df_raw.pop('row_hash')
+                    df_cleaned, _ = clean_dataframe(df_raw)
+                    df_cleaned['source_row_hash'] = source_row_hashes.reindex(df_cleaned.index)
+                    df_cleaned['output_hash'] = output_hashes(df_cleaned)
+                    writer.write(conn, df_cleaned)
+        pandas_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            sync_mapping_tables(conn)
+            sync_value_dictionary(conn, "r.complaint_id BETWEEN :start_id AND :end_id", params)
+            create_staging_table(conn, sql_table)
+            clean_range_in_database(conn, sql_table, start_id, end_id, pending_only=False, quarantine=False)
+        sql_seconds = time.perf_counter() - start
+
+        with engine.connect() as conn:
+            pandas_rows = conn.execute(text(f"SELECT COUNT(*) FROM `{pandas_table}`")).scalar_one()
+            sql_rows = conn.execute(text(f"SELECT COUNT(*) FROM `{sql_table}`")).scalar_one()
+            only_pandas, only_pandas_sample = _rows_missing_from(conn, pandas_table, sql_table)
+            only_sql, only_sql_sample = _rows_missing_from(conn, sql_table, pandas_table)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS `{pandas_table}`;"))
+            conn.execute(text(f"DROP TABLE IF EXISTS `{sql_table}`;"))
+
+    result = {
+        "raw_rows": rows,
+        "pandas_rows": pandas_rows,
+        "sql_rows": sql_rows,
+        "only_in_pandas": only_pandas,
+        "only_in_sql": only_sql,
+        "pandas_seconds": pandas_seconds,
+        "sql_seconds": sql_seconds,
+    }
+    _log_results(engine, "clean-engine-parity", [result])
+    if only_pandas or only_sql:
+        raise PipelineError(
+            f"Cleaning engines differ: {only_pandas:,} rows only in pandas output (e.g. complaint IDs {only_pandas_sample}), "
+            f"{only_sql:,} only in SQL output (e.g. {only_sql_sample})."
+        )
+    logging.info(f"[Benchmark] Both cleaning engines produced the same {pandas_rows:,} cleaned rows.")
+    return result
+
+
+def _create_modeling_fixture(conn, suffix, rows, delta, late, padding, chunk_size=1000000):
+    """
+    Creates scratch raw, cleaned and status tables of `rows` complaints, all modeled except the last `delta`
+    complaints and `late` late arrivals spread below them, and the late arrivals table that ingestion would have
+    recorded for them. Raw and cleaned rows carry `padding` bytes of text.
+
+    Returns:
+        dict: The scratch table names and the modeling watermark of the fixture.
+    """
+    tables = {name: f"bench_modeling_{name}_{suffix}" for name in ("digits", "raw", "cleaned", "status", "late")}
+    conn.execute(text(f"CREATE TABLE {tables['digits']} (d TINYINT NOT NULL PRIMARY KEY)"))
+    conn.execute(text(f"INSERT INTO {tables['digits']} VALUES (0), (1), (2), (3), (4), (5), (6), (7), (8), (9)"))
+    conn.execute(text(f"""
+        CREATE TABLE {tables['raw']} (
+            complaint_id INT NOT NULL PRIMARY KEY, cleaned_timestamp DATETIME NULL,
+            modeling_timestamp DATETIME NULL, consumer_complaint_narrative TEXT, KEY (modeling_timestamp)
+        )
+    """))
+    conn.execute(text(f"CREATE TABLE {tables['cleaned']} (complaint_id INT NOT NULL PRIMARY KEY, consumer_complaint_narrative TEXT)"))
+    conn.execute(text(f"""
+        CREATE TABLE {tables['status']} (
+            complaint_id INT NOT NULL PRIMARY KEY, status TINYINT UNSIGNED NOT NULL, KEY (status, complaint_id)
+        )
+    """))
+
+    watermark = rows - delta
+    pending = f"s.complaint_id > {watermark}"
+    if late:
+        late_every = max(1, watermark // late)
+        pending += f" OR (s.complaint_id % {late_every} = 0 AND s.complaint_id <= {late_every * late})"
+    digits = tables['digits']
+    sequence = f"""
+        SELECT :offset + 1 + a.d + 10 * b.d + 100 * c.d + 1000 * e.d + 10000 * f.d + 100000 * g.d AS complaint_id
+        FROM {digits} a, {digits} b, {digits} c, {digits} e, {digits} f, {digits} g
+    """
+    for offset in range(0, rows, chunk_size):
+        params = {"offset": offset, "last_id": min(rows, offset + chunk_size)}
+        conn.execute(text(f"""
+            INSERT INTO {tables['raw']}
+            SELECT s.complaint_id, NOW(), IF({pending}, NULL, NOW()), REPEAT('x', {int(padding)})
+            FROM ({sequence}) AS s WHERE s.complaint_id <= :last_id
+        """), params)
+        conn.execute(text(f"""
+            INSERT INTO {tables['cleaned']}
+            SELECT s.complaint_id, REPEAT('x', {int(padding)}) FROM ({sequence}) AS s WHERE s.complaint_id <= :last_id
+        """), params)
+        conn.execute(text(f"""
+            INSERT INTO {tables['status']}
+            SELECT s.complaint_id, IF({pending}, {STATUS_CLEANED}, {STATUS_MODELED})
+            FROM ({sequence}) AS s WHERE s.complaint_id <= :last_id
+        """), params)
+        conn.commit()
+        logging.info(f"[Benchmark] ...generated {params['last_id']:,}/{rows:,} fixture complaints.")
+    conn.execute(text(f"""
+        CREATE TABLE {tables['late']} (complaint_id INT NOT NULL PRIMARY KEY)
+        SELECT complaint_id FROM {tables['status']} WHERE status = {STATUS_CLEANED} AND complaint_id <= {watermark}
+    """))
+    conn.commit()
+    pending_count = conn.execute(text(f"SELECT COUNT(*) FROM {tables['status']} WHERE status = {STATUS_CLEANED}")).scalar_one()
+    return {**tables, "watermark": watermark, "pending": pending_count}
+
+
+def _modeling_setup_strategies(fixture, batch_size):
+    """Returns (name, [SQL statements]) for each way of discovering and planning the modeling queue."""
+    raw, cleaned, status, late, watermark = fixture['raw'], fixture['cleaned'], fixture['status'], fixture['late'], fixture['watermark']
+    queue = "{queue}"
+    return [
+        # Before record_processing_status: a JOIN count, the same JOIN into the queue, a key rebuild and NTILE.
+        ("raw-timestamps", [
+            f"SELECT COUNT(c.complaint_id) FROM {cleaned} c JOIN {raw} r ON c.complaint_id = r.complaint_id WHERE r.modeling_timestamp IS NULL",
+            f"""CREATE TABLE {queue} AS SELECT c.complaint_id FROM {cleaned} c JOIN {raw} r ON c.complaint_id = r.complaint_id
+                WHERE r.modeling_timestamp IS NULL ORDER BY c.complaint_id""",
+            f"ALTER TABLE {queue} ADD PRIMARY KEY (complaint_id)",
+            f"""SELECT partition_num, MIN(complaint_id), MAX(complaint_id) FROM (
+                    SELECT complaint_id, NTILE(4) OVER (ORDER BY complaint_id) AS partition_num FROM {queue}
+                ) AS t GROUP BY partition_num""",
+        ]),
+        # The status table: counted from the counts table (not timed), queue checked against the cleaned table.
+        ("status-table", [
+            f"""CREATE TABLE {queue} AS SELECT p.complaint_id FROM {status} p JOIN {cleaned} c ON c.complaint_id = p.complaint_id
+                WHERE p.status = {STATUS_CLEANED} ORDER BY p.complaint_id""",
+            f"ALTER TABLE {queue} ADD PRIMARY KEY (complaint_id)",
+            f"""SELECT MIN(complaint_id), MAX(complaint_id) FROM (
+                    SELECT complaint_id, (ROW_NUMBER() OVER (ORDER BY complaint_id) - 1) DIV {int(batch_size)} AS task_num FROM {queue}
+                ) AS t GROUP BY task_num""",
+        ]),
+        # The watermark: the recorded late arrivals plus a seek above the watermark, keyed queue in one statement.
+        ("watermark", [
+            f"""CREATE TABLE {queue} (complaint_id INT NOT NULL PRIMARY KEY)
+                SELECT complaint_id FROM (
+                    (SELECT l.complaint_id FROM {late} l JOIN {status} p ON p.complaint_id = l.complaint_id
+                     WHERE p.status = {STATUS_CLEANED})
+                    UNION ALL
+                    (SELECT complaint_id FROM {status} WHERE status = {STATUS_CLEANED} AND complaint_id > {watermark})
+                ) AS pending""",
+            f"""SELECT MIN(complaint_id), MAX(complaint_id) FROM (
+                    SELECT complaint_id, (ROW_NUMBER() OVER (ORDER BY complaint_id) - 1) DIV {int(batch_size)} AS task_num FROM {queue}
+                ) AS t GROUP BY task_num""",
+        ]),
+    ]
+
+
+def benchmark_modeling_setup(engine, rows=10000000, delta=10000, late=100, padding=200, batch_size=50000, repeats=3):
+    """
+    Compares the setup overhead of the modeling step (pending-set discovery, queue table and range planning)
+    for a `delta`-row daily delta on a `rows`-row table, on generated scratch tables.
+
+    Both the status table and the watermark find the pending complaints with index seeks that read only those
+    rows, so their difference is the JOIN with the cleaned table and the separate primary key build that the
+    watermark's queue statement drops. The raw-timestamp strategy shows the original JOIN scans.
+
+    Generating the fixture dominates the run time for large `rows`; the scratch tables are dropped afterwards.
+
+    Returns:
+        list: One dict per strategy with the queued rows and the best setup time.
+    """
+    suffix = uuid.uuid4().hex[:8]
+    results = []
+    with engine.connect() as conn:
+        try:
+            logging.info(f"[Benchmark] Generating a modeling fixture of {rows:,} complaints ({delta:,} new, {late:,} late)...")
+            fixture = _create_modeling_fixture(conn, suffix, rows, delta, late, padding)
+            conn.execute(text(f"ANALYZE TABLE {fixture['raw']}, {fixture['cleaned']}, {fixture['status']}, {fixture['late']}"))
+            for name, statements in _modeling_setup_strategies(fixture, batch_size):
+                queue_table = f"bench_modeling_queue_{suffix}"
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    for statement in statements:
+                        result = conn.execute(text(statement.format(queue=queue_table)))
+                        if result.returns_rows:
+                            result.fetchall()
+                    timings.append(time.perf_counter() - start)
+                    queued = conn.execute(text(f"SELECT COUNT(*) FROM {queue_table}")).scalar_one()
+                    conn.execute(text(f"DROP TABLE {queue_table}"))
+                results.append({
+                    "strategy": name, "rows": rows, "pending": fixture['pending'], "queued": queued,
+                    "setup_seconds": min(timings),
+                })
+        finally:
+            for name in ("digits", "raw", "cleaned", "status", "late", "queue"):
+                conn.execute(text(f"DROP TABLE IF EXISTS bench_modeling_{name}_{suffix}"))
+            conn.commit()
+    _log_results(engine, "modeling-setup", results)
+    return results
+
+
+def _peak_rss_mb():
+    """Peak resident set size of the current process in MB, or None where `resource` is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure_read_memory(args):
+    """Runs in a fresh process: reads the sample with one read mode and reports its memory high-water marks."""
+    db_url, read_mode, max_id, batch_size = args
+    engine = create_engine(db_url)
+    baseline_rss = _peak_rss_mb()
+    tracemalloc.start()
+    rows = batches = 0
+    start = time.perf_counter()
+    try:
+        for df_batch in iter_dataframe_batches(
+            engine, RAW_SOURCE_COLUMNS, 'consumer_complaints_raw', 'complaint_id <= :max_id', {"max_id": max_id},
+            batch_size, read_mode=read_mode
+        ):
+            rows += len(df_batch)
+            batches += 1
+            del df_batch
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        engine.dispose()
+    peak_rss = _peak_rss_mb()
+    return {
+        "read_mode": read_mode,
+        "rows": rows,
+        "batches": batches,
+        "seconds": time.perf_counter() - start,
+        "peak_python_alloc_mb": peak_bytes / (1024 * 1024),
+        "peak_rss_growth_mb": (peak_rss - baseline_rss) if peak_rss is not None else None,
+    }
+
+
+def benchmark_read_memory(engine, rows=500000, batch_size=20000, read_modes=READ_MODES):
+    """
+    Compares the peak client memory of the worker read modes over the same `rows` raw complaints.
+
+    Each mode runs in its own freshly spawned process so that peak RSS and the tracemalloc high-water mark
+    are not inherited from an earlier run. With 'stream' and 'keyset' the peak should track `batch_size`;
+    with 'buffered' it tracks `rows`.
+
+    Returns:
+        list: One dict per read mode with row/batch counts, duration and memory peaks.
+    """
+    with engine.connect() as conn:
+        max_id = conn.execute(text("""
+            SELECT MAX(complaint_id) FROM (
+                SELECT complaint_id FROM consumer_complaints_raw ORDER BY complaint_id LIMIT :rows
+            ) AS t
+        """), {"rows": rows}).scalar_one_or_none()
+    if max_id is None:
+        logging.warning("[Benchmark] No raw rows available to benchmark the read modes.")
+        return []
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for read_mode in read_modes:
+        with context.Pool(processes=1) as pool:
+            results.append(pool.apply(_measure_read_memory, ((engine.url, read_mode, max_id, batch_size),)))
+    _log_results(engine, "read-memory", results)
+    return results
+
+
+class _RangeFileHandler(BaseHTTPRequestHandler):
+    """
+    Serves `server.content` like the CFPB file host: ETag and Last-Modified validators, `304` for a matching
+    `If-None-Match`, `206` byte ranges guarded by `If-Range`, and a full `200` otherwise.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        content, etag = server.content, server.etag
+        validators = {"ETag": etag, "Last-Modified": server.last_modified}
+        if server.on_request is not None:
+            server.on_request(server)
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers=validators)
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if not range_header or not server.honour_ranges or (if_range is not None and if_range != etag):
+            return self._send(200, content, validators)
+        start, end = (int(value) for value in range_header.split("=", 1)[1].split("-"))
+        if start in server.failing_offsets:
+            return self._send(503)
+        end = min(end, len(content) - 1)
+        self._send(206, content[start:end + 1], {**validators, "Content-Range": f"bytes {start}-{end}/{len(content)}"})
+
+
+class _StandInFileServer:
+    """A local HTTP stand-in for the source file host, running `_RangeFileHandler` in a background thread."""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _RangeFileHandler)
+        self.httpd.honour_ranges = True
+        self.httpd.failing_offsets = set()
+        self.httpd.on_request = None
+        self.httpd.requests = 0
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/complaints.csv.zip"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="stand-in-file-server", daemon=True)
+
+    def publish(self, content):
+        """Replaces the served file, with new validators."""
+        self.httpd.content = content
+        self.httpd.etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        self.httpd.last_modified = formatdate(time.time(), usegmt=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def check_range_downloader(size_mb=8, range_kb=256, workers=4):
+    """
+    Runs `RangeDownloader` against a local stand-in server and checks every download path.
+
+    Scenarios: a fresh ranged download, an unchanged file (`304`), an interrupted download that resumes from
+    its saved ranges, a file replaced between the first response and the ranges (`If-Range` mismatch), and a
+    server without range support (streamed `200`). Each download's SHA256 and file content must match what
+    was served.
+
+    Returns:
+        list: One dict per scenario with the download status, requests served, bytes transferred and duration.
+
+    Raises:
+        PipelineError: If a scenario ends with the wrong status, hash or content.
+    """
+    rng = np.random.default_rng(11)
+    size = size_mb * 1024 * 1024
+    range_size = range_kb * 1024
+    results = []
+
+    with tempfile.TemporaryDirectory() as temp_dir, _StandInFileServer() as server:
+        dest_path = os.path.join(temp_dir, "complaints.csv.zip")
+        httpd = server.httpd
+
+        def _download():
+            return download_file(server.url, dest_path, workers=workers, range_size=range_size)
+
+        def _expect(scenario, result, status, content, requests_before):
+            with open(dest_path, "rb") as f:
+                on_disk = f.read()
+            if result["status"] != status:
+                raise PipelineError(f"Download check '{scenario}': expected status '{status}', got '{result['status']}'.")
+            if result["sha256"] != hashlib.sha256(content).hexdigest() or on_disk != content:
+                raise PipelineError(f"Download check '{scenario}': the downloaded file differs from the served one.")
+            results.append({
+                "scenario": scenario,
+                "status": result["status"],
+                "requests": httpd.requests - requests_before,
+                "mb_transferred": result["bytes_downloaded"] / (1024 * 1024),
+                "seconds": result["seconds"],
+            })
+
+        content = rng.bytes(size)
+        server.publish(content)
+        before = httpd.requests
+        _expect("fresh", _download(), "downloaded", content, before)
+
+        before = httpd.requests
+        _expect("unchanged", _download(), "not_modified", content, before)
+
+        # The file changes and every range in its second half fails: the first half is kept for the resume.
+        content = rng.bytes(size)
+        server.publish(content)
+        httpd.failing_offsets = set(range(size // 2, size, range_size))
+        try:
+            _download()
+            raise PipelineError("Download check 'interrupted': the download did not fail.")
+        except DownloadError:
+            pass
+        httpd.failing_offsets = set()
+        before = httpd.requests
+        _expect("resumed", _download(), "resumed", content, before)
+
+        # The file is replaced right after the first response: the If-Range ranges must not be mixed in.
+        replacement = rng.bytes(size)
+        def _replace_after_first(served):
+            served.on_request = lambda s: server.publish(replacement)
+        httpd.on_request = _replace_after_first
+        server.publish(rng.bytes(size))
+        try:
+            _download()
+            raise PipelineError("Download check 'changed-mid-download': a mixed file was accepted.")
+        except DownloadError:
+            pass
+        httpd.on_request = None
+        before = httpd.requests
+        _expect("after-change", _download(), "downloaded", replacement, before)
+
+        content = rng.bytes(size)
+        server.publish(content)
+        httpd.honour_ranges = False
+        before = httpd.requests
+        _expect("no-range-support", _download(), "downloaded", content, before)
+
+    for result in results:
+        logging.info(
+            "[Benchmark]   " + ", ".join(f"{key}={value:,.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items())
+        )
+    logging.info(f"[Benchmark] The ranged downloader passed {len(results)} scenarios against the stand-in server.")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run pipeline component benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    staging = subparsers.add_parser("staging-writer", help="Compare to_sql and LOAD DATA staging writers (rows/s).")
+    staging.add_argument("--rows", type=int, default=100000, help="Raw rows to clean and stage.")
+    staging.add_argument("--batch_size", type=int, default=50000, help="Rows per staged batch.")
+    staging.add_argument("--repeats", type=int, default=3, help="Runs per writer; the best run is reported.")
+
+    read_memory = subparsers.add_parser("read-memory", help="Compare peak client memory of the worker read modes.")
+    read_memory.add_argument("--rows", type=int, default=500000, help="Raw rows to read with each mode.")
+    read_memory.add_argument("--batch_size", type=int, default=20000, help="Rows per batch.")
+
+    clean = subparsers.add_parser("clean", help="Check clean_dataframe parity with the legacy cleaner and compare rows/s.")
+    clean.add_argument("--rows", type=int, default=200000, help="Rows to clean.")
+    clean.add_argument("--repeats", type=int, default=3, help="Runs per implementation; the best run is reported.")
+    clean.add_argument("--from-db", action="store_true", help="Clean the first raw rows from the database instead of the fixture.")
+
+    parity = subparsers.add_parser("clean-engine-parity", help="Check that the pandas and SQL cleaning engines produce identical cleaned rows.")
+    parity.add_argument("--rows", type=int, default=100000, help="Raw rows to clean with both engines.")
+    parity.add_argument("--batch_size", type=int, default=50000, help="Rows per pandas batch.")
+
+    skip = subparsers.add_parser("skip-unchanged", help="Check that --skip-unchanged skips re-queued rows with unchanged cleaned content.")
+    skip.add_argument("--rows", type=int, default=20000, help="Rows in the generated fixture.")
+
+    modeling_setup = subparsers.add_parser("modeling-setup", help="Compare the modeling queue setup overhead of a daily delta on generated tables.")
+    modeling_setup.add_argument("--rows", type=int, default=10000000, help="Complaints in the generated tables.")
+    modeling_setup.add_argument("--delta", type=int, default=10000, help="New complaints pending modeling above the watermark.")
+    modeling_setup.add_argument("--late", type=int, default=100, help="Late arrivals pending modeling below the watermark.")
+    modeling_setup.add_argument("--padding", type=int, default=200, help="Narrative bytes per generated raw and cleaned row.")
+    modeling_setup.add_argument("--batch_size", type=int, default=50000, help="Complaints per modeling range task.")
+    modeling_setup.add_argument("--repeats", type=int, default=3, help="Runs per strategy; the best run is reported.")
+
+    download = subparsers.add_parser("download", help="Check the ranged downloader against a local stand-in HTTP server.")
+    download.add_argument("--size-mb", type=int, default=8, help="Size of the served file in MB.")
+    download.add_argument("--range-kb", type=int, default=256, help="Bytes per range request, in KB.")
+    download.add_argument("--workers", type=int, default=4, help="Concurrent range requests.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark == "clean" and not args.from_db:
+        setup_logging()
+        for result in benchmark_clean_dataframe(rows=args.rows, repeats=args.repeats):
+            logging.info(f"[Benchmark]   {result}")
+        sys.exit(0)
+    if args.benchmark == "skip-unchanged":
+        setup_logging()
+        check_skip_unchanged(rows=args.rows)
+        sys.exit(0)
+    if args.benchmark == "download":
+        setup_logging()
+        check_range_downloader(size_mb=args.size_mb, range_kb=args.range_kb, workers=args.workers)
+        sys.exit(0)
+
+    from run_pipeline import get_engine
+    engine = get_engine()
+
+    if args.benchmark == "clean":
+        results = benchmark_clean_dataframe(repeats=args.repeats, df=_load_raw_sample(engine, args.rows))
+        _log_results(engine, "clean", results)
+    elif args.benchmark == "staging-writer":
+        benchmark_staging_writers(engine, rows=args.rows, batch_size=args.batch_size, repeats=args.repeats)
+    elif args.benchmark == "read-memory":
+        benchmark_read_memory(engine, rows=args.rows, batch_size=args.batch_size)
+    elif args.benchmark == "clean-engine-parity":
+        check_clean_engine_parity(engine, rows=args.rows, batch_size=args.batch_size)
+    elif args.benchmark == "modeling-setup":
+        benchmark_modeling_setup(
+            engine, rows=args.rows, delta=args.delta, late=args.late, padding=args.padding,
+            batch_size=args.batch_size, repeats=args.repeats
+        )
@@ -0,0 +1,238 @@
+"""
+In-process dimension key cache for building fact rows in Python.
+
+`populate_facts.sql` resolves the 15 surrogate keys of every batch with 15 LEFT JOINs on the VARCHAR unique
+columns of the `dim_*` tables. With `--fact-builder python`, each modeling worker process instead loads every
+dimension once into a `{member: key}` dict (`DimensionKeyCache`) and maps the cleaned columns of a batch to
+keys with vectorized `Series.map` calls; the worker then bulk loads the finished fact rows. The per-batch
+cost is linear in the batch rows and does not depend on dimension size.
+
+Members missing from a cache are looked up in the database before they are counted as misses, so values that
+the column collation treats as equal (e.g. a different case) resolve to the same key as the SQL joins would.
+Members that are still missing are inserted in one `INSERT IGNORE` per dimension and their keys are read
+back. `dim_date` members carry derived calendar columns and are only created by `populate_dimensions.sql`,
+which runs for the whole queue before the workers start.
+"""
+import logging
+from functools import lru_cache
+import pandas as pd
+from sqlalchemy import text
+
+FACT_BUILDERS = ('sql', 'python')
+
+# (fact key column, cleaned column, dimension table, key column, member column, insertable)
+DIMENSIONS = [
+    ('date_received_key', 'date_received', 'dim_date', 'date_key', 'full_date', False),
+    ('date_sent_key', 'date_sent_to_company', 'dim_date', 'date_key', 'full_date', False),
+    ('product_key', 'product_standardized', 'dim_product', 'product_key', 'product_name', True),
+    ('sub_product_key', 'sub_product_standardized', 'dim_sub_product', 'sub_product_key', 'sub_product_name', True),
+    ('issue_key', 'issue_standardized', 'dim_issue', 'issue_key', 'issue_name', True),
+    ('sub_issue_key', 'sub_issue_standardized', 'dim_sub_issue', 'sub_issue_key', 'sub_issue_name', True),
+    ('company_key', 'company', 'dim_company', 'company_key', 'company_name', True),
+    ('state_key', 'state_code', 'dim_state', 'state_key', 'state_code', True),
+    ('zip_code_key', 'zip_code', 'dim_zip_code', 'zip_code_key', 'zip_code', True),
+    ('origin_key', 'submitted_via', 'dim_origin', 'origin_key', 'origin_method', True),
+    ('consent_key', 'consumer_consent_provided_standardized', 'dim_consent', 'consent_key', 'consent_status', True),
+    ('public_response_key', 'company_public_response_standardized', 'dim_public_response', 'response_key', 'response_text', True),
+    ('company_response_key', 'company_response_to_consumer_standardized', 'dim_company_response', 'response_key', 'response_description', True),
+    ('tag_key', 'tags_standardized', 'dim_tag', 'tag_key', 'tag_name', True),
+    ('disputed_key', 'consumer_disputed_standardized', 'dim_disputed', 'disputed_key', 'disputed_status', True),
+]
+
+# Column order and types of the fact staging tables (fact_complaints without complaint_fact_key).
+FACT_COLUMN_TYPES = (
+    [('complaint_id', 'INT')]
+    + [(fact_column, 'INT') for fact_column, *_ in DIMENSIONS]
+    + [('timely_response', 'TINYINT(1)'), ('consumer_complaint_narrative', 'TEXT')]
+)
+
+# Members per database lookup or insert statement.
+LOOKUP_CHUNK_SIZE = 1000
+
+
+class DimensionKeyCache:
+    """Maps the members of one dimension table to their surrogate keys."""
+
+    def __init__(self, table, key_column, member_column, insertable=True):
+        self.table = table
+        self.key_column = key_column
+        self.member_column = member_column
+        self.insertable = insertable
+        self.keys = {}
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.inserted = 0
+        self.unresolved = 0
+
+    def load(self, conn):
+        """Loads the whole dimension into the cache with one scan."""
+        rows = conn.execute(text(
+            f"SELECT CAST(`{self.member_column}` AS CHAR), `{self.key_column}` FROM `{self.table}` "
+            f"WHERE `{self.member_column}` IS NOT NULL"
+        )).fetchall()
+        self.keys = {member: key for member, key in rows}
+        self.loaded = True
+        logging.info(f"[Dimension Cache] Loaded {len(self.keys):,} members of '{self.table}'.")
+
+    def _lookup(self, conn, members):
+        """Reads the keys of `members` from the database and adds the ones it finds to the cache."""
+        found = 0
+        for start in range(0, len(members), LOOKUP_CHUNK_SIZE):
+            chunk = members[start:start + LOOKUP_CHUNK_SIZE]
+            params = {f"m{i}": member for i, member in enumerate(chunk)}
+            rows_sql = ', '.join(f"ROW(:m{i})" for i in range(len(chunk)))
+            # Joined on the dimension column so its collation decides equality, exactly like the SQL builder.
+            rows = conn.execute(text(f"""
+                SELECT v.member, d.`{self.key_column}`
+                FROM (VALUES {rows_sql}) AS v (member)
+                JOIN `{self.table}` d ON d.`{self.member_column}` = v.member
+            """), params).fetchall()
+            for member, key in rows:
+                self.keys[member] = key
+            found += len(rows)
+        return found
+
+    def _insert(self, conn, members):
+        """Inserts `members` into the dimension in bulk and returns the number of new rows."""
+        inserted = 0
+        for start in range(0, len(members), LOOKUP_CHUNK_SIZE):
+            chunk = members[start:start + LOOKUP_CHUNK_SIZE]
+            params = {f"m{i}": member for i, member in enumerate(chunk)}
+            values_sql = ', '.join(f"(:m{i})" for i in range(len(chunk)))
+            inserted += conn.execute(
+                text(f"INSERT IGNORE INTO `{self.table}` (`{self.member_column}`) VALUES {values_sql}"), params
+            ).rowcount
+        return inserted
+
+    def resolve(self, conn, members):
+        """
+        Maps a column of dimension members to surrogate keys.
+
+        Args:
+            conn: An active SQLAlchemy connection, used only for members missing from the cache.
+            members (pd.Series): The cleaned column; missing values map to a NULL key.
+
+        Returns:
+            pd.Series: Nullable `Int64` keys aligned with `members`.
+        """
+        if not self.loaded:
+            self.load(conn)
+        distinct = members.dropna().unique()
+        missing = [member for member in distinct if member not in self.keys]
+        self.hits += len(distinct) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            self._lookup(conn, missing)
+            missing = [member for member in missing if member not in self.keys]
+            if missing and self.insertable:
+                self.inserted += self._insert(conn, missing)
+                self._lookup(conn, missing)
+                missing = [member for member in missing if member not in self.keys]
+            if missing:
+                # The SQL builder's LEFT JOIN leaves these keys NULL as well.
+                self.unresolved += len(missing)
+                logging.warning(f"[Dimension Cache] {len(missing):,} members of '{self.table}' have no key, e.g. {missing[:3]}.")
+        return members.map(self.keys).astype('Int64')
+
+    def stats(self):
+        """Returns the cache counters as a dict."""
+        return {
+            "members": len(self.keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserted": self.inserted,
+            "unresolved": self.unresolved,
+        }
+
+
+# One cache per dimension table in each worker process; pool processes live for one step, so once per run.
+_caches = {}
+
+
+def get_dimension_cache(table, key_column, member_column, insertable=True):
+    """Returns the process-wide cache of `table`, creating it on first use."""
+    if table not in _caches:
+        _caches[table] = DimensionKeyCache(table, key_column, member_column, insertable)
+    return _caches[table]
+
+
+def cache_totals():
+    """Returns the hit, miss, insert and unresolved counts summed over every cache in this process."""
+    stats = [cache.stats() for cache in _caches.values()]
+    return {counter: sum(table_stats[counter] for table_stats in stats)
+            for counter in ("hits", "misses", "inserted", "unresolved")}
+
+
+def log_cache_stats(totals, log_prefix="[Dimension Cache]"):
+    """Logs cache counters such as the ones returned by `cache_totals`."""
+    lookups = totals["hits"] + totals["misses"]
+    hit_rate = totals["hits"] / lookups if lookups else 0
+    logging.info(
+        f"{log_prefix} {totals['hits']:,} hits, {totals['misses']:,} misses ({hit_rate:.1%} hit rate), "
+        f"{totals['inserted']:,} members inserted, {totals['unresolved']:,} unresolved."
+    )
+
+
+@lru_cache(maxsize=None)
+def _cleaned_batch_sql(queue_table):
+    """Returns the compiled batch query of `read_cleaned_batch` for one queue table."""
+    date_columns = {cleaned_column for _, cleaned_column, table, *_ in DIMENSIONS if table == 'dim_date'}
+    select_cols = ', '.join(
+        f"CAST(c.`{column}` AS CHAR) AS `{column}`" if column in date_columns else f"c.`{column}`"
+        for column in dict.fromkeys(cleaned_column for _, cleaned_column, *_ in DIMENSIONS)
+    )
+    return text(f"""
+        SELECT c.complaint_id, {select_cols}, c.timely_response, c.consumer_complaint_narrative
+        FROM {queue_table} q
+        JOIN consumer_complaints_cleaned c ON q.complaint_id = c.complaint_id
+        WHERE c.complaint_id BETWEEN :start_id AND :end_id
+          AND c.complaint_id > :last_id
+        ORDER BY c.complaint_id
+        LIMIT :limit
+    """)
+
+
+def read_cleaned_batch(conn, queue_table, start_id, end_id, last_id, limit):
+    """
+    Reads the next batch of queued cleaned complaints of a range, with dates rendered as 'YYYY-MM-DD' text.
+
+    Selects the same rows as Step 1 of `populate_facts.sql`.
+    """
+    return pd.read_sql_query(
+        _cleaned_batch_sql(queue_table), conn,
+        params={"start_id": start_id, "end_id": end_id, "last_id": last_id, "limit": limit}
+    )
+
+
+def build_fact_frame(conn, cleaned):
+    """
+    Resolves the dimension keys of a cleaned batch into fact rows.
+
+    Args:
+        conn: An active SQLAlchemy connection.
+        cleaned (pd.DataFrame): A batch from `read_cleaned_batch`.
+
+    Returns:
+        pd.DataFrame: The fact rows, with the columns of `FACT_COLUMN_TYPES`.
+    """
+    facts = pd.DataFrame({'complaint_id': cleaned['complaint_id'].astype('Int64')})
+    for fact_column, cleaned_column, table, key_column, member_column, insertable in DIMENSIONS:
+        cache = get_dimension_cache(table, key_column, member_column, insertable)
+        facts[fact_column] = cache.resolve(conn, cleaned[cleaned_column])
+    facts['timely_response'] = pd.to_numeric(cleaned['timely_response'], errors='coerce').astype('Int64')
+    facts['consumer_complaint_narrative'] = cleaned['consumer_complaint_narrative']
+    return facts
+
+
+def build_fact_batch(conn, queue_table, start_id, end_id, last_id, limit):
+    """
+    Builds the next fact batch of a range in Python.
+
+    Returns:
+        pd.DataFrame: The fact rows, empty when the range is exhausted.
+    """
+    cleaned = read_cleaned_batch(conn, queue_table, start_id, end_id, last_id, limit)
+    if cleaned.empty:
+        return cleaned
+    return build_fact_frame(conn, cleaned)
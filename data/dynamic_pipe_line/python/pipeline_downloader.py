@@ -0,0 +1,297 @@
+"""
+Resumable, parallel HTTP downloader used by the ingestion step to fetch the CFPB source zip.
+
+A download starts with one conditional GET (`If-None-Match` / `If-Modified-Since`) that also asks for the
+first byte range, so an unchanged file costs a single 304 round trip and no separate HEAD request is needed.
+When the server honours ranges, the rest of the file is fetched in large byte ranges by a thread pool and
+written into a `.part` file at their offsets. Completed ranges are recorded in a small JSON state file, so an
+interrupted download resumes where it stopped as long as the server's ETag has not changed.
+
+The SHA256 of the file is computed while downloading: ranges are fed to the hasher in file order from a
+bounded in-order window, so the file never has to be re-read after it has been written.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+import requests
+
+from pipeline_utils import PipelineError
+
+DEFAULT_RANGE_SIZE = 16 * 1024 * 1024
+DEFAULT_WORKERS = 4
+STREAM_CHUNK_SIZE = 1024 * 1024
+REQUEST_TIMEOUT_SECONDS = 60
+
+
+class DownloadError(PipelineError):
+    """Raised when the source file cannot be downloaded consistently."""
+    pass
+
+
+def _read_json(path):
+    """Returns the parsed JSON file at `path`, or None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    """Atomically replaces the JSON file at `path`."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _hash_file_range(path, start, length, hasher):
+    """Feeds `length` bytes of `path` starting at `start` into `hasher` (used only for resumed ranges)."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise DownloadError(f"Partial file '{path}' is shorter than its recorded progress.")
+            hasher.update(chunk)
+            remaining -= len(chunk)
+
+
+def _parse_content_range_total(content_range):
+    """Extracts the total size from a `Content-Range: bytes a-b/total` header."""
+    try:
+        return int(content_range.rsplit('/', 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        raise DownloadError(f"Unexpected Content-Range header: {content_range!r}")
+
+
+class RangeDownloader:
+    """
+    Downloads one URL into `dest_path` with conditional GET, parallel byte ranges and resume support.
+
+    Args:
+        url (str): The file to download.
+        dest_path (str): Where the finished file is stored. `<dest_path>.meta.json` keeps its validators
+                         (ETag, Last-Modified) and SHA256 for the next conditional request.
+        workers (int): Number of concurrent range requests.
+        range_size (int): Bytes per range request.
+        session (requests.Session, optional): The HTTP session to use, e.g. one pointed at a stand-in server.
+    """
+
+    def __init__(self, url, dest_path, workers=DEFAULT_WORKERS, range_size=DEFAULT_RANGE_SIZE, session=None):
+        self.url = url
+        self.dest_path = dest_path
+        self.workers = max(1, workers)
+        self.range_size = range_size
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+
+        self.meta_path = f"{dest_path}.meta.json"
+        self.part_path = f"{dest_path}.part"
+        self.state_path = f"{dest_path}.part.json"
+        self._state_lock = threading.Lock()
+
+    def _conditional_headers(self):
+        """Builds validators from the stored metadata, or from the local file's mtime for older downloads."""
+        if not os.path.exists(self.dest_path):
+            return {}
+        meta = _read_json(self.meta_path) or {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        headers['If-Modified-Since'] = meta.get('last_modified') or formatdate(os.path.getmtime(self.dest_path), usegmt=True)
+        return headers
+
+    def _not_modified_result(self, start):
+        """Result for a 304: reuse the stored hash, computing it once if an older download has none."""
+        meta = _read_json(self.meta_path) or {}
+        if not meta.get('sha256'):
+            hasher = hashlib.sha256()
+            _hash_file_range(self.dest_path, 0, os.path.getsize(self.dest_path), hasher)
+            meta.update({'url': self.url, 'sha256': hasher.hexdigest(), 'size': os.path.getsize(self.dest_path)})
+            _write_json(self.meta_path, meta)
+        logging.info("[Download] Remote file not modified (304). Using the local copy.")
+        return {
+            "status": "not_modified",
+            "path": self.dest_path,
+            "sha256": meta['sha256'],
+            "etag": meta.get('etag'),
+            "last_modified": meta.get('last_modified'),
+            "bytes_downloaded": 0,
+            "seconds": time.time() - start,
+        }
+
+    def _finish(self, hasher, size, etag, last_modified, status, bytes_downloaded, start):
+        """Moves the completed part file into place and records its validators and hash."""
+        actual_size = os.path.getsize(self.part_path)
+        if size is not None and actual_size != size:
+            raise DownloadError(f"Downloaded {actual_size:,} bytes but the server announced {size:,}.")
+        os.replace(self.part_path, self.dest_path)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+        sha256 = hasher.hexdigest()
+        _write_json(self.meta_path, {
+            'url': self.url, 'etag': etag, 'last_modified': last_modified, 'sha256': sha256, 'size': actual_size
+        })
+        duration = time.time() - start
+        logging.info(
+            f"[Download] {status.capitalize()} {actual_size / (1024 * 1024):.2f} MB "
+            f"({bytes_downloaded / (1024 * 1024):.2f} MB transferred) in {duration:.2f}s."
+        )
+        return {
+            "status": status,
+            "path": self.dest_path,
+            "sha256": sha256,
+            "etag": etag,
+            "last_modified": last_modified,
+            "bytes_downloaded": bytes_downloaded,
+            "seconds": duration,
+        }
+
+    def _stream_whole_body(self, response, start):
+        """Fallback for servers that ignore Range: stream the 200 body with large buffers, hashing as it arrives."""
+        hasher = hashlib.sha256()
+        downloaded = 0
+        with open(self.part_path, 'wb') as f:
+            for data in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                f.write(data)
+                hasher.update(data)
+                downloaded += len(data)
+        content_length = response.headers.get('Content-Length')
+        size = int(content_length) if content_length and 'Content-Encoding' not in response.headers else None
+        return self._finish(
+            hasher, size, response.headers.get('ETag'), response.headers.get('Last-Modified'), "downloaded", downloaded, start
+        )
+
+    def _load_resume_state(self, size, etag):
+        """Returns the completed range indexes of a compatible partial download, or starts a fresh one."""
+        state = _read_json(self.state_path)
+        if (state and etag and state.get('etag') == etag and state.get('size') == size
+                and state.get('range_size') == self.range_size and os.path.exists(self.part_path)):
+            completed = set(state.get('completed', []))
+            logging.info(f"[Download] Resuming partial download: {len(completed)} ranges already on disk.")
+            return completed
+
+        with open(self.part_path, 'wb') as f:
+            f.truncate(size)
+        _write_json(self.state_path, {'etag': etag, 'size': size, 'range_size': self.range_size, 'completed': []})
+        return set()
+
+    def _mark_completed(self, index, completed):
+        """Persists a finished range so that an interrupted download can resume after it."""
+        with self._state_lock:
+            completed.add(index)
+            state = _read_json(self.state_path) or {}
+            state['completed'] = sorted(completed)
+            _write_json(self.state_path, state)
+
+    def _write_range(self, offset, data):
+        with open(self.part_path, 'r+b') as f:
+            f.seek(offset)
+            f.write(data)
+
+    def _fetch_range(self, index, offset, length, etag, completed):
+        """Downloads, writes and records one byte range; returns its bytes for in-order hashing."""
+        headers = {'Range': f"bytes={offset}-{offset + length - 1}"}
+        if etag:
+            headers['If-Range'] = etag
+        response = self.session.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise DownloadError("The remote file changed during the download (range request was not honoured).")
+        data = response.content
+        if len(data) != length:
+            raise DownloadError(f"Range {index} returned {len(data):,} bytes instead of {length:,}.")
+        self._write_range(offset, data)
+        self._mark_completed(index, completed)
+        return data
+
+    def download(self):
+        """
+        Runs the conditional, ranged download.
+
+        Returns:
+            dict: `status` ('not_modified', 'downloaded' or 'resumed'), `path`, `sha256`, `etag`,
+                  `last_modified`, `bytes_downloaded` and `seconds`.
+        """
+        start = time.time()
+        headers = self._conditional_headers()
+        headers['Range'] = f"bytes=0-{self.range_size - 1}"
+
+        try:
+            response = self.session.get(self.url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT_SECONDS)
+            if response.status_code == 304:
+                return self._not_modified_result(start)
+            response.raise_for_status()
+            if response.status_code == 200:
+                logging.info("[Download] Server does not support range requests. Streaming the whole file.")
+                return self._stream_whole_body(response, start)
+
+            size = _parse_content_range_total(response.headers.get('Content-Range'))
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            first_range = response.content
+        except requests.RequestException as e:
+            raise DownloadError(f"Failed to download file: {e}")
+
+        completed = self._load_resume_state(size, etag)
+        resumed = bool(completed)
+        ranges = [(i, offset, min(self.range_size, size - offset)) for i, offset in enumerate(range(0, size, self.range_size))]
+        hasher = hashlib.sha256()
+        downloaded = len(first_range)
+
+        if 0 not in completed:
+            self._write_range(0, first_range)
+            self._mark_completed(0, completed)
+        hasher.update(first_range)
+
+        logging.info(
+            f"[Download] Fetching {size / (1024 * 1024):.2f} MB in {len(ranges)} ranges of "
+            f"{self.range_size // (1024 * 1024)} MB with {self.workers} threads..."
+        )
+        # Ranges are hashed strictly in file order. At most `window` ranges are in flight or waiting to be
+        # hashed, which bounds memory while still keeping every worker thread busy.
+        window = self.workers * 2
+        pending = deque()
+        remaining = iter(ranges[1:])
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="download") as executor:
+                def _schedule_next():
+                    for index, offset, length in remaining:
+                        if index in completed:
+                            pending.append((index, offset, length, None))
+                            continue
+                        pending.append((index, offset, length, executor.submit(self._fetch_range, index, offset, length, etag, completed)))
+                        return
+
+                for _ in range(window):
+                    _schedule_next()
+                while pending:
+                    index, offset, length, future = pending.popleft()
+                    if future is None:
+                        _hash_file_range(self.part_path, offset, length, hasher)
+                    else:
+                        hasher.update(future.result())
+                        downloaded += length
+                    _schedule_next()
+        except requests.RequestException as e:
+            raise DownloadError(f"Failed to download file (progress saved for resume): {e}")
+
+        return self._finish(hasher, size, etag, last_modified, "resumed" if resumed else "downloaded", downloaded, start)
+
+
+def download_file(url, dest_path, workers=DEFAULT_WORKERS, range_size=DEFAULT_RANGE_SIZE, session=None):
+    """Convenience wrapper around `RangeDownloader(...).download()`."""
+    return RangeDownloader(url, dest_path, workers=workers, range_size=range_size, session=session).download()
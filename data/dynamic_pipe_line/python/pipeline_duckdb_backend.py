@@ -0,0 +1,461 @@
+"""
+Embedded DuckDB backend, selected with `--backend duckdb`.
+
+The MySQL backend relies on server features (`LOAD DATA LOCAL INFILE`, `SET GLOBAL` InnoDB settings, named
+locks, `UPDATE ... ORDER BY LIMIT`) and on a running server. This backend runs the same three steps against a
+single DuckDB database file, with no service to set up:
+- Ingestion reads the source CSV with DuckDB's parallel CSV reader and upserts the new and changed rows into
+  `consumer_complaints_raw` in one statement. Rows the reader rejects and rows without a numeric complaint ID
+  are quarantined.
+- Cleaning reads pending raw rows in complaint ID batches as columnar result sets, cleans them with the same
+  `clean_dataframe` rules as the MySQL workers, and writes each batch back with one set-based upsert.
+- Modeling builds the dimension rows, the fact rows and their `agg_daily_complaints` delta with vectorized
+  `INSERT ... SELECT` statements in one transaction, and records the fact partitions it changed.
+
+`ingestion.run`, `process_and_insert.run` and `modeling.run` take either a SQLAlchemy engine or a
+`DuckDBBackend` and dispatch on `is_duckdb`. DuckDB parallelizes each statement itself, so the steps run in
+one process and the worker pool, staging and index options of the MySQL backend do not apply.
+"""
+import json
+import logging
+import os
+import time
+from pipeline_aggregates import AGGREGATE_TABLE, GRAIN_COLUMNS, UNKNOWN_TIMELY_RESPONSE
+from pipeline_dimension_cache import DIMENSIONS, FACT_COLUMN_TYPES
+from pipeline_partitions import PARTITION_CHANGES_TABLE, touched_partitions_sql, touched_dates_sql
+from pipeline_processing_status import STATUS_PENDING, STATUS_CLEANED, STATUS_MODELED, STATUS_QUARANTINED
+from pipeline_utils import PipelineError
+
+BACKENDS = ('mysql', 'duckdb')
+DEFAULT_DUCKDB_PATH = os.path.join("data", "complaints.duckdb")
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_SCRIPT = os.path.join(script_dir, "sql", "duckdb", "create_tables.sql")
+DIM_DATE_SCRIPT = os.path.join(script_dir, "sql", "duckdb", "populate_dim_date.sql")
+
+RAW_COLUMNS = [
+    'date_received', 'product', 'sub_product', 'issue', 'sub_issue', 'consumer_complaint_narrative',
+    'company_public_response', 'company', 'state_code', 'zip_code', 'tags', 'consumer_consent_provided',
+    'submitted_via', 'date_sent_to_company', 'company_response_to_consumer', 'timely_response',
+    'consumer_disputed'
+]
+FACT_COLUMNS = [column for column, _ in FACT_COLUMN_TYPES]
+MODELING_QUEUE_TABLE = 'duckdb_modeling_queue'
+STALE_FACTS_TABLE = 'duckdb_stale_facts'
+
+
+def is_duckdb(engine):
+    """Returns True if a step was handed the DuckDB backend instead of a SQLAlchemy engine."""
+    return isinstance(engine, DuckDBBackend)
+
+
+def _quote(name):
+    return f'"{name}"'
+
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBBackend:
+    """An open DuckDB database file and the set-based implementations of the pipeline steps."""
+
+    def __init__(self, path=DEFAULT_DUCKDB_PATH):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise PipelineError("The DuckDB backend needs the 'duckdb' package (pip install duckdb).") from e
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = duckdb.connect(path)
+        threads = self.conn.execute("SELECT current_setting('threads')").fetchone()[0]
+        logging.info(f"[DuckDB] Opened database file '{path}' ({threads} threads).")
+
+    def close(self):
+        self.conn.close()
+
+    def execute_script(self, script_path, params=None):
+        """Runs the ';'-separated statements of an SQL file, formatted with `params`."""
+        with open(script_path, "r", encoding="utf-8") as file:
+            sql_script = file.read()
+        if params:
+            sql_script = sql_script.format(**params)
+        for statement in sql_script.split(';'):
+            if statement.strip():
+                self.conn.execute(statement)
+
+    def ensure_schema(self):
+        """Creates every table of the backend that does not exist yet."""
+        self.execute_script(SCHEMA_SCRIPT)
+        logging.info("[DuckDB] Schema is up to date.")
+
+    def write_log(self, step, status, message, duration=None, details=None):
+        """Inserts a `pipeline_logs` row; called by `pipeline_logger.log_db`."""
+        self.conn.execute(
+            "INSERT INTO pipeline_logs (pipeline_step, status, message, duration_seconds, details) VALUES (?, ?, ?, ?, ?)",
+            [step, status, message, duration, json.dumps(details, default=str) if details else None]
+        )
+
+    def _status_count(self, status):
+        return self.conn.execute("SELECT COUNT(*) FROM record_processing_status WHERE status = ?", [status]).fetchone()[0]
+
+    # --- Ingestion ---
+
+    def last_file_hash(self):
+        """Returns the hash of the most recently ingested source file, or None."""
+        row = self.conn.execute("SELECT file_hash FROM ingestion_metadata ORDER BY ingested_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def ingest_csv(self, csv_path, column_names, source_file_name, file_hash, last_modified, limit=None):
+        """
+        Loads the new and changed rows of the source CSV into `consumer_complaints_raw` and queues them for cleaning.
+
+        Args:
+            csv_path (str): The extracted source CSV.
+            column_names (list): The cleaned header of the CSV, in file order.
+            source_file_name (str): Recorded with every raw row and in `ingestion_metadata`.
+            file_hash (str): SHA256 of the downloaded file.
+            last_modified (datetime): The remote Last-Modified date.
+            limit (int, optional): Only read the first `limit` rows of the file.
+
+        Returns:
+            dict: Row counts of the load.
+        """
+        conn = self.conn
+        start = time.time()
+        columns_sql = '{' + ', '.join(f"{_literal(name)}: 'VARCHAR'" for name in column_names) + '}'
+        select_sql = ', '.join(_quote(column) if column in column_names else f"NULL AS {_quote(column)}" for column in RAW_COLUMNS)
+        limit_sql = f"LIMIT {int(limit)}" if limit is not None and limit > 0 else ""
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute(f"""
+                CREATE OR REPLACE TEMP TABLE ingest_source AS
+                SELECT {select_sql}, complaint_id AS source_complaint_id
+                FROM read_csv({_literal(csv_path)}, header = true, columns = {columns_sql}, quote = '"', escape = '"',
+                              parallel = true, ignore_errors = true, store_rejects = true,
+                              rejects_table = 'ingest_rejects', rejects_scan = 'ingest_reject_scans')
+                {limit_sql}
+            """)
+            source_rows = conn.execute("SELECT COUNT(*) FROM ingest_source").fetchone()[0]
+
+            raw_columns_sql = ', '.join(_quote(column) for column in RAW_COLUMNS)
+            invalid_id = "NOT regexp_full_match(coalesce(source_complaint_id, ''), '[0-9]+') OR TRY_CAST(source_complaint_id AS INTEGER) IS NULL"
+            conn.execute(f"""
+                INSERT INTO consumer_complaints_quarantined (complaint_id, {raw_columns_sql}, quarantine_reason)
+                SELECT coalesce(source_complaint_id, 'UNKNOWN'), {raw_columns_sql},
+                       'Invalid or missing complaint_id: ''' || coalesce(source_complaint_id, '') || ''''
+                FROM ingest_source WHERE {invalid_id}
+            """)
+            # The reader reports every error of a line; the line is quarantined once, for its first error.
+            rejected = conn.execute("""
+                INSERT INTO consumer_complaints_quarantined (complaint_id, quarantine_reason)
+                SELECT 'UNKNOWN', 'Rejected by the CSV reader at line ' || line || ': ' || error_message
+                FROM ingest_rejects
+                QUALIFY row_number() OVER (PARTITION BY scan_id, file_id, line ORDER BY column_idx) = 1
+            """).fetchone()[0]
+            invalid = conn.execute(f"SELECT COUNT(*) FROM ingest_source WHERE {invalid_id}").fetchone()[0]
+
+            # A complaint listed twice keeps one of its rows; only new rows and rows whose hash changed are written.
+            conn.execute(f"""
+                CREATE OR REPLACE TEMP TABLE ingest_changes AS
+                SELECT s.*
+                FROM (
+                    SELECT {raw_columns_sql}, CAST(source_complaint_id AS INTEGER) AS complaint_id,
+                           hash({raw_columns_sql}) AS row_hash
+                    FROM ingest_source
+                    WHERE NOT ({invalid_id})
+                    QUALIFY row_number() OVER (PARTITION BY CAST(source_complaint_id AS INTEGER)) = 1
+                ) s
+                LEFT JOIN consumer_complaints_raw r ON r.complaint_id = s.complaint_id
+                WHERE r.complaint_id IS NULL OR r.row_hash IS DISTINCT FROM s.row_hash
+            """)
+            changed = conn.execute("SELECT COUNT(*) FROM ingest_changes").fetchone()[0]
+            update_sql = ', '.join(
+                f"{_quote(column)} = EXCLUDED.{_quote(column)}"
+                for column in RAW_COLUMNS + ['row_hash', 'ingestion_date', 'source_file_name']
+            )
+            conn.execute(f"""
+                INSERT INTO consumer_complaints_raw ({raw_columns_sql}, complaint_id, row_hash, ingestion_date, source_file_name)
+                SELECT {raw_columns_sql}, complaint_id, row_hash, current_date, ?
+                FROM ingest_changes
+                ON CONFLICT (complaint_id) DO UPDATE SET {update_sql}
+            """, [source_file_name])
+            conn.execute(f"""
+                INSERT INTO record_processing_status (complaint_id, status)
+                SELECT complaint_id, {STATUS_PENDING} FROM ingest_changes
+                ON CONFLICT (complaint_id) DO UPDATE SET status = {STATUS_PENDING}
+            """)
+
+            max_id = conn.execute("SELECT coalesce(MAX(complaint_id), 0) FROM consumer_complaints_raw").fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO ingestion_metadata (source_file_name, file_hash, row_count, max_complaint_id, last_modified_date) VALUES (?, ?, ?, ?, ?)",
+                [source_file_name, file_hash, changed, max_id, last_modified]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            for table in ("ingest_source", "ingest_changes", "ingest_rejects", "ingest_reject_scans"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+        stats = {
+            "source_rows": source_rows,
+            "new_or_changed_rows": changed,
+            "unchanged_rows": source_rows - invalid - changed,
+            "quarantined_rows": invalid + rejected,
+            "max_complaint_id": max_id,
+            "seconds": round(time.time() - start, 3),
+        }
+        logging.info(
+            f"[DuckDB] Ingested {changed:,} new or changed rows of {source_rows:,} in {stats['seconds']:.2f}s "
+            f"({invalid + rejected:,} quarantined). Max Complaint ID: {max_id:,}."
+        )
+        return stats
+
+    # --- Cleaning ---
+
+    def clean_pending(self, limit=None, batch_size=50000):
+        """
+        Cleans pending raw complaints in complaint ID batches with the rules of `clean_dataframe`.
+
+        Args:
+            limit (int, optional): The maximum number of pending complaints to clean.
+            batch_size (int, optional): Complaints per batch.
+
+        Returns:
+            dict: Row counts and timings of the step, plus the cleaned rows written per received date
+                  (`date_counts`) and the dates of the facts retracted for quarantined complaints
+                  (`dirty_dates`) for the run manifest.
+        """
+        # Imported here: the cleaning rules live in the step module, which imports this one.
+        from dynamic_pipeline_process_and_insert import clean_dataframe, RAW_SOURCE_COLUMNS
+
+        conn = self.conn
+        total_pending = self._status_count(STATUS_PENDING)
+        target = min(total_pending, limit) if limit is not None and limit > 0 else total_pending
+        logging.info(f"[DuckDB] Found {total_pending:,} pending records. Target for this run: {target:,}.")
+        read_sql = f"""
+            SELECT {', '.join(f'r.{_quote(column)}' for column in RAW_SOURCE_COLUMNS)}, r.row_hash AS source_row_hash
+            FROM consumer_complaints_raw r
+            JOIN record_processing_status p ON p.complaint_id = r.complaint_id
+            WHERE p.status = {STATUS_PENDING} AND r.complaint_id > ?
+            ORDER BY r.complaint_id
+            LIMIT ?
+        """
+
+        stats = {"cleaned": 0, "quarantined": 0, "batches": 0, "read_seconds": 0.0, "clean_seconds": 0.0, "write_seconds": 0.0}
+        date_counts = {}
+        dirty_dates = set()
+        last_id = -1
+        processed = 0
+        while processed < target:
+            read_start = time.time()
+            raw = conn.execute(read_sql, [last_id, min(batch_size, target - processed)]).df()
+            stats["read_seconds"] += time.time() - read_start
+            if raw.empty:
+                break
+            last_id = int(raw['complaint_id'].max())
+            processed += len(raw)
+
+            clean_start = time.time()
+            cleaned, quarantined = clean_dataframe(raw[RAW_SOURCE_COLUMNS])
+            cleaned['source_row_hash'] = raw.loc[cleaned.index, 'source_row_hash']
+            stats["clean_seconds"] += time.time() - clean_start
+
+            write_start = time.time()
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.register("cleaned_batch", cleaned)
+                conn.execute("INSERT OR REPLACE INTO consumer_complaints_cleaned BY NAME SELECT * FROM cleaned_batch")
+                conn.execute(f"UPDATE record_processing_status SET status = {STATUS_CLEANED} WHERE complaint_id IN (SELECT complaint_id FROM cleaned_batch)")
+                for day, rows in conn.execute("""
+                    SELECT date_received, COUNT(*) FROM consumer_complaints_cleaned
+                    WHERE complaint_id IN (SELECT complaint_id FROM cleaned_batch) GROUP BY date_received
+                """).fetchall():
+                    date_counts[day] = date_counts.get(day, 0) + rows
+                if quarantined is not None:
+                    conn.register("quarantined_batch", quarantined)
+                    conn.execute("INSERT INTO consumer_complaints_quarantined BY NAME SELECT * FROM quarantined_batch")
+                    # A re-queued complaint whose new version is quarantined must not keep its old cleaned row.
+                    conn.execute("DELETE FROM consumer_complaints_cleaned WHERE complaint_id IN (SELECT CAST(complaint_id AS INTEGER) FROM quarantined_batch)")
+                    dirty_dates.update(self._retract_quarantined_facts())
+                    conn.execute(f"UPDATE record_processing_status SET status = {STATUS_QUARANTINED} WHERE complaint_id IN (SELECT CAST(complaint_id AS INTEGER) FROM quarantined_batch)")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.unregister("cleaned_batch")
+                if quarantined is not None:
+                    conn.unregister("quarantined_batch")
+            stats["write_seconds"] += time.time() - write_start
+
+            stats["batches"] += 1
+            stats["cleaned"] += len(cleaned)
+            stats["quarantined"] += 0 if quarantined is None else len(quarantined)
+            logging.info(f"[DuckDB] Cleaned batch {stats['batches']}: {len(cleaned):,} rows. Total: {processed:,} of {target:,}.")
+
+        for timer in ("read_seconds", "clean_seconds", "write_seconds"):
+            stats[timer] = round(stats[timer], 3)
+        stats["target_record_count"] = target
+        stats["date_counts"] = date_counts
+        stats["dirty_dates"] = sorted(dirty_dates, key=str)
+        return stats
+
+    def _retract_quarantined_facts(self):
+        """
+        Deletes the fact rows of the complaints in `quarantined_batch` and retracts them from the aggregates.
+
+        Returns:
+            list: The received dates of the deleted fact rows.
+        """
+        conn = self.conn
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {STALE_FACTS_TABLE} AS
+            SELECT complaint_id FROM fact_complaints
+            WHERE complaint_id IN (SELECT CAST(complaint_id AS INTEGER) FROM quarantined_batch)
+        """)
+        try:
+            retracted = conn.execute(f"SELECT COUNT(*) FROM {STALE_FACTS_TABLE}").fetchone()[0]
+            if not retracted:
+                return []
+            conn.execute(self._aggregate_delta_sql(-1, STALE_FACTS_TABLE))
+            self._record_partition_changes(STALE_FACTS_TABLE)
+            dirty_dates = [day for day, _ in conn.execute(touched_dates_sql(STALE_FACTS_TABLE)).fetchall()]
+            conn.execute(f"DELETE FROM fact_complaints WHERE complaint_id IN (SELECT complaint_id FROM {STALE_FACTS_TABLE})")
+            conn.execute(f"DELETE FROM {AGGREGATE_TABLE} WHERE complaint_count = 0")
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {STALE_FACTS_TABLE}")
+        logging.info(f"[DuckDB] Deleted the fact rows of {retracted:,} quarantined complaints.")
+        return dirty_dates
+
+    # --- Modeling ---
+
+    def _dimension_sql(self):
+        """Returns the INSERTs that add the missing members of every insertable dimension."""
+        statements = []
+        for table in dict.fromkeys(table for _, _, table, *_ in DIMENSIONS):
+            _, cleaned_column, _, _, member_column, insertable = next(d for d in DIMENSIONS if d[2] == table)
+            if not insertable:
+                continue
+            statements.append(f"""
+                INSERT INTO {table} ({_quote(member_column)})
+                SELECT DISTINCT c.{_quote(cleaned_column)}
+                FROM consumer_complaints_cleaned c
+                JOIN {MODELING_QUEUE_TABLE} q ON q.complaint_id = c.complaint_id
+                WHERE c.{_quote(cleaned_column)} IS NOT NULL
+                  AND c.{_quote(cleaned_column)} NOT IN (SELECT {_quote(member_column)} FROM {table} WHERE {_quote(member_column)} IS NOT NULL)
+            """)
+        return statements
+
+    def _fact_upsert_sql(self):
+        """Returns the INSERT that resolves the dimension keys of the queued complaints and upserts their facts."""
+        select_columns = ['c.complaint_id']
+        joins = []
+        for i, (fact_column, cleaned_column, table, key_column, member_column, _) in enumerate(DIMENSIONS):
+            select_columns.append(f"d{i}.{_quote(key_column)}")
+            joins.append(f"LEFT JOIN {table} d{i} ON d{i}.{_quote(member_column)} = c.{_quote(cleaned_column)}")
+        select_columns += ['CAST(c.timely_response AS BOOLEAN)', 'c.consumer_complaint_narrative']
+        update_sql = ', '.join(f"{_quote(column)} = EXCLUDED.{_quote(column)}" for column in FACT_COLUMNS if column != 'complaint_id')
+        join_sql = '\n'.join(joins)
+        return f"""
+            INSERT INTO fact_complaints ({', '.join(_quote(column) for column in FACT_COLUMNS)})
+            SELECT {', '.join(select_columns)}
+            FROM consumer_complaints_cleaned c
+            JOIN {MODELING_QUEUE_TABLE} q ON q.complaint_id = c.complaint_id
+            {join_sql}
+            ON CONFLICT (complaint_id) DO UPDATE SET {update_sql}
+        """
+
+    def _aggregate_delta_sql(self, sign, queue_table=MODELING_QUEUE_TABLE):
+        """Returns the upsert that adds (`sign` 1) or subtracts (-1) the queued facts in `agg_daily_complaints`."""
+        grain_sql = ', '.join(_quote(column) for column in GRAIN_COLUMNS)
+        grain_select_sql = ', '.join(
+            f"COALESCE(CAST(f.timely_response AS TINYINT), {UNKNOWN_TIMELY_RESPONSE})" if column == 'timely_response'
+            else f"COALESCE(f.{_quote(column)}, 0)"
+            for column in GRAIN_COLUMNS
+        )
+        return f"""
+            INSERT INTO {AGGREGATE_TABLE} ({grain_sql}, complaint_count)
+            SELECT {grain_select_sql}, {int(sign)} * COUNT(*)
+            FROM fact_complaints f
+            JOIN {queue_table} q ON q.complaint_id = f.complaint_id
+            GROUP BY ALL
+            ON CONFLICT ({grain_sql}) DO UPDATE
+            SET complaint_count = complaint_count + EXCLUDED.complaint_count, updated_at = get_current_timestamp()
+        """
+
+    def _record_partition_changes(self, queue_table=MODELING_QUEUE_TABLE):
+        """Marks the fact partitions of the queued complaints as changed (see `pipeline_partitions`)."""
+        self.conn.execute(f"""
+            INSERT INTO {PARTITION_CHANGES_TABLE} (partition_year, partition_month)
+            {touched_partitions_sql(queue_table)}
+            ON CONFLICT (partition_year, partition_month) DO UPDATE SET changed_at = get_current_timestamp()
+        """)
+
+    def model_cleaned(self, limit=None):
+        """
+        Models the cleaned complaints into the star schema and the daily aggregates in one transaction.
+
+        Args:
+            limit (int, optional): The maximum number of cleaned complaints to model.
+
+        Returns:
+            dict: Row counts and timings of the step, plus the fact rows written per received date
+                  (`date_counts`) and the dates re-modeled complaints left (`dirty_dates`) for the run manifest.
+        """
+        conn = self.conn
+        total_cleaned = self._status_count(STATUS_CLEANED)
+        target = min(total_cleaned, limit) if limit is not None and limit > 0 else total_cleaned
+        logging.info(f"[DuckDB] Found {total_cleaned:,} records to model. Target for this run: {target:,}.")
+        stats = {"target_record_count": target, "total_records_modeled": 0, "date_counts": {}, "dirty_dates": []}
+        if not target:
+            return stats
+
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {MODELING_QUEUE_TABLE} AS
+            SELECT complaint_id FROM record_processing_status WHERE status = {STATUS_CLEANED}
+            ORDER BY complaint_id LIMIT {int(target)}
+        """)
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            dimension_start = time.time()
+            self.execute_script(DIM_DATE_SCRIPT, {"queue_table": MODELING_QUEUE_TABLE})
+            for statement in self._dimension_sql():
+                conn.execute(statement)
+            stats["dimension_seconds"] = round(time.time() - dimension_start, 3)
+
+            fact_start = time.time()
+            # The aggregates move re-modeled complaints from their old groups to their new ones.
+            conn.execute(self._aggregate_delta_sql(-1))
+            self._record_partition_changes()
+            stats["dirty_dates"] = [day for day, _ in conn.execute(touched_dates_sql(MODELING_QUEUE_TABLE)).fetchall()]
+            stats["total_records_modeled"] = conn.execute(self._fact_upsert_sql()).fetchone()[0]
+            conn.execute(self._aggregate_delta_sql(1))
+            self._record_partition_changes()
+            stats["date_counts"] = dict(conn.execute(touched_dates_sql(MODELING_QUEUE_TABLE)).fetchall())
+            conn.execute(f"DELETE FROM {AGGREGATE_TABLE} WHERE complaint_count = 0")
+            stats["fact_seconds"] = round(time.time() - fact_start, 3)
+
+            conn.execute(f"""
+                UPDATE record_processing_status SET status = {STATUS_MODELED}
+                WHERE complaint_id IN (SELECT complaint_id FROM {MODELING_QUEUE_TABLE})
+            """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {MODELING_QUEUE_TABLE}")
+
+        stats["aggregate_groups"], stats["aggregate_complaints"] = conn.execute(
+            f"SELECT COUNT(*), coalesce(SUM(complaint_count), 0) FROM {AGGREGATE_TABLE}"
+        ).fetchone()
+        logging.info(
+            f"[DuckDB] Modeled {stats['total_records_modeled']:,} complaints "
+            f"(dimensions {stats['dimension_seconds']:.2f}s, facts and aggregates {stats['fact_seconds']:.2f}s)."
+        )
+        return stats
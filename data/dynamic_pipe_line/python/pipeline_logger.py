@@ -39,7 +39,8 @@ def log_db(engine_or_conn, step, status, message, duration=None, details=None):
         log message to be part of the caller's ongoing transaction.
 
     Args:
-        engine_or_conn (Engine | Connection): The SQLAlchemy Engine or a live Connection.
+        engine_or_conn (Engine | Connection | DuckDBBackend): The SQLAlchemy Engine, a live Connection, or the
+                                                             DuckDB backend (which writes its own `pipeline_logs`).
         step (str): The name of the pipeline step being logged (e.g., 'Ingestion').
         status (str): The status of the action (e.g., 'SUCCESS', 'ERROR', 'INFO').
         message (str): A descriptive message.
@@ -58,6 +59,8 @@ def log_db(engine_or_conn, step, status, message, duration=None, details=None):
                 _execute_log_insert(conn, step, status, message, duration, details)
         elif isinstance(engine_or_conn, Connection):
             _execute_log_insert(engine_or_conn, step, status, message, duration, details)
+        elif callable(getattr(engine_or_conn, "write_log", None)):
+            engine_or_conn.write_log(step, status, message, duration, details)
         else:
             logging.error("Invalid object passed to log_db: must be SQLAlchemy Engine or Connection.")
 
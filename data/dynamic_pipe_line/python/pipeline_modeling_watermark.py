@@ -0,0 +1,104 @@
+"""
+The persisted modeling watermark and its late arrivals, used by incremental modeling (`--model-incremental`).
+
+`modeling_watermark` holds the `complaint_id` up to which every complaint has been modeled or quarantined.
+Incremental modeling discovers its queue from it instead of from every cleaned complaint:
+- the cleaned complaints above the watermark, with one seek on the (status, complaint_id) index,
+- the late arrivals at or below it, read from `modeling_late_arrivals`.
+
+A complaint at or below the watermark only needs modeling again when ingestion re-queues it (a correction
+found by delta ingestion) or registers it late (an ID older than the watermark). Ingestion calls
+`record_late_arrivals` in the same transaction, and the modeling run that models them removes them again
+when it advances the watermark. Setup seeds the table from the status table, so complaints re-queued before
+it existed are not missed.
+"""
+import logging
+from sqlalchemy import text
+from pipeline_processing_status import (
+    STATUS_PENDING, STATUS_CLEANED, STATUS_MODELED, STATUS_QUARANTINED, STATUS_TABLE
+)
+
+MODELING_WATERMARK = 'fact_complaints'
+WATERMARK_TABLE = 'modeling_watermark'
+LATE_ARRIVALS_TABLE = 'modeling_late_arrivals'
+
+
+def get_modeling_watermark(conn):
+    """Returns the complaint_id up to which every complaint has been modeled (0 before the first run)."""
+    return conn.execute(
+        text(f"SELECT last_modeled_id FROM {WATERMARK_TABLE} WHERE watermark_name = :name"), {"name": MODELING_WATERMARK}
+    ).scalar_one_or_none() or 0
+
+
+def record_late_arrivals(conn):
+    """
+    Records the complaints pending cleaning or modeling at or below the watermark as late arrivals.
+
+    Outside late arrivals no complaint at or below the watermark is pending, so each status is a seek that
+    reads only the complaints just re-queued or registered (and earlier late arrivals, which are kept).
+
+    Args:
+        conn: An active SQLAlchemy connection; call it in the transaction that re-queued the complaints.
+
+    Returns:
+        int: The number of new late arrivals.
+    """
+    watermark = get_modeling_watermark(conn)
+    if not watermark:
+        return 0
+    recorded = conn.execute(text(f"""
+        INSERT IGNORE INTO {LATE_ARRIVALS_TABLE} (complaint_id)
+        SELECT complaint_id FROM {STATUS_TABLE}
+        WHERE status IN ({STATUS_PENDING}, {STATUS_CLEANED}) AND complaint_id <= :watermark;
+    """), {"watermark": watermark}).rowcount
+    if recorded:
+        logging.info(f"[Modeling Watermark] Recorded {recorded:,} late arrivals at or below {watermark:,}.")
+    return recorded
+
+
+def late_arrivals_sql(status=STATUS_CLEANED):
+    """Returns the SELECT of the late arrivals currently in `status`, in complaint_id order."""
+    return f"""
+        SELECT l.complaint_id FROM {LATE_ARRIVALS_TABLE} l
+        JOIN {STATUS_TABLE} p ON p.complaint_id = l.complaint_id
+        WHERE p.status = {int(status)}
+        ORDER BY l.complaint_id
+    """
+
+
+def advance_modeling_watermark(conn):
+    """
+    Moves the modeling watermark up to the complaint before the first one still pending cleaning or modeling,
+    and forgets the late arrivals that have been modeled or quarantined.
+
+    Each bound is a single seek on the (status, complaint_id) index of `record_processing_status`. The watermark
+    never moves back: complaints at or below it that are re-queued later are modeled as late arrivals.
+
+    Returns:
+        int: The new watermark.
+    """
+    watermark = get_modeling_watermark(conn)
+    first_pending = [
+        conn.execute(text(f"""
+            SELECT MIN(complaint_id) FROM {STATUS_TABLE}
+            WHERE status = :status AND complaint_id > :watermark
+        """), {"status": status, "watermark": watermark}).scalar_one_or_none()
+        for status in (STATUS_PENDING, STATUS_CLEANED)
+    ]
+    first_pending = [complaint_id for complaint_id in first_pending if complaint_id is not None]
+    if first_pending:
+        new_watermark = min(first_pending) - 1
+    else:
+        new_watermark = conn.execute(text(f"SELECT MAX(complaint_id) FROM {STATUS_TABLE}")).scalar_one_or_none() or 0
+    new_watermark = max(watermark, new_watermark)
+    conn.execute(text(f"""
+        INSERT INTO {WATERMARK_TABLE} (watermark_name, last_modeled_id) VALUES (:name, :watermark)
+        ON DUPLICATE KEY UPDATE last_modeled_id = VALUES(last_modeled_id);
+    """), {"name": MODELING_WATERMARK, "watermark": new_watermark})
+    done = conn.execute(text(f"""
+        DELETE l FROM {LATE_ARRIVALS_TABLE} l
+        JOIN {STATUS_TABLE} p ON p.complaint_id = l.complaint_id
+        WHERE p.status IN ({STATUS_MODELED}, {STATUS_QUARANTINED});
+    """)).rowcount
+    logging.info(f"[Modeling Watermark] Advanced from {watermark:,} to {new_watermark:,}; {done:,} late arrivals done.")
+    return new_watermark
@@ -0,0 +1,79 @@
+"""
+Range partitioner for the processing and modeling steps.
+
+Range tasks used to be planned with a window function (`NTILE`, later `ROW_NUMBER`) over every pending
+complaint ID: the whole pending set was read, sorted and numbered before the first worker could start.
+`plan_id_ranges` walks the ID index instead. Each boundary is a single keyset seek that skips `task_size`
+entries of an index ordered by `complaint_id` (the primary key, or the `(status, complaint_id)` index of
+`record_processing_status`), so planning reads the pending IDs once in index order, without a sort or a
+materialized window, and produces exactly balanced ranges.
+
+The number of IDs covered is capped at `limit`, so `--limit` bounds the work of a step exactly: the last
+range ends at the `limit`-th pending ID.
+"""
+import logging
+import time
+from sqlalchemy import text
+
+
+def plan_id_ranges(conn, table, task_size, limit=None, where_sql="1 = 1", params=None, id_column='complaint_id'):
+    """
+    Splits the IDs of `table` matching `where_sql` into consecutive ranges of `task_size` IDs.
+
+    Args:
+        conn: An active SQLAlchemy connection.
+        table (str): The table to partition. It needs an index whose order, after the equality columns of
+                     `where_sql`, is `id_column`.
+        task_size (int): IDs per range; the last range may be smaller.
+        limit (int, optional): The maximum number of IDs covered by all ranges together.
+        where_sql (str): A predicate selecting the IDs to partition (e.g. `status = :pending`).
+        params (dict, optional): Bind parameters for `where_sql`.
+        id_column (str): The ID column.
+
+    Returns:
+        list: (start_id, end_id) tuples in ID order. Every range holds exactly `task_size` matching IDs,
+              except possibly the last one.
+    """
+    task_size = max(1, int(task_size))
+    params = dict(params or {})
+    start = time.time()
+    boundary_sql = text(f"""
+        SELECT {id_column} FROM {table}
+        WHERE ({where_sql}) AND {id_column} > :after
+        ORDER BY {id_column}
+        LIMIT 1 OFFSET :offset
+    """)
+    first_sql = text(f"SELECT MIN({id_column}) FROM {table} WHERE ({where_sql}) AND {id_column} > :after")
+    last_sql = text(f"""
+        SELECT MAX({id_column}) FROM (
+            SELECT {id_column} FROM {table}
+            WHERE ({where_sql}) AND {id_column} > :after
+            ORDER BY {id_column}
+            LIMIT :remaining
+        ) AS tail
+    """)
+
+    ranges = []
+    planned = 0
+    after = -1
+    while limit is None or planned < limit:
+        seek_params = {**params, "after": after}
+        start_id = conn.execute(first_sql, seek_params).scalar_one_or_none()
+        if start_id is None:
+            break
+        size = task_size if limit is None else min(task_size, limit - planned)
+        # The ID `size` entries into the index from the range start; absent when fewer IDs are left.
+        end_id = conn.execute(boundary_sql, {**seek_params, "offset": size - 1}).scalar_one_or_none()
+        if end_id is None:
+            end_id = conn.execute(last_sql, {**seek_params, "remaining": size}).scalar_one()
+            ranges.append((start_id, end_id))
+            break
+        ranges.append((start_id, end_id))
+        planned += size
+        after = end_id
+
+    logging.info(
+        f"[Partitioner] Planned {len(ranges):,} ranges of up to {task_size:,} IDs over {table} "
+        f"in {time.time() - start:.2f}s" + (f" (limit {limit:,})." if limit is not None else ".")
+    )
+    return ranges
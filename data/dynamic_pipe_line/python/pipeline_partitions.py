@@ -0,0 +1,67 @@
+"""
+Monthly partitions of `fact_complaints` changed by the modeling step.
+
+The export step (`dynamic_pipeline_export.py`) writes the fact table as Parquet partitioned by the year and
+month of `date_received_key` and rewrites only the partitions whose rows changed since its last run. Modeling
+records them in `fact_partition_changes`:
+- before the facts of a queue are written, the partitions of the complaints' current fact rows (a re-modeled
+  complaint whose received date changed leaves its old partition),
+- after they are written, the partitions of the new fact rows.
+Each partition has one row whose `changed_at` is bumped on every change, so the table stays as small as the
+number of months. Fact rows without a received date belong to the partition (0, 0). A first export, or one
+with `--export-full`, reads the partitions from `fact_complaints` itself.
+"""
+from sqlalchemy import text
+
+PARTITION_CHANGES_TABLE = 'fact_partition_changes'
+UNKNOWN_PARTITION = (0, 0)
+
+
+def touched_partitions_sql(queue_table):
+    """Returns the SELECT of the distinct (year, month) partitions of the fact rows of the queued complaints."""
+    return f"""
+        SELECT DISTINCT COALESCE(d.year, {UNKNOWN_PARTITION[0]}) AS partition_year,
+                        COALESCE(d.month, {UNKNOWN_PARTITION[1]}) AS partition_month
+        FROM {queue_table} q
+        JOIN fact_complaints f ON f.complaint_id = q.complaint_id
+        LEFT JOIN dim_date d ON d.date_key = f.date_received_key
+    """
+
+
+def record_partition_changes(conn, queue_table):
+    """
+    Marks the partitions of the current fact rows of the queued complaints as changed now.
+
+    Args:
+        conn: An active SQLAlchemy connection.
+        queue_table (str): A table with the `complaint_id` of every complaint of the run.
+
+    Returns:
+        int: The rows written (MySQL counts an updated row twice).
+    """
+    return conn.execute(text(f"""
+        INSERT INTO {PARTITION_CHANGES_TABLE} (partition_year, partition_month)
+        SELECT partition_year, partition_month FROM ({touched_partitions_sql(queue_table)}) AS touched
+        ON DUPLICATE KEY UPDATE changed_at = CURRENT_TIMESTAMP(6)
+    """)).rowcount
+
+
+def touched_dates_sql(queue_table):
+    """Returns the SELECT of the received dates of the fact rows of the queued complaints, with their row counts."""
+    return f"""
+        SELECT d.full_date, COUNT(*)
+        FROM {queue_table} q
+        JOIN fact_complaints f ON f.complaint_id = q.complaint_id
+        LEFT JOIN dim_date d ON d.date_key = f.date_received_key
+        GROUP BY d.full_date
+    """
+
+
+def touched_dates(conn, queue_table):
+    """
+    Returns the received dates of the current fact rows of the queued complaints, for the run manifest.
+
+    Returns:
+        dict: Fact rows per `date` (None for rows without a received date).
+    """
+    return dict(conn.execute(text(touched_dates_sql(queue_table))).fetchall())
@@ -0,0 +1,150 @@
+"""
+Processing status of raw complaints, kept in the narrow `record_processing_status` table.
+
+Every raw complaint has one status row keyed by `complaint_id`. The steps move rows between statuses with
+set-based UPDATEs on this table instead of rewriting `cleaned_timestamp`/`modeling_timestamp` on the wide raw
+rows (which carry the TEXT narratives):
+
+    PENDING --clean--> CLEANED --model--> MODELED
+       \\--clean--> QUARANTINED        (delta ingestion moves changed rows back to PENDING)
+
+Pending work is found with an index-only range scan on `(status, complaint_id)`. Every transition also
+adjusts `record_processing_status_counts` in the same transaction, so `status_count` is a primary key lookup.
+"""
+import logging
+from sqlalchemy import text
+
+STATUS_PENDING = 0
+STATUS_CLEANED = 1
+STATUS_MODELED = 2
+STATUS_QUARANTINED = 3
+STATUSES = (STATUS_PENDING, STATUS_CLEANED, STATUS_MODELED, STATUS_QUARANTINED)
+
+STATUS_TABLE = 'record_processing_status'
+STATUS_COUNTS_TABLE = 'record_processing_status_counts'
+
+
+def status_filter(status, column='complaint_id'):
+    """
+    Returns a SQL predicate selecting the complaints currently in `status`.
+
+    Args:
+        status (int): One of `STATUSES`.
+        column (str): The (qualified) complaint ID column of the outer query.
+    """
+    # Correlated on the primary key, so a range-bounded outer query only probes the IDs in its range.
+    return f"EXISTS (SELECT 1 FROM {STATUS_TABLE} ps WHERE ps.complaint_id = {column} AND ps.status = {int(status)})"
+
+
+def status_count(conn, status):
+    """Returns the number of complaints in `status` from the counts table."""
+    count = conn.execute(
+        text(f"SELECT record_count FROM {STATUS_COUNTS_TABLE} WHERE status = :status"), {"status": status}
+    ).scalar_one_or_none()
+    return max(0, int(count or 0))
+
+
+def _adjust_counts(conn, from_status, to_status, row_count):
+    if not row_count:
+        return
+    if from_status is None:
+        conn.execute(text(f"UPDATE {STATUS_COUNTS_TABLE} SET record_count = record_count + :row_count WHERE status = :to_status;"),
+                     {"to_status": to_status, "row_count": row_count})
+        return
+    # One statement locks both counter rows in key order, so concurrent transitions cannot deadlock on them.
+    conn.execute(text(f"""
+        UPDATE {STATUS_COUNTS_TABLE}
+        SET record_count = record_count + IF(status = :to_status, :row_count, -:row_count)
+        WHERE status IN (:from_status, :to_status);
+    """), {"from_status": from_status, "to_status": to_status, "row_count": row_count})
+
+
+def transition(conn, from_status, to_status, where_sql="1 = 1", params=None, join_sql=""):
+    """
+    Moves the complaints matching `where_sql` from `from_status` to `to_status`.
+
+    Args:
+        conn: An active SQLAlchemy connection; the caller owns the transaction.
+        from_status (int): The status the rows must currently have.
+        to_status (int): The new status.
+        where_sql (str): Extra predicate on the status table (aliased `p`) and any joined tables.
+        params (dict, optional): Bind parameters for `where_sql` and `join_sql`.
+        join_sql (str, optional): JOIN clauses added to the UPDATE.
+
+    Returns:
+        int: The number of complaints moved.
+    """
+    moved = conn.execute(text(f"""
+        UPDATE {STATUS_TABLE} p
+        {join_sql}
+        SET p.status = :to_status
+        WHERE p.status = :from_status AND ({where_sql});
+    """), {**(params or {}), "from_status": from_status, "to_status": to_status}).rowcount
+    _adjust_counts(conn, from_status, to_status, moved)
+    return moved
+
+
+def add_pending(conn, id_sql, params=None):
+    """
+    Registers the complaints returned by `id_sql` as pending, skipping complaints that already have a status.
+
+    Returns:
+        int: The number of complaints registered.
+    """
+    added = conn.execute(text(f"""
+        INSERT INTO {STATUS_TABLE} (complaint_id, status)
+        SELECT ids.complaint_id, {STATUS_PENDING}
+        FROM ({id_sql}) AS ids
+        LEFT JOIN {STATUS_TABLE} p ON p.complaint_id = ids.complaint_id
+        WHERE p.complaint_id IS NULL;
+    """), params or {}).rowcount
+    _adjust_counts(conn, None, STATUS_PENDING, added)
+    return added
+
+
+def requeue(conn, where_sql, params=None, join_sql=""):
+    """
+    Moves the complaints matching `where_sql` back to pending from any later status.
+
+    Returns:
+        int: The number of complaints re-queued.
+    """
+    return sum(
+        transition(conn, status, STATUS_PENDING, where_sql, params, join_sql)
+        for status in STATUSES if status != STATUS_PENDING
+    )
+
+
+def refresh_counts(conn):
+    """Recomputes `record_processing_status_counts` from the status table with one index scan."""
+    counts = dict(conn.execute(text(f"SELECT status, COUNT(*) FROM {STATUS_TABLE} GROUP BY status")).fetchall())
+    for status in STATUSES:
+        conn.execute(text(f"UPDATE {STATUS_COUNTS_TABLE} SET record_count = :record_count WHERE status = :status;"),
+                     {"status": status, "record_count": int(counts.get(status, 0))})
+    return counts
+
+
+def backfill_status(conn):
+    """
+    Seeds the status table from the legacy raw timestamps the first time it is used.
+
+    Does nothing once the status table has rows, so it is cheap to call on every setup.
+    """
+    if conn.execute(text(f"SELECT 1 FROM {STATUS_TABLE} LIMIT 1")).first() is not None:
+        return 0
+    if conn.execute(text("SELECT 1 FROM consumer_complaints_raw LIMIT 1")).first() is None:
+        return 0
+    logging.info("[Processing Status] Backfilling record_processing_status from the raw table timestamps...")
+    backfilled = conn.execute(text(f"""
+        INSERT INTO {STATUS_TABLE} (complaint_id, status)
+        SELECT complaint_id,
+               CASE
+                   WHEN modeling_timestamp IS NOT NULL THEN {STATUS_MODELED}
+                   WHEN cleaned_timestamp IS NOT NULL THEN {STATUS_CLEANED}
+                   ELSE {STATUS_PENDING}
+               END
+        FROM consumer_complaints_raw;
+    """)).rowcount
+    counts = refresh_counts(conn)
+    logging.info(f"[Processing Status] Backfilled {backfilled:,} complaints: {counts}.")
+    return backfilled
@@ -0,0 +1,235 @@
+"""
+Run manifests: which `date_received` ranges each process and modeling run changed.
+
+Without them every pipeline run forces a full refresh of the BI model, because nothing records which dates a
+run touched. After each run with changes, `process_and_insert.run` and `modeling.run` call
+`record_run_manifest`, which writes:
+- one `pipeline_run_manifest` row with the whole manifest as JSON, whose `run_id` identifies the run,
+- one `pipeline_run_date_ranges` row per contiguous range of changed received dates, with the rows written,
+- the same manifest as `run_<run_id>_<step>.json` in the manifest directory (`--manifest-dir`).
+
+A manifest lists the changed date ranges (with the rows written in each, and the months they cover), the row
+counts of the run and, for modeling, the new members of every dimension. Modeling runs include the dates that
+re-modeled complaints moved away from, so the partitions they left are refreshed too. Process runs list the
+dates of the cleaned rows they wrote.
+
+`dirty_partitions_since(engine, run_id)` answers "which partitions changed since run X": it returns the day,
+month or year partitions of every range recorded after `run_id`, as `[start, end)` bounds that map directly to
+the RangeStart/RangeEnd parameters of an incremental refresh policy on `fact_complaints`.
+"""
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from pipeline_dimension_cache import DIMENSIONS
+from pipeline_duckdb_backend import is_duckdb
+
+MANIFEST_TABLE = 'pipeline_run_manifest'
+DATE_RANGE_TABLE = 'pipeline_run_date_ranges'
+DEFAULT_MANIFEST_DIR = os.path.join("data", "manifests")
+GRANULARITIES = ('day', 'month', 'year')
+# New members listed per dimension; the count is always complete.
+MEMBER_SAMPLE_SIZE = 20
+
+# (dimension table, key column, member column), once per table.
+MANIFEST_DIMENSIONS = list(dict.fromkeys((table, key_column, member_column) for _, _, table, key_column, member_column, _ in DIMENSIONS))
+
+
+def _fetch_rows(engine, sql, params=None):
+    """Runs a query with `:name` parameters on either backend and returns its rows as tuples."""
+    if is_duckdb(engine):
+        return engine.conn.execute(re.sub(r"(?<!:):(\w+)", r"$\1", sql), params or {}).fetchall()
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(text(sql), params or {}).fetchall()]
+
+
+def collapse_date_ranges(date_counts, dirty_dates=()):
+    """
+    Collapses changed dates into contiguous ranges.
+
+    Args:
+        date_counts (dict): Rows written per received date; the None key counts rows without a date.
+        dirty_dates (iterable, optional): Further changed dates without rows written (e.g. dates left behind).
+
+    Returns:
+        tuple: (list of {"start", "end", "rows"} ranges with inclusive ends in date order, rows without a date)
+    """
+    dates = sorted({day for day in date_counts if day is not None} | {day for day in dirty_dates if day is not None})
+    ranges = []
+    for day in dates:
+        if ranges and day == ranges[-1]["end"] + timedelta(days=1):
+            ranges[-1]["end"] = day
+            ranges[-1]["rows"] += date_counts.get(day, 0)
+        else:
+            ranges.append({"start": day, "end": day, "rows": date_counts.get(day, 0)})
+    return ranges, date_counts.get(None, 0)
+
+
+def _partition_starts(start, end, granularity):
+    """Yields the first day of every partition of `granularity` that overlaps [start, end]."""
+    if granularity == 'day':
+        current = start
+        while current <= end:
+            yield current
+            current += timedelta(days=1)
+    elif granularity == 'month':
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            yield date(year, month, 1)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    else:
+        for year in range(start.year, end.year + 1):
+            yield date(year, 1, 1)
+
+
+def _partition_end(partition_start, granularity):
+    """Returns the exclusive end of the partition starting at `partition_start`."""
+    if granularity == 'day':
+        return partition_start + timedelta(days=1)
+    if granularity == 'month':
+        if partition_start.month == 12:
+            return date(partition_start.year + 1, 1, 1)
+        return date(partition_start.year, partition_start.month + 1, 1)
+    return date(partition_start.year + 1, 1, 1)
+
+
+def dimension_high_water(engine):
+    """Returns the highest surrogate key of every dimension, to find the members a run adds."""
+    return {
+        table: _fetch_rows(engine, f"SELECT COALESCE(MAX({key_column}), 0) FROM {table}")[0][0]
+        for table, key_column, _ in MANIFEST_DIMENSIONS
+    }
+
+
+def new_dimension_members(engine, high_water):
+    """
+    Returns the members added to each dimension since `dimension_high_water` returned `high_water`.
+
+    Returns:
+        dict: {table: {"count": n, "sample": [up to MEMBER_SAMPLE_SIZE members]}} for the dimensions that grew.
+    """
+    members = {}
+    for table, key_column, member_column in MANIFEST_DIMENSIONS:
+        params = {"high_water": high_water.get(table, 0)}
+        count = _fetch_rows(engine, f"SELECT COUNT(*) FROM {table} WHERE {key_column} > :high_water", params)[0][0]
+        if count:
+            sample = _fetch_rows(engine, f"""
+                SELECT {member_column} FROM {table} WHERE {key_column} > :high_water
+                ORDER BY {key_column} LIMIT {MEMBER_SAMPLE_SIZE}
+            """, params)
+            members[table] = {"count": count, "sample": [str(member) for member, in sample]}
+    return members
+
+
+def _insert_manifest(engine, step, rows_written, ranges, manifest_json):
+    """Inserts the manifest and its date ranges and returns the new run ID."""
+    range_start = ranges[0]["start"] if ranges else None
+    range_end = ranges[-1]["end"] if ranges else None
+    range_rows = [(r["start"], r["end"], r["rows"]) for r in ranges]
+    if is_duckdb(engine):
+        conn = engine.conn
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            run_id = conn.execute(
+                f"INSERT INTO {MANIFEST_TABLE} (pipeline_step, rows_written, range_start, range_end, manifest) "
+                f"VALUES (?, ?, ?, ?, ?) RETURNING run_id",
+                [step, rows_written, range_start, range_end, manifest_json]
+            ).fetchone()[0]
+            if range_rows:
+                conn.executemany(
+                    f"INSERT INTO {DATE_RANGE_TABLE} (run_id, range_start, range_end, row_count) VALUES (?, ?, ?, ?)",
+                    [(run_id, *row) for row in range_rows]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return run_id
+    with engine.begin() as conn:
+        run_id = conn.execute(text(f"""
+            INSERT INTO {MANIFEST_TABLE} (pipeline_step, rows_written, range_start, range_end, manifest)
+            VALUES (:step, :rows_written, :range_start, :range_end, :manifest)
+        """), {"step": step, "rows_written": rows_written, "range_start": range_start, "range_end": range_end,
+               "manifest": manifest_json}).lastrowid
+        if range_rows:
+            conn.execute(text(f"""
+                INSERT INTO {DATE_RANGE_TABLE} (run_id, range_start, range_end, row_count)
+                VALUES (:run_id, :range_start, :range_end, :row_count)
+            """), [{"run_id": run_id, "range_start": start, "range_end": end, "row_count": rows}
+                   for start, end, rows in range_rows])
+    return run_id
+
+
+def record_run_manifest(engine, step, row_counts, date_counts, dirty_dates=(), new_members=None,
+                        manifest_dir=DEFAULT_MANIFEST_DIR):
+    """
+    Writes the manifest of a run to `pipeline_run_manifest`, `pipeline_run_date_ranges` and a JSON file.
+
+    Args:
+        engine: The SQLAlchemy engine, or a `DuckDBBackend`.
+        step (str): The step that ran ('process' or 'model').
+        row_counts (dict): Row counts of the run; `rows_written` is their first value.
+        date_counts (dict): Rows written per received date (None for rows without one).
+        dirty_dates (iterable, optional): Changed dates without rows written, such as dates re-modeled
+                                          complaints moved away from.
+        new_members (dict, optional): The result of `new_dimension_members`.
+        manifest_dir (str, optional): The directory of the JSON files.
+
+    Returns:
+        dict: The manifest, with its `run_id`.
+    """
+    ranges, undated_rows = collapse_date_ranges(date_counts, dirty_dates)
+    months = sorted({month.strftime("%Y-%m") for r in ranges for month in _partition_starts(r["start"], r["end"], 'month')})
+    manifest = {
+        "step": step,
+        "backend": "duckdb" if is_duckdb(engine) else "mysql",
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "row_counts": row_counts,
+        "date_range": {"start": ranges[0]["start"], "end": ranges[-1]["end"]} if ranges else None,
+        "date_ranges": ranges,
+        "undated_rows": undated_rows,
+        "months": months,
+        "new_dimension_members": new_members or {},
+    }
+    rows_written = next(iter(row_counts.values()), 0)
+    manifest["run_id"] = _insert_manifest(engine, step, rows_written, ranges, json.dumps(manifest, default=str))
+
+    os.makedirs(manifest_dir, exist_ok=True)
+    path = os.path.join(manifest_dir, f"run_{manifest['run_id']:06d}_{step}.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, default=str)
+    os.replace(path + ".tmp", path)
+    logging.info(
+        f"[Run Manifest] Run {manifest['run_id']} ({step}): {len(ranges):,} changed date ranges over "
+        f"{len(months):,} months, {sum(m['count'] for m in manifest['new_dimension_members'].values()):,} new "
+        f"dimension members. Written to '{path}'."
+    )
+    return manifest
+
+
+def dirty_partitions_since(engine, run_id, granularity='month', step='model'):
+    """
+    Returns the partitions changed by the runs of `step` recorded after `run_id`.
+
+    Args:
+        engine: The SQLAlchemy engine, or a `DuckDBBackend`.
+        run_id (int): The last run the consumer has refreshed; 0 for every recorded run.
+        granularity (str, optional): 'day', 'month' (default) or 'year' partitions.
+        step (str, optional): 'model' (default; changes of `fact_complaints`) or 'process' (changes of
+                              `consumer_complaints_cleaned`).
+
+    Returns:
+        list: Sorted (start, end) date tuples, `end` exclusive, one per dirty partition.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'. Expected one of {GRANULARITIES}.")
+    rows = _fetch_rows(engine, f"""
+        SELECT r.range_start, r.range_end
+        FROM {DATE_RANGE_TABLE} r
+        JOIN {MANIFEST_TABLE} m ON m.run_id = r.run_id
+        WHERE r.run_id > :run_id AND m.pipeline_step = :step
+    """, {"run_id": int(run_id), "step": step})
+    starts = {partition for start, end in rows for partition in _partition_starts(start, end, granularity)}
+    return [(start, _partition_end(start, granularity)) for start in sorted(starts)]
@@ -0,0 +1,267 @@
+"""
+Dynamic range scheduling for the processing and modeling worker pools.
+
+Instead of one NTILE partition per worker, a step's complaint IDs are split into many small, consecutive
+range tasks (see `pipeline_partitioner.plan_id_ranges`). `run_range_tasks` hands them to the pool one at
+a time, so a worker that hits a slow range (dense narratives, a busy index page) only delays that range while
+the other workers keep pulling new ones. A task that raises is retried on its own, up to
+`DEFAULT_MAX_ATTEMPTS` times, before the step fails with the ranges that could not be completed. A task that
+fails outside the worker function (its arguments or result cannot be pickled) is retried the same way, and a
+worker process that dies with a task in flight fails the step instead of leaving it waiting forever.
+
+`run_stage_graph` chains several such steps (e.g. clean -> consolidate -> timestamp) so that each task moves
+to the next stage as soon as it is ready, with bounded queues between the stages for backpressure.
+
+The pool size comes from `--workers` or, by default, from the host's cores capped by the connections the
+database can still accept, counting the processes of every stage pool (see `resolve_worker_count`). With `pipeline_worker_runtime.init_worker` as the
+pool initializer, every pool process keeps one engine for all its tasks, and each run logs the connects,
+checkouts and connection wait time of its worker processes.
+"""
+import logging
+import os
+import queue
+from collections import deque
+from contextlib import ExitStack
+from multiprocessing import Pool, cpu_count
+from sqlalchemy import text
+from pipeline_utils import PipelineError
+from pipeline_worker_runtime import connection_metrics, log_connection_metrics
+
+DEFAULT_MAX_ATTEMPTS = 3
+# Processing workers hold a read and a write connection at the same time.
+CONNECTIONS_PER_WORKER = 2
+# Connections left free for the main process, monitoring and other clients.
+RESERVED_CONNECTIONS = 10
+# How long the scheduler waits for a completion before it checks that no pool process has died.
+LIVENESS_CHECK_SECONDS = 30
+
+
+def stage_pool_sizes(workers, consolidate=True):
+    """
+    Returns the pool sizes of a work -> consolidate -> timestamp stage graph with `workers` processes in its
+    first stage: half as many consolidation processes (when `consolidate`) and one timestamp process.
+    """
+    return [workers] + ([max(1, workers // 2)] if consolidate else []) + [1]
+
+
+def resolve_worker_count(engine, requested=None, connections_per_worker=CONNECTIONS_PER_WORKER, stage_sizes=None):
+    """
+    Returns the number of worker processes for a step.
+
+    Args:
+        engine: The SQLAlchemy engine for database connectivity.
+        requested (int, optional): An explicit worker count (`--workers`); used as is when given.
+        connections_per_worker (int): Database connections each pool process holds at once.
+        stage_sizes (callable, optional): Maps a worker count to the sizes of every pool the step starts
+                                          (e.g. `stage_pool_sizes`), so the connection budget covers all of
+                                          them. Defaults to a single pool of that many workers.
+
+    Returns:
+        int: `requested`, or the host's cores capped so that the processes of all stage pools fit in the free
+             `max_connections` of the database.
+    """
+    if requested:
+        return max(1, int(requested))
+    stage_sizes = stage_sizes or (lambda workers: [workers])
+    cores = cpu_count()
+    try:
+        with engine.connect() as conn:
+            max_connections = int(conn.execute(text("SELECT @@max_connections")).scalar_one())
+            connected = int(conn.execute(text("SHOW GLOBAL STATUS LIKE 'Threads_connected'")).first()[1])
+        process_limit = max(1, (max_connections - connected - RESERVED_CONNECTIONS) // connections_per_worker)
+    except Exception as e:
+        logging.warning(f"[Scheduler] Could not read max_connections, sizing the pool from cores only: {e}")
+        process_limit = None
+    workers = cores if process_limit is None else max(1, min(cores, process_limit))
+    while process_limit is not None and workers > 1 and sum(stage_sizes(workers)) > process_limit:
+        workers -= 1
+    logging.info(
+        f"[Scheduler] Using {workers} workers, {sum(stage_sizes(workers))} processes across the stages "
+        f"({cores} cores, connections for {process_limit if process_limit is not None else 'unknown'} processes)."
+    )
+    return workers
+
+
+def _run_task(task):
+    """
+    Runs one task in a pool process and reports its exception instead of raising it, together with the
+    process's connection counters.
+    """
+    index, worker, args = task
+    try:
+        outcome = index, worker(args), None
+    except Exception as e:
+        logging.error(f"[Scheduler] Task {index} ({worker.__name__}) failed: {e}", exc_info=True)
+        outcome = index, None, f"{type(e).__name__}: {e}"
+    return outcome + (os.getpid(), connection_metrics())
+
+
+def _exited_workers(pools, worker_pids):
+    """
+    Returns the PIDs of pool processes that have exited since `worker_pids` was taken.
+
+    A pool replaces a dead process but never reports the task it was running, so that task's result would be
+    waited for forever.
+    """
+    # `Pool._pool` is the pool's list of live worker processes; the pool has no public equivalent.
+    current = {process.pid for pool in pools for process in pool._pool if process.exitcode is None}
+    return sorted(worker_pids - current)
+
+
+def run_stage_graph(stages, task_args, label, queue_size=None, max_attempts=DEFAULT_MAX_ATTEMPTS, initializer=None,
+                    initargs=()):
+    """
+    Streams every task through a chain of stages, each with its own pool.
+
+    A task moves to the next stage as soon as its previous stage finishes, so the stages overlap instead of
+    waiting for each other at a barrier. Each stage only starts new work while fewer than `queue_size` of its
+    results are waiting for the next stage, which bounds the intermediate state (e.g. staging tables). A failed
+    stage is retried on its own; after a task fails for good, no new tasks are started and the graph drains.
+
+    Args:
+        stages (list): (name, worker, processes, build_args) tuples. The first stage runs on `task_args[index]`.
+                       Later stages run on `build_args(index, results)`, where `results` holds the task's
+                       previous stage results; returning None skips the stage for that task. It is
+                       called once per task, retries reuse its args.
+        task_args (list): One args tuple per task for the first stage.
+        label (str): Graph name used in log messages.
+        queue_size (int, optional): Results allowed to wait between two stages. Defaults to twice the
+                                    processes of the next stage.
+        max_attempts (int): Attempts per task and stage before the graph fails.
+        initializer (callable, optional): Pool process initializer.
+        initargs (tuple, optional): Arguments for `initializer`.
+
+    Returns:
+        list: One list per task with the result of every stage (None for skipped stages), in task order.
+
+    Raises:
+        PipelineError: If a stage still fails after `max_attempts` attempts, or a pool process dies while
+                       tasks are in flight.
+    """
+    if not task_args:
+        return []
+    num_stages = len(stages)
+    processes = [max(1, min(stage[2], len(task_args))) for stage in stages]
+    results = [[None] * num_stages for _ in task_args]
+    ready = [deque() for _ in stages]
+    ready[0].extend(range(len(task_args)))
+    in_flight = [0] * num_stages
+    attempts = {}
+    stage_args = {}
+    failures = {}
+    process_metrics = {}
+    completions = queue.Queue()
+    finished = 0
+    log_every = max(1, len(task_args) // 10)
+    logging.info(
+        f"[Scheduler] {label}: streaming {len(task_args):,} tasks through "
+        + " -> ".join(f"{stage[0]} ({procs})" for stage, procs in zip(stages, processes))
+    )
+
+    def fail(index, stage_num, error):
+        # Called by the pool when the task never reached `_run_task` or its result could not be returned.
+        logging.error(f"[Scheduler] Task {index} ({stages[stage_num][0]}) failed in the pool: {error}")
+        completions.put((stage_num, (index, None, f"{type(error).__name__}: {error}", None, None)))
+
+    def advance(index, stage_num):
+        nonlocal finished
+        if stage_num + 1 < num_stages:
+            ready[stage_num + 1].append(index)
+            return
+        finished += 1
+        if finished % log_every == 0 or finished == len(task_args):
+            logging.info(f"[Scheduler] {label}: {finished:,}/{len(task_args):,} tasks through all stages.")
+
+    with ExitStack() as stack:
+        pools = [stack.enter_context(Pool(processes=procs, initializer=initializer, initargs=initargs)) for procs in processes]
+        worker_pids = {process.pid for pool in pools for process in pool._pool}
+        while True:
+            # Fill the downstream stages first so finished work drains before new work is started.
+            for stage_num in range(num_stages - 1, -1, -1):
+                name, worker, _, build_args = stages[stage_num]
+                limit = (queue_size or 2 * processes[stage_num + 1]) if stage_num + 1 < num_stages else None
+                while ready[stage_num] and in_flight[stage_num] < processes[stage_num]:
+                    if stage_num == 0 and failures:
+                        break
+                    if limit is not None and len(ready[stage_num + 1]) + in_flight[stage_num] >= limit:
+                        break
+                    index = ready[stage_num].popleft()
+                    if (index, stage_num) in stage_args:
+                        args = stage_args[(index, stage_num)]
+                    else:
+                        args = task_args[index] if stage_num == 0 else build_args(index, results[index])
+                        stage_args[(index, stage_num)] = args
+                    if args is None:
+                        advance(index, stage_num)
+                        continue
+                    attempts[(index, stage_num)] = attempts.get((index, stage_num), 0) + 1
+                    pools[stage_num].apply_async(
+                        _run_task, ((index, worker, args),),
+                        callback=lambda outcome, stage_num=stage_num: completions.put((stage_num, outcome)),
+                        error_callback=lambda error, index=index, stage_num=stage_num: fail(index, stage_num, error)
+                    )
+                    in_flight[stage_num] += 1
+
+            if not any(in_flight):
+                if any(ready[1:]) or (ready[0] and not failures):
+                    continue
+                break
+
+            try:
+                stage_num, (index, result, error, pid, metrics) = completions.get(timeout=LIVENESS_CHECK_SECONDS)
+            except queue.Empty:
+                exited = _exited_workers(pools, worker_pids)
+                if exited:
+                    raise PipelineError(
+                        f"{label}: worker processes {exited} exited with {sum(in_flight):,} tasks in flight; "
+                        f"their results will never arrive."
+                    )
+                continue
+            in_flight[stage_num] -= 1
+            # The counters are cumulative per process, so the latest report of each process is its total.
+            if pid is not None:
+                process_metrics[pid] = metrics
+            name = stages[stage_num][0]
+            if error is None:
+                results[index][stage_num] = result
+                advance(index, stage_num)
+            elif attempts[(index, stage_num)] < max_attempts:
+                logging.warning(
+                    f"[Scheduler] {label}: retrying {name} for task {index} "
+                    f"(attempt {attempts[(index, stage_num)] + 1}/{max_attempts})."
+                )
+                ready[stage_num].appendleft(index)
+            else:
+                failures[index] = f"{name}: {error}"
+
+    totals = {name: sum(metrics[name] for metrics in process_metrics.values()) for name in connection_metrics()}
+    log_connection_metrics(totals, f"[Scheduler] {label}: {len(process_metrics)} worker processes,")
+
+    if failures:
+        details = '; '.join(f"task {index} {task_args[index][:3]}: {error}" for index, error in sorted(failures.items())[:5])
+        raise PipelineError(f"{label}: {len(failures):,} tasks failed after {max_attempts} attempts ({details}).")
+    return results
+
+
+def run_range_tasks(worker, task_args, num_workers, label, max_attempts=DEFAULT_MAX_ATTEMPTS, initializer=None,
+                    initargs=()):
+    """
+    Runs `worker` once per argument tuple on a pool that hands tasks out one at a time.
+
+    Args:
+        worker (callable): A module-level worker function taking one args tuple. It must raise on failure.
+        task_args (list): One args tuple per task.
+        num_workers (int): Pool size; capped at the number of tasks.
+        label (str): Step name used in log messages.
+        max_attempts (int): Attempts per task before the step fails.
+        initializer (callable, optional): Pool process initializer.
+        initargs (tuple, optional): Arguments for `initializer`.
+
+    Returns:
+        list: The worker results, in the order of `task_args`.
+
+    Raises:
+        PipelineError: If a task still fails after `max_attempts` attempts.
+    """
+    stages = [(label, worker, num_workers, None)]
+    return [task_results[0] for task_results in run_stage_graph(stages, task_args, label, None, max_attempts, initializer, initargs)]
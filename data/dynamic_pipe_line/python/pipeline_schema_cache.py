@@ -0,0 +1,134 @@
+"""
+Per-process cache of reflected table columns and prepared SQL statements.
+
+Workers used to reflect a table's columns with `inspect(conn).get_columns()` and to re-read, re-format and
+re-split their SQL files on every batch. This module keeps, for the life of the process:
+- the column list of each table, reflected once (`get_table_columns`);
+- the statements of each SQL file, read and split once and compiled into `text()` objects once per set of
+  format parameters (`get_sql_statements`).
+
+`ensure_tables_exist` calls `invalidate_schema_cache` after running the setup scripts, because they may add
+columns. Pool processes are started after setup, so they never see a stale column list.
+
+Every miss is timed, and `log_schema_cache_stats` reports hits, misses and the time spent preparing, so the
+per-batch overhead shows up next to the step timings.
+"""
+import logging
+import time
+from sqlalchemy import text, inspect
+
+# Compiled statements kept per process; each entry is one SQL file formatted with one set of table names.
+MAX_COMPILED_SCRIPTS = 256
+
+_table_columns = {}
+_script_statements = {}
+_compiled_statements = {}
+_stats = {"column_hits": 0, "column_misses": 0, "sql_hits": 0, "sql_misses": 0, "prepare_seconds": 0.0}
+
+
+def get_table_columns(conn, table_name):
+    """
+    Returns the column names of `table_name`, reflecting the table only the first time it is asked for.
+
+    Args:
+        conn: An active SQLAlchemy connection, used only on a miss.
+        table_name (str): The table to describe.
+
+    Returns:
+        list: The column names in table order. Callers must not modify it.
+    """
+    columns = _table_columns.get(table_name)
+    if columns is not None:
+        _stats["column_hits"] += 1
+        return columns
+    start = time.perf_counter()
+    columns = [column['name'] for column in inspect(conn).get_columns(table_name)]
+    _table_columns[table_name] = columns
+    _stats["column_misses"] += 1
+    _stats["prepare_seconds"] += time.perf_counter() - start
+    return columns
+
+
+def _read_statements(script_path, split_statements):
+    key = (script_path, split_statements)
+    if key not in _script_statements:
+        with open(script_path, "r", encoding="utf-8") as file:
+            sql_script = file.read()
+        statements = [sql_script] if not split_statements else [s for s in sql_script.split(';') if s.strip()]
+        _script_statements[key] = [s for s in statements if s.strip()]
+    return _script_statements[key]
+
+
+def get_sql_statements(script_path, split_statements=True, format_params=None):
+    """
+    Returns the statements of an SQL file as compiled `text()` objects.
+
+    The file is read and split once per process, then formatted with `format_params` (table names and
+    other identifiers) and compiled once per distinct set of them.
+
+    Args:
+        script_path (str): Path to the .sql file.
+        split_statements (bool): If True, the script is split on ';' into individual statements.
+        format_params (dict, optional): Values formatted into the script with `str.format`.
+
+    Returns:
+        list: The `TextClause` statements, in file order (empty for an empty script).
+    """
+    format_key = tuple(sorted((format_params or {}).items()))
+    key = (script_path, split_statements, format_key)
+    statements = _compiled_statements.get(key)
+    if statements is not None:
+        _stats["sql_hits"] += 1
+        return statements
+    start = time.perf_counter()
+    raw_statements = _read_statements(script_path, split_statements)
+    if format_params:
+        raw_statements = [statement.format(**format_params) for statement in raw_statements]
+    statements = [text(statement) for statement in raw_statements]
+    if len(_compiled_statements) >= MAX_COMPILED_SCRIPTS:
+        # Per-worker staging table names make some keys single-use; drop the oldest entry.
+        _compiled_statements.pop(next(iter(_compiled_statements)))
+    _compiled_statements[key] = statements
+    _stats["sql_misses"] += 1
+    _stats["prepare_seconds"] += time.perf_counter() - start
+    return statements
+
+
+def invalidate_schema_cache(table_name=None):
+    """
+    Forgets cached column lists: those of `table_name` (e.g. a dropped staging table) or, without it, all of
+    them together with the prepared SQL.
+    """
+    if table_name is not None:
+        _table_columns.pop(table_name, None)
+        return
+    _table_columns.clear()
+    _script_statements.clear()
+    _compiled_statements.clear()
+
+
+def schema_cache_stats():
+    """Returns a copy of the hit, miss and preparation time counters of this process."""
+    return dict(_stats)
+
+
+def log_schema_cache_stats(log_prefix="[Schema Cache]", since=None):
+    """
+    Logs the cache counters of this process.
+
+    Args:
+        log_prefix (str): Prefix for the log message.
+        since (dict, optional): An earlier `schema_cache_stats()` snapshot; only the activity after it is logged.
+
+    Returns:
+        dict: The logged counters.
+    """
+    stats = schema_cache_stats()
+    if since:
+        stats = {name: value - since.get(name, 0) for name, value in stats.items()}
+    logging.info(
+        f"{log_prefix} columns {stats['column_hits']:,} hits / {stats['column_misses']:,} misses, "
+        f"SQL {stats['sql_hits']:,} hits / {stats['sql_misses']:,} misses, "
+        f"{stats['prepare_seconds'] * 1000:,.1f} ms preparing."
+    )
+    return stats
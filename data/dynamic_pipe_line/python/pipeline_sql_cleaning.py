@@ -0,0 +1,304 @@
+"""
+In-database cleaning engine, selected with `--clean-engine sql`.
+
+The pandas engine moves every raw row (narratives included) into the workers and the cleaned rows back. This
+engine applies the rules of `clean_dataframe` as set-based `INSERT ... SELECT` statements per complaint ID
+range, so raw rows never leave the database:
+- Standardization mappings are generated from `data_standardization_mappings.py` (through the compiled
+  lookups of `pipeline_standardization`) into `clean_standardization_map` and applied with joins.
+- Title-casing `company` and strict `%Y-%m-%d` date parsing have no exact MySQL equivalent. They are computed
+  by pandas once per distinct raw value and cached in `clean_value_dictionary`; only these short values are
+  read into Python.
+- Stripping, zip code validation, `timely_response`, state codes, quarantine routing and the SHA256
+  `content_hash` are computed in SQL.
+
+Cleaned rows are identical to the pandas engine's; `pipeline_benchmarks.py clean-engine-parity` checks this
+on real data.
+"""
+import logging
+from functools import lru_cache
+import pandas as pd
+from sqlalchemy import text
+import data_standardization_mappings as mappings
+from dynamic_pipeline_process_and_insert import (
+    RAW_SOURCE_COLUMNS, STANDARDIZED_COLUMNS, QUARANTINE_REASONS, ZIP_CODE_PATTERN, CONTENT_HASH_COLUMNS,
+    OUTPUT_HASH_COLUMNS
+)
+from pipeline_hashing import HASH_SEPARATOR
+from pipeline_processing_status import STATUS_PENDING, STATUS_MODELED, status_filter, transition
+from pipeline_staging_writer import CLEANED_COLUMN_TYPES
+from pipeline_standardization import get_lookup
+
+CLEAN_ENGINES = ('pandas', 'sql')
+
+# Columns cleaned through `clean_value_dictionary` instead of SQL expressions.
+DICTIONARY_COLUMNS = ('company', 'date_received', 'date_sent_to_company')
+
+# Case-, accent- and trailing-space-exact comparisons, like the Python string comparisons they replace.
+EXACT_COLLATION = 'utf8mb4_0900_bin'
+
+# Characters removed by pandas' `str.strip()`: ICU's \s plus the separators it does not include.
+_WHITESPACE_CLASS = r'[\s\x{0B}\x{1C}-\x{1F}\x{85}]'
+# pandas evaluates the zip regexes with RE2, where \d is ASCII-only; in ICU it is not.
+_ZIP_SANITIZE_PATTERN = r'[^0-9Xx-]'
+_ZIP_VALID_PATTERN = ZIP_CODE_PATTERN.replace(r'\d', '[0-9]')
+
+
+def _literal(value):
+    """Renders a Python string as a MySQL string literal."""
+    return "'" + value.replace('\\', '\\\\').replace("'", "''") + "'"
+
+
+def _exact(expr):
+    """Converts a string expression to utf8mb4 with the exact collation."""
+    return f"CONVERT({expr} USING utf8mb4) COLLATE {EXACT_COLLATION}"
+
+
+def _strip(column):
+    """The raw column stripped of leading and trailing whitespace, as `clean_dataframe` sees it."""
+    pattern = _literal(f"^{_WHITESPACE_CLASS}+|{_WHITESPACE_CLASS}+$")
+    return _exact(f"REGEXP_REPLACE(r.`{column}`, {pattern}, '')")
+
+
+def sync_mapping_tables(conn):
+    """Regenerates `clean_standardization_map` from the Python mapping dicts."""
+    lookups = [get_lookup(col, mapping, default) for col, mapping, default, _ in STANDARDIZED_COLUMNS]
+    lookups.append(get_lookup('state_code', mappings.STATE_MAP))
+    rows = [
+        {"mapping_name": lookup.name, "map_key": key, "standardized_value": value}
+        for lookup in lookups for key, value in lookup.table.items()
+    ]
+    conn.execute(text("DELETE FROM clean_standardization_map;"))
+    conn.execute(text("""
+        INSERT INTO clean_standardization_map (mapping_name, map_key, standardized_value)
+        VALUES (:mapping_name, :map_key, :standardized_value)
+    """), rows)
+    logging.info(f"[SQL Cleaning] Loaded {len(rows):,} mapping entries for {len(lookups)} columns into clean_standardization_map.")
+
+
+def dictionary_values(column, raw_values):
+    """
+    Computes what `clean_dataframe` makes of distinct raw values of a dictionary column.
+
+    Args:
+        column (str): One of `DICTIONARY_COLUMNS`.
+        raw_values (list): Distinct, non-NULL raw values.
+
+    Returns:
+        list: (clean value or None, is_valid) tuples aligned with `raw_values`.
+    """
+    stripped = pd.Series(raw_values, dtype='str').str.strip()
+    if column == 'company':
+        return [(value, 1) for value in stripped.str.title().tolist()]
+    parsed = pd.to_datetime(stripped, errors='coerce', format='%Y-%m-%d')
+    invalid = parsed.isnull() & stripped.notnull() & (stripped != '')
+    dates = [None if pd.isnull(value) else str(value) for value in parsed.dt.date.tolist()]
+    return list(zip(dates, (~invalid).astype(int).tolist()))
+
+
+def sync_value_dictionary(conn, where_sql, params):
+    """
+    Adds the raw values of `DICTIONARY_COLUMNS` that are not in `clean_value_dictionary` yet.
+
+    Args:
+        conn: An active SQLAlchemy connection.
+        where_sql (str): Selects the raw rows about to be cleaned; the raw table is aliased `r`.
+        params (dict): Bind parameters for `where_sql`.
+    """
+    for column in DICTIONARY_COLUMNS:
+        raw_values = conn.execute(text(f"""
+            SELECT DISTINCT {_exact(f'r.`{column}`')}
+            FROM consumer_complaints_raw r
+            LEFT JOIN clean_value_dictionary d
+              ON d.column_name = :column_name AND d.raw_value = {_exact(f'r.`{column}`')}
+            WHERE {where_sql} AND r.`{column}` IS NOT NULL AND d.raw_value IS NULL
+        """), {**params, "column_name": column}).scalars().all()
+        if not raw_values:
+            continue
+        rows = [
+            {"column_name": column, "raw_value": raw_value, "clean_value": clean_value, "is_valid": is_valid}
+            for raw_value, (clean_value, is_valid) in zip(raw_values, dictionary_values(column, raw_values))
+        ]
+        conn.execute(text("""
+            INSERT IGNORE INTO clean_value_dictionary (column_name, raw_value, clean_value, is_valid)
+            VALUES (:column_name, :raw_value, :clean_value, :is_valid)
+        """), rows)
+        logging.info(f"[SQL Cleaning] Added {len(rows):,} distinct '{column}' values to clean_value_dictionary.")
+
+
+@lru_cache(maxsize=None)
+def _classified_sql(pending_only):
+    """
+    SELECT over the raw rows of `:start_id`..`:end_id` with their stripped and looked-up values and
+    `failure_stage`, the index in `QUARANTINE_REASONS` of the first check a row fails (NULL if it passes).
+    """
+    stripped = {col: _strip(col) for col in RAW_SOURCE_COLUMNS if col != 'complaint_id'}
+    select = ["r.complaint_id", "r.row_hash"] + [f"{expr} AS `t_{col}`" for col, expr in stripped.items()]
+    select.append(f"REGEXP_REPLACE({stripped['zip_code']}, {_literal(_ZIP_SANITIZE_PATTERN)}, '') AS zip_sanitized")
+    select.append(f"COALESCE(m_state_code.standardized_value, UPPER({stripped['state_code']})) AS state_value")
+
+    joins = []
+    for col in DICTIONARY_COLUMNS:
+        select += [f"d_{col}.clean_value AS `{col}_clean`", f"d_{col}.is_valid AS `{col}_valid`"]
+        joins.append(
+            f"LEFT JOIN clean_value_dictionary d_{col} "
+            f"ON d_{col}.column_name = '{col}' AND d_{col}.raw_value = {_exact(f'r.`{col}`')}"
+        )
+    for col in [col for col, *_ in STANDARDIZED_COLUMNS] + ['state_code']:
+        joins.append(
+            f"LEFT JOIN clean_standardization_map m_{col} "
+            f"ON m_{col}.mapping_name = '{col}' AND m_{col}.map_key = UPPER({stripped[col]})"
+        )
+        if col != 'state_code':
+            select.append(f"m_{col}.standardized_value AS `{col}_mapped`")
+
+    valid_states = ', '.join(_literal(value) for value in sorted(get_lookup('state_code', mappings.STATE_MAP).values))
+    checks = [
+        "s.t_zip_code IS NULL OR s.t_zip_code = ''",
+        f"NOT REGEXP_LIKE(s.zip_sanitized, {_literal(_ZIP_VALID_PATTERN)}, 'c')",
+        "s.date_received_valid = 0",
+        "s.date_sent_to_company_valid = 0",
+        "s.t_timely_response IS NOT NULL AND s.t_timely_response <> '' AND UPPER(s.t_timely_response) NOT IN ('YES', 'NO')",
+        f"s.state_value IS NOT NULL AND s.state_value NOT IN ({valid_states})",
+    ]
+    assert len(checks) == len(QUARANTINE_REASONS)
+    failure_stage = "CASE " + " ".join(f"WHEN {check} THEN {stage}" for stage, check in enumerate(checks)) + " END"
+
+    where_sql = "r.complaint_id BETWEEN :start_id AND :end_id"
+    if pending_only:
+        where_sql += f" AND {status_filter(STATUS_PENDING, 'r.complaint_id')}"
+    newline = '\n'
+    return f"""
+        SELECT s.*, {failure_stage} AS failure_stage
+        FROM (
+            SELECT {f',{newline}                   '.join(select)}
+            FROM consumer_complaints_raw r
+            {f'{newline}            '.join(joins)}
+            WHERE {where_sql}
+        ) AS s
+    """
+
+
+def _cleaned_expressions():
+    """SQL expressions of the cleaned columns over `_classified_sql`, keyed by `CLEANED_COLUMN_TYPES` name."""
+    cleaned = {
+        'date_received': "CAST(q.date_received_clean AS DATE)",
+        'date_sent_to_company': "CAST(q.date_sent_to_company_clean AS DATE)",
+        'consumer_complaint_narrative': "COALESCE(NULLIF(q.t_consumer_complaint_narrative, ''), 'None')",
+        'company': "q.company_clean",
+        'state_code': "COALESCE(q.state_value, 'N/A')",
+        'zip_code': "q.zip_sanitized",
+        'submitted_via': "q.t_submitted_via",
+        'timely_response': "CASE UPPER(q.t_timely_response) WHEN 'YES' THEN 1 WHEN 'NO' THEN 0 END",
+        'complaint_id': "q.complaint_id",
+        'source_row_hash': "q.row_hash",
+    }
+    for col, _, standardized_default, original_default in STANDARDIZED_COLUMNS:
+        cleaned[f"{col}_standardized"] = f"COALESCE(q.`{col}_mapped`, {_literal(standardized_default)})"
+        cleaned[col] = f"COALESCE(NULLIF(q.`t_{col}`, ''), {_literal(original_default)})"
+    # Hash inputs as the text pandas hashes: dates as YYYY-MM-DD, missing values as ''.
+    hash_text = {**cleaned, 'date_received': "q.date_received_clean"}
+    hash_inputs = ', '.join(f"COALESCE({hash_text[col]}, '')" for col in CONTENT_HASH_COLUMNS)
+    cleaned['content_hash'] = f"SHA2(CONCAT_WS({_literal(HASH_SEPARATOR)}, {hash_inputs}), 256)"
+    output_text = {**hash_text, 'date_sent_to_company': "q.date_sent_to_company_clean"}
+    output_inputs = ', '.join(f"COALESCE({output_text[col]}, '')" for col in OUTPUT_HASH_COLUMNS)
+    cleaned['output_hash'] = (
+        f"CAST(CONV(LEFT(SHA2(CONCAT_WS({_literal(HASH_SEPARATOR)}, {output_inputs}), 256), 16), 16, 10) AS UNSIGNED)"
+    )
+    return cleaned
+
+
+def _quarantined_expressions():
+    """SQL expressions of the quarantine table columns, carrying the values a row had at its failing check."""
+    quarantined = {col: f"q.`t_{col}`" for col in RAW_SOURCE_COLUMNS if col != 'complaint_id'}
+    quarantined['complaint_id'] = "q.complaint_id"
+    # (first check from which quarantined rows carry the transformed value, transformed value), as in clean_dataframe.
+    stage_versions = {
+        'zip_code': (2, "q.zip_sanitized"),
+        'company': (2, "q.company_clean"),
+        'date_received': (3, "q.date_received_clean"),
+        'date_sent_to_company': (4, "q.date_sent_to_company_clean"),
+        'timely_response': (5, "CASE UPPER(q.t_timely_response) WHEN 'YES' THEN '1' WHEN 'NO' THEN '0' END"),
+        'state_code': (5, "q.state_value"),
+    }
+    for col, (from_stage, expr) in stage_versions.items():
+        quarantined[col] = f"IF(q.failure_stage >= {from_stage}, {expr}, {quarantined[col]})"
+    reasons = ', '.join(_literal(reason) for reason in QUARANTINE_REASONS)
+    quarantined['quarantine_reason'] = f"ELT(q.failure_stage + 1, {reasons})"
+    return quarantined
+
+
+def _insert_sql(table_name, expressions, where_sql, pending_only):
+    columns = ', '.join(f"`{col}`" for col in expressions)
+    select = ',\n               '.join(expressions.values())
+    return f"""
+        INSERT INTO `{table_name}` ({columns})
+        SELECT {select}
+        FROM ({_classified_sql(pending_only)}) AS q
+        WHERE {where_sql};
+    """
+
+
+# Staged rows whose complaint is already cleaned with the same output hash, i.e. the same cleaned row.
+_UNCHANGED_JOIN = """
+    JOIN consumer_complaints_cleaned c
+      ON c.complaint_id = s.complaint_id
+     AND c.output_hash = s.output_hash
+"""
+
+
+def clean_range_in_database(conn, table_name, start_id, end_id, pending_only=True, quarantine=True, skip_unchanged=False):
+    """
+    Cleans the raw complaints `start_id`..`end_id` into the staging table `table_name` without leaving the database.
+
+    `clean_standardization_map` and `clean_value_dictionary` must be synced for these rows first.
+
+    Args:
+        conn: An active SQLAlchemy connection; the caller owns the transaction.
+        table_name (str): An existing staging table (see `pipeline_staging_writer.create_staging_table`).
+        start_id (int): First complaint ID of the range.
+        end_id (int): Last complaint ID of the range.
+        pending_only (bool): Only clean rows that are pending in `record_processing_status`.
+        quarantine (bool): Write rows failing a check to `consumer_complaints_quarantined` and delete the
+                           previously cleaned rows of those complaints.
+        skip_unchanged (bool): Drop staged rows whose complaint is already cleaned with the same output
+                               hash, re-marking them as modeled when their fact row exists.
+
+    Returns:
+        tuple: (rows staged, rows quarantined, unchanged rows skipped)
+    """
+    params = {"start_id": start_id, "end_id": end_id}
+    expressions = _cleaned_expressions()
+    cleaned = {col: expressions[col] for col, _ in CLEANED_COLUMN_TYPES}
+    staged = conn.execute(text(_insert_sql(table_name, cleaned, "q.failure_stage IS NULL", pending_only)), params).rowcount
+
+    quarantined = 0
+    if quarantine:
+        quarantined = conn.execute(text(_insert_sql(
+            'consumer_complaints_quarantined', _quarantined_expressions(), "q.failure_stage IS NOT NULL", pending_only
+        )), params).rowcount
+        if quarantined:
+            # A re-queued complaint whose new version is quarantined must not keep its old cleaned row. Every
+            # pending row of the range that passed is staged, so the pending rows missing from staging failed.
+            conn.execute(text(f"""
+                DELETE c FROM consumer_complaints_cleaned c
+                LEFT JOIN `{table_name}` s ON s.complaint_id = c.complaint_id
+                WHERE c.complaint_id BETWEEN :start_id AND :end_id
+                  AND {status_filter(STATUS_PENDING, 'c.complaint_id')}
+                  AND s.complaint_id IS NULL;
+            """), params)
+
+    skipped = 0
+    if skip_unchanged and staged:
+        transition(
+            conn, STATUS_PENDING, STATUS_MODELED,
+            """s.complaint_id BETWEEN :start_id AND :end_id
+              AND EXISTS (SELECT 1 FROM fact_complaints f WHERE f.complaint_id = p.complaint_id)""",
+            params, join_sql=f"JOIN `{table_name}` s ON s.complaint_id = p.complaint_id {_UNCHANGED_JOIN}"
+        )
+        skipped = conn.execute(text(f"""
+            DELETE s FROM `{table_name}` s
+            {_UNCHANGED_JOIN}
+            WHERE s.complaint_id BETWEEN :start_id AND :end_id;
+        """), params).rowcount
+    return staged - skipped, quarantined, skipped
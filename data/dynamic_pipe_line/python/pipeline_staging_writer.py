@@ -0,0 +1,162 @@
+"""
+Pluggable writers that stage cleaned DataFrames into per-worker staging tables.
+
+Two writers share one explicitly typed staging table definition that mirrors `consumer_complaints_cleaned`:
+- `to_sql`: the original pandas `DataFrame.to_sql` path (executemany INSERTs through PyMySQL).
+- `load_data`: serializes each DataFrame into a `LOAD DATA`-compatible CSV and bulk loads it with a single
+  `LOAD DATA LOCAL INFILE` statement. This needs a connection created with `local_infile` enabled.
+
+The staging table has `complaint_id` as its primary key, so consolidation can page through it by key
+instead of sorting the whole table for every batch.
+"""
+import logging
+import os
+import tempfile
+from sqlalchemy import text
+
+STAGING_WRITERS = ('load_data', 'to_sql')
+
+# Column order and types of `consumer_complaints_cleaned` (see sql/setup/create_cleaned_data_table.sql).
+CLEANED_COLUMN_TYPES = [
+    ('date_received', 'DATE'),
+    ('product', 'VARCHAR(255)'),
+    ('product_standardized', 'VARCHAR(255)'),
+    ('sub_product', 'VARCHAR(255)'),
+    ('sub_product_standardized', 'VARCHAR(255)'),
+    ('issue', 'VARCHAR(255)'),
+    ('issue_standardized', 'VARCHAR(255)'),
+    ('sub_issue', 'VARCHAR(255)'),
+    ('sub_issue_standardized', 'VARCHAR(255)'),
+    ('consumer_complaint_narrative', 'TEXT'),
+    ('company_public_response', 'TEXT'),
+    ('company', 'VARCHAR(255)'),
+    ('state_code', 'VARCHAR(50)'),
+    ('zip_code', 'VARCHAR(10)'),
+    ('tags', 'TEXT'),
+    ('tags_standardized', 'VARCHAR(255)'),
+    ('consumer_consent_provided', 'VARCHAR(100)'),
+    ('consumer_consent_provided_standardized', 'VARCHAR(255)'),
+    ('submitted_via', 'VARCHAR(100)'),
+    ('date_sent_to_company', 'DATE'),
+    ('company_response_to_consumer', 'TEXT'),
+    ('company_response_to_consumer_standardized', 'VARCHAR(255)'),
+    ('timely_response', 'TINYINT(1)'),
+    ('consumer_disputed', 'VARCHAR(100)'),
+    ('consumer_disputed_standardized', 'VARCHAR(255)'),
+    ('company_public_response_standardized', 'VARCHAR(255)'),
+    ('complaint_id', 'INT'),
+    ('content_hash', 'VARCHAR(64)'),
+    ('source_row_hash', 'BIGINT UNSIGNED'),
+    ('output_hash', 'BIGINT UNSIGNED'),
+]
+
+_NUMERIC_TYPE_PREFIXES = ('INT', 'TINYINT', 'SMALLINT', 'BIGINT', 'DECIMAL')
+
+
+def create_staging_table(conn, table_name, column_types=CLEANED_COLUMN_TYPES):
+    """Creates a staging table with explicit column types instead of the types pandas would infer."""
+    columns_ddl = ',\n'.join([f"`{name}` {sql_type}" for name, sql_type in column_types])
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS `{table_name}` (
+            {columns_ddl},
+            PRIMARY KEY (complaint_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """))
+
+
+def _format_load_data_column(series, sql_type):
+    """
+    Renders one column as `LOAD DATA` field text without a per-row Python loop.
+
+    Strings and dates are enclosed in double quotes with embedded quotes doubled; numbers are left bare.
+    Missing values become the unquoted word NULL, which `LOAD DATA` reads as SQL NULL when fields are
+    enclosed (a quoted "NULL" stays the literal string).
+    """
+    null_mask = series.isna()
+    values = series.astype(str)
+    if not sql_type.upper().startswith(_NUMERIC_TYPE_PREFIXES):
+        values = '"' + values.str.replace('"', '""', regex=False) + '"'
+    return values.where(~null_mask, 'NULL')
+
+
+def serialize_for_load_data(df, column_types=CLEANED_COLUMN_TYPES):
+    """
+    Serializes a DataFrame into a `LOAD DATA`-compatible CSV string.
+
+    Args:
+        df (pd.DataFrame): The cleaned DataFrame.
+        column_types (list): (column, SQL type) pairs; only columns present in `df` are written.
+
+    Returns:
+        tuple: The CSV text and the list of columns it contains, in order.
+    """
+    columns = [(name, sql_type) for name, sql_type in column_types if name in df.columns]
+    formatted = [_format_load_data_column(df[name], sql_type) for name, sql_type in columns]
+    lines = formatted[0].str.cat(formatted[1:], sep=',')
+    return '\n'.join(lines.tolist()) + '\n', [name for name, _ in columns]
+
+
+class ToSqlStagingWriter:
+    """Stages DataFrames with pandas `to_sql` into an explicitly typed staging table."""
+    name = 'to_sql'
+
+    def __init__(self, table_name, column_types=CLEANED_COLUMN_TYPES):
+        self.table_name = table_name
+        self.column_types = column_types
+        self._created = False
+
+    def _ensure_table(self, conn):
+        if not self._created:
+            create_staging_table(conn, self.table_name, self.column_types)
+            self._created = True
+
+    def write(self, conn, df):
+        """Appends `df` to the staging table and returns the number of rows written."""
+        if df.empty:
+            return 0
+        self._ensure_table(conn)
+        df.to_sql(self.table_name, conn, if_exists='append', index=False)
+        return len(df)
+
+
+class LoadDataStagingWriter(ToSqlStagingWriter):
+    """Stages DataFrames by serializing them to a CSV buffer and bulk loading it with `LOAD DATA LOCAL INFILE`."""
+    name = 'load_data'
+
+    def write(self, conn, df):
+        """Bulk loads `df` into the staging table and returns the number of rows written."""
+        if df.empty:
+            return 0
+        self._ensure_table(conn)
+        payload, columns = serialize_for_load_data(df, self.column_types)
+
+        fd, path = tempfile.mkstemp(prefix=f"{self.table_name}_", suffix=".csv")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.write(payload)
+            sql_safe_path = path.replace('\\', '\\\\')
+            cols_str = ', '.join([f"`{col}`" for col in columns])
+            result = conn.execute(text(f"""
+                LOAD DATA LOCAL INFILE '{sql_safe_path}'
+                INTO TABLE `{self.table_name}`
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY ',' ENCLOSED BY '"' ESCAPED BY ''
+                LINES TERMINATED BY '\\n'
+                ({cols_str});
+            """))
+        finally:
+            os.remove(path)
+
+        if result.rowcount != len(df):
+            logging.warning(
+                f"[Staging Writer] LOAD DATA staged {result.rowcount:,} of {len(df):,} rows into '{self.table_name}'."
+            )
+        return result.rowcount
+
+
+def get_staging_writer(name, table_name, column_types=CLEANED_COLUMN_TYPES):
+    """Returns the staging writer registered under `name` ('load_data' or 'to_sql')."""
+    writers = {writer.name: writer for writer in (LoadDataStagingWriter, ToSqlStagingWriter)}
+    if name not in writers:
+        raise ValueError(f"Unknown staging writer '{name}'. Expected one of {STAGING_WRITERS}.")
+    return writers[name](table_name, column_types)
@@ -0,0 +1,121 @@
+"""
+Memoized standardization lookups compiled from `data_standardization_mappings`.
+
+Each mapping dict is compiled once per process into a table keyed by the normalized (upper-cased) raw value,
+with the column's default for unmapped and empty values baked in. Raw values that were already standardized
+are served from a bounded LRU cache, so a worker only normalizes values it has not seen in earlier batches.
+`clean_dataframe` applies the results per distinct value and expands them to rows through factorize codes.
+
+Lookups keep the semantics of the original per-row code:
+- Standardized columns (`default` given): missing or empty values, and values missing from the mapping,
+  become `default`.
+- Pass-through lookups (`default=PASSTHROUGH`, used for `state_code`): mapped values are replaced and every
+  other value is kept upper-cased; missing values stay missing.
+"""
+import logging
+from collections import OrderedDict
+import pandas as pd
+
+PASSTHROUGH = object()
+DEFAULT_LOOKUP_CACHE_SIZE = 4096
+
+_lookups = {}
+
+
+class StandardizationLookup:
+    """A compiled mapping table with a bounded LRU cache of raw value -> standardized value."""
+
+    def __init__(self, name, mapping, default=PASSTHROUGH, cache_size=DEFAULT_LOOKUP_CACHE_SIZE):
+        self.name = name
+        self.default = default
+        self.cache_size = cache_size
+        # Mapping keys are normalized the same way raw values are, so the table is keyed consistently.
+        self.table = {str(key).upper(): value for key, value in mapping.items()}
+        self.values = set(self.table.values())
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _resolve(self, raw_value, normalized):
+        if raw_value == '':
+            return '' if self.default is PASSTHROUGH else self.default
+        if self.default is PASSTHROUGH:
+            return self.table.get(normalized, normalized)
+        return self.table.get(normalized, self.default)
+
+    def standardize(self, distinct_values):
+        """
+        Standardizes a Series of distinct raw values.
+
+        Args:
+            distinct_values (pd.Series): The distinct (already stripped) values of one column.
+
+        Returns:
+            pd.Series: The standardized values, aligned with `distinct_values`.
+        """
+        missing = distinct_values.isna().to_numpy()
+        raw_values = distinct_values.tolist()
+        results = [None] * len(raw_values)
+        cache = self._cache
+        uncached = []
+        for i, raw_value in enumerate(raw_values):
+            if missing[i]:
+                results[i] = None if self.default is PASSTHROUGH else self.default
+                continue
+            cached = cache.get(raw_value, cache)
+            if cached is cache:
+                uncached.append(i)
+            else:
+                cache.move_to_end(raw_value)
+                results[i] = cached
+        self.hits += len(raw_values) - int(missing.sum()) - len(uncached)
+        self.misses += len(uncached)
+
+        if uncached:
+            # Normalize all misses with one vectorized upper() so unicode case rules match the per-row code.
+            misses = pd.Series([raw_values[i] for i in uncached], dtype=distinct_values.dtype)
+            for i, normalized in zip(uncached, misses.str.upper().tolist()):
+                results[i] = self._resolve(raw_values[i], normalized)
+                cache[raw_values[i]] = results[i]
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+                self.evictions += 1
+
+        return pd.Series(results, index=distinct_values.index, dtype=distinct_values.dtype)
+
+    def stats(self):
+        """Returns the cache statistics of this lookup."""
+        total = self.hits + self.misses
+        return {
+            "lookup": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "cached": len(self._cache),
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+def get_lookup(name, mapping, default=PASSTHROUGH, cache_size=DEFAULT_LOOKUP_CACHE_SIZE):
+    """Returns this process's lookup for `name`, compiling it from `mapping` on first use."""
+    lookup = _lookups.get(name)
+    if lookup is None:
+        lookup = StandardizationLookup(name, mapping, default, cache_size)
+        _lookups[name] = lookup
+    return lookup
+
+
+def lookup_stats():
+    """Returns the cache statistics of every lookup compiled in this process."""
+    return [lookup.stats() for lookup in _lookups.values()]
+
+
+def log_lookup_stats(prefix="[Standardization]"):
+    """Logs the hit rate of every lookup compiled in this process."""
+    for stats in lookup_stats():
+        hit_rate = f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else "n/a"
+        logging.info(
+            f"{prefix} Lookup '{stats['lookup']}': {stats['hits']:,} hits, {stats['misses']:,} misses "
+            f"({hit_rate} hit rate), {stats['cached']:,} cached, {stats['evictions']:,} evicted."
+        )
@@ -1,24 +1,38 @@
 import logging
 import sys
+import time
 from pipeline_logger import log_db
+from pipeline_processing_status import backfill_status
+from pipeline_aggregates import seed_aggregates
+from pipeline_schema_cache import get_sql_statements, invalidate_schema_cache
 from sqlalchemy import text, inspect
 import os
+import pandas as pd
 from contextlib import contextmanager
 
 class PipelineError(Exception):
     """Custom exception for pipeline-specific errors."""
     pass
 
+# 'stream' reads through an unbuffered server-side cursor; 'keyset' issues one bounded query per batch;
+# 'buffered' is the default client-side cursor that materializes the whole result before the first batch.
+READ_MODES = ('stream', 'keyset', 'buffered')
+# A streaming result stays open while the caller cleans and writes each batch; keep the server from timing out.
+STREAM_NET_WRITE_TIMEOUT_SECONDS = 3600
+
+# manage_indexes only drops indexes when the bulk operation writes at least this share of the table.
+INDEX_REBUILD_THRESHOLD = 0.1
+INDEX_JOURNAL_TABLE = 'index_rebuild_journal'
+
 INDEX_DEFINITIONS = {
     'consumer_complaints_raw': {
         'idx_raw_complaint_id': '(complaint_id)',
-        'idx_raw_cleaned_timestamp': '(cleaned_timestamp)',
-        'idx_raw_staging_run_id': '(staging_run_id)',
-        'idx_raw_modeling_timestamp': '(modeling_timestamp)'
+        'idx_raw_staging_run_id': '(staging_run_id)'
     },
     'consumer_complaints_cleaned': {
         'idx_cleaned_complaint_id': '(complaint_id)',
         'idx_cleaned_content_hash': '(content_hash)',
+        'idx_cleaned_content_hash_bin': '(content_hash_bin)',
         'idx_cleaned_date_received': '(date_received)',
         'idx_cleaned_date_sent': '(date_sent_to_company)',
         'idx_cleaned_product_std': '(product_standardized)',
@@ -36,6 +50,8 @@ def execute_sql_file(conn, script_path, split_statements=False, ignore_errors_in
     """
     Executes a SQL script from a file.
 
+    The script is read, split and compiled once per process and set of `params` (see `pipeline_schema_cache`).
+
     Args:
         conn (Connection): An active SQLAlchemy connection.
         script_path (str): Path to the .sql file.
@@ -50,24 +66,16 @@ def execute_sql_file(conn, script_path, split_statements=False, ignore_errors_in
         The SQLAlchemy ResultProxy from the last executed statement, or None if no statements were run.
     """
     try:
-        with open(script_path, "r", encoding="utf-8") as file:
-            sql_script = file.read()
+        statements = get_sql_statements(script_path, split_statements, params)
 
-        if params:
-            sql_script = sql_script.format(**params)
-
-        if not sql_script.strip():
+        if not statements:
             logging.warning(f"SQL script is empty: {script_path}. Skipping.")
             return
 
-        statements = [sql_script]
-        if split_statements:
-            statements = [s for s in sql_script.split(';') if s.strip()]
-
         result = None
         for stmt in statements:
             try:
-                result = conn.execute(text(stmt), {})
+                result = conn.execute(stmt, {})
             except Exception as e: # Catch execution error for a single statement
                 # Check if this is a controlled, skippable error (e.g., "table already exists")
                 if ignore_errors_in and any(keyword in str(e) for keyword in ignore_errors_in):
@@ -95,11 +103,23 @@ def ensure_tables_exist(engine):
     script_dir = os.path.dirname(os.path.abspath(__file__))
     setup_scripts = {
         "consumer_complaints_raw": os.path.join(script_dir, "sql", "setup", "create_raw_data_table.sql"),
+        "consumer_complaints_raw_row_hash": os.path.join(script_dir, "sql", "data_insertion", "add_row_hash.sql"),
+        "record_processing_status": os.path.join(script_dir, "sql", "setup", "create_record_processing_status_table.sql"),
         "consumer_complaints_cleaned": os.path.join(script_dir, "sql", "setup", "create_cleaned_data_table.sql"),
+        "consumer_complaints_cleaned_content_hash_bin": os.path.join(script_dir, "sql", "data_insertion", "add_content_hash_bin.sql"),
+        "consumer_complaints_cleaned_source_row_hash": os.path.join(script_dir, "sql", "data_insertion", "add_source_row_hash.sql"),
+        "consumer_complaints_cleaned_output_hash": os.path.join(script_dir, "sql", "data_insertion", "add_output_hash.sql"),
+        "clean_standardization_map": os.path.join(script_dir, "sql", "setup", "create_clean_mapping_tables.sql"),
+        "consumer_complaints_cleaned_hex": os.path.join(script_dir, "sql", "setup", "create_cleaned_hex_view.sql"),
         "ingestion_metadata": os.path.join(script_dir, "sql", "setup", "create_ingestion_metadata_table.sql"),
         "pipeline_logs": os.path.join(script_dir, "sql", "setup", "create_pipeline_logs_table.sql"),
         "star_schema": os.path.join(script_dir, "sql", "setup", "create_datamodel_tables.sql"),
+        "modeling_watermark": os.path.join(script_dir, "sql", "setup", "create_modeling_watermark_table.sql"),
         "consumer_complaints_quarantined": os.path.join(script_dir, "sql", "setup", "create_consumer_complaints_quarantined_table.sql"),
+        "index_rebuild_journal": os.path.join(script_dir, "sql", "setup", "create_index_rebuild_journal_table.sql"),
+        "agg_daily_complaints": os.path.join(script_dir, "sql", "setup", "create_agg_daily_complaints_table.sql"),
+        "fact_partition_changes": os.path.join(script_dir, "sql", "setup", "create_fact_partition_changes_table.sql"),
+        "pipeline_run_manifest": os.path.join(script_dir, "sql", "setup", "create_pipeline_run_manifest_tables.sql"),
     }
 
     logging.info("Executing all setup scripts to ensure database schema is up-to-date...")
@@ -107,6 +127,10 @@ def ensure_tables_exist(engine):
         for name, script_path in setup_scripts.items():
             logging.info(f"Running setup script: {name} ({os.path.basename(script_path)})")
             execute_sql_file(conn, script_path, split_statements=True, ignore_errors_in=['already exists', 'Duplicate column name'])
+        backfill_status(conn)
+        seed_aggregates(conn)
+    # The scripts may have added columns; reflect every table again on its next use.
+    invalidate_schema_cache()
 
 def ensure_indexes_exist(engine):
     """
@@ -115,44 +139,206 @@ def ensure_indexes_exist(engine):
     This function defines a desired state for indexes on key tables, inspects the database, and creates any missing indexes, making the setup process more
     robust and idempotent.
     """
+    try:
+        restore_dropped_indexes(engine)
+    except Exception as e:
+        logging.warning(f"Could not restore indexes from '{INDEX_JOURNAL_TABLE}'. Error: {e}")
     inspector = inspect(engine)
+    for table_name, indexes in INDEX_DEFINITIONS.items():
+        try:
+            existing_indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
+            missing = {index_name: column_def for index_name, column_def in indexes.items() if index_name not in existing_indexes}
+            if missing:
+                logging.info(f"Creating {len(missing)} indexes on table '{table_name}': {sorted(missing)}")
+                with engine.begin() as conn:
+                    _add_indexes(conn, table_name, missing)
+                logging.info(f"Created indexes on '{table_name}'.")
+        except Exception as e:
+            logging.warning(f"Could not check or create indexes for table '{table_name}'. It might not exist yet. Error: {e}")
+
+def _existing_indexes(conn, table_name):
+    """Returns the names of the indexes currently on `table_name`."""
+    return set(conn.execute(text("""
+        SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name
+    """), {"table_name": table_name}).scalars().all())
+
+def _add_indexes(conn, table_name, index_definitions):
+    """Builds all `index_definitions` in a single ALTER TABLE, so InnoDB scans the table once."""
+    if not index_definitions:
+        return
+    add_clauses = ', '.join(f"ADD INDEX {index_name} {column_def}" for index_name, column_def in index_definitions.items())
+    conn.execute(text(f"ALTER TABLE {table_name} {add_clauses};"))
+
+def restore_dropped_indexes(engine, table_name=None):
+    """
+    Rebuilds the indexes that a crashed run left dropped, as recorded in `index_rebuild_journal`.
+
+    Called at startup and before every managed bulk operation; with an empty journal it is a single lookup.
+
+    Args:
+        engine: The SQLAlchemy engine.
+        table_name (str, optional): Only restore the indexes of this table.
+
+    Returns:
+        int: The number of indexes rebuilt.
+    """
+    table_filter = "WHERE table_name = :table_name" if table_name else ""
     with engine.begin() as conn:
-        for table_name, indexes in INDEX_DEFINITIONS.items():
-            try:
-                existing_indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
-                for index_name, column_def in indexes.items():
-                    if index_name not in existing_indexes:
-                        logging.info(f"Creating index '{index_name}' on table '{table_name}'...")
-                        conn.execute(text(f"CREATE INDEX {index_name} ON {table_name} {column_def};"))
-                        logging.info(f"Created index: {index_name}")
-            except Exception as e:
-                logging.warning(f"Could not check or create indexes for table '{table_name}'. It might not exist yet. Error: {e}")
+        rows = conn.execute(
+            text(f"SELECT table_name, index_name, index_definition FROM {INDEX_JOURNAL_TABLE} {table_filter}"),
+            {"table_name": table_name}
+        ).fetchall()
+    journaled = {}
+    for journal_table, index_name, column_def in rows:
+        journaled.setdefault(journal_table, {})[index_name] = column_def
+
+    restored = 0
+    for journal_table, index_definitions in journaled.items():
+        with engine.begin() as conn:
+            existing = _existing_indexes(conn, journal_table)
+            missing = {name: column_def for name, column_def in index_definitions.items() if name not in existing}
+            if missing:
+                logging.warning(f"Restoring {len(missing)} indexes on '{journal_table}' left dropped by an earlier run: {sorted(missing)}")
+                _add_indexes(conn, journal_table, missing)
+                restored += len(missing)
+            conn.execute(text(f"DELETE FROM {INDEX_JOURNAL_TABLE} WHERE table_name = :table_name"), {"table_name": journal_table})
+    return restored
 
 @contextmanager
-def manage_indexes(engine, table_name, index_names_to_manage):
+def manage_indexes(engine, table_name, index_names_to_manage, expected_rows=None, threshold=INDEX_REBUILD_THRESHOLD):
     """
     A context manager to temporarily drop specified indexes for bulk operations and reliably restore them afterward.
 
-    This is a key performance optimization for write-heavy operations.
+    Dropping only pays off when the bulk operation writes a sizable share of the table: the rebuild scans the
+    whole table. When `expected_rows` is below `threshold` times the estimated table size, the indexes are
+    kept and maintained row by row instead. Otherwise they are dropped with one ALTER TABLE and rebuilt with
+    one ALTER TABLE (a single table scan for all of them). Each dropped index is recorded in
+    `index_rebuild_journal` first, so a crash cannot leave it missing: `restore_dropped_indexes` rebuilds it.
 
     Args:
         engine: The SQLAlchemy engine.
         table_name (str): The name of the table whose indexes are being managed.
         index_names_to_manage (list): A list of index names to drop and recreate.
+        expected_rows (int, optional): Rows the bulk operation is expected to write. Unknown (None) always drops.
+        threshold (float, optional): The delta-to-table-size ratio from which the indexes are dropped.
+
+    Yields:
+        dict: The index maintenance decision and its cost, filled in when the block exits
+              (for the step details).
     """
-    index_definitions = {name: INDEX_DEFINITIONS.get(table_name, {}).get(name) for name in index_names_to_manage}
+    restore_dropped_indexes(engine, table_name)
+    index_definitions = {
+        name: INDEX_DEFINITIONS.get(table_name, {}).get(name)
+        for name in index_names_to_manage if INDEX_DEFINITIONS.get(table_name, {}).get(name)
+    }
+    with engine.connect() as conn:
+        table_rows = conn.execute(text("""
+            SELECT TABLE_ROWS FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name
+        """), {"table_name": table_name}).scalar_one_or_none() or 0
+        existing = _existing_indexes(conn, table_name)
+    index_definitions = {name: column_def for name, column_def in index_definitions.items() if name in existing}
+
+    delta_ratio = expected_rows / table_rows if expected_rows is not None and table_rows else None
+    drop = bool(index_definitions) and (expected_rows is None or delta_ratio is None or delta_ratio >= threshold)
+    stats = {
+        "table": table_name,
+        "table_rows_estimate": int(table_rows),
+        "expected_rows": expected_rows,
+        "delta_ratio": round(delta_ratio, 6) if delta_ratio is not None else None,
+        "threshold": threshold,
+        "indexes": len(index_definitions),
+        "action": "rebuilt" if drop else "kept",
+        "drop_seconds": 0.0,
+        "rebuild_seconds": 0.0,
+    }
+    if not drop:
+        logging.info(
+            f"Keeping {len(index_definitions)} indexes on '{table_name}': about {expected_rows or 0:,} rows against "
+            f"~{table_rows:,} is below the rebuild threshold of {threshold:.0%}."
+        )
+        yield stats
+        return
 
     logging.info(f"Temporarily dropping {len(index_definitions)} indexes on table '{table_name}' for bulk operation...")
+    drop_start = time.time()
     with engine.begin() as conn:
-        for index_name in index_definitions:
-            conn.execute(text(f"DROP INDEX {index_name} ON {table_name};"))
-    
+        conn.execute(
+            text(f"INSERT IGNORE INTO {INDEX_JOURNAL_TABLE} (table_name, index_name, index_definition) VALUES (:table_name, :index_name, :column_def)"),
+            [{"table_name": table_name, "index_name": name, "column_def": column_def} for name, column_def in index_definitions.items()]
+        )
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table_name} " + ', '.join(f"DROP INDEX {name}" for name in index_definitions) + ";"))
+    stats["drop_seconds"] = round(time.time() - drop_start, 3)
+
     try:
-        yield # The code inside the 'with' block runs here
+        yield stats # The code inside the 'with' block runs here
     finally:
-        logging.info(f"Recreating {len(index_definitions)} indexes on table '{table_name}'...")
+        logging.info(f"Recreating {len(index_definitions)} indexes on table '{table_name}' in a single pass...")
+        rebuild_start = time.time()
         with engine.begin() as conn:
-            for index_name, column_def in index_definitions.items():
-                if column_def:
-                    conn.execute(text(f"CREATE INDEX {index_name} ON {table_name} {column_def};"))
-        logging.info("Index recreation complete.")
\ No newline at end of file
+            _add_indexes(conn, table_name, index_definitions)
+        with engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {INDEX_JOURNAL_TABLE} WHERE table_name = :table_name"), {"table_name": table_name})
+        stats["rebuild_seconds"] = round(time.time() - rebuild_start, 3)
+        logging.info(f"Index recreation complete in {stats['rebuild_seconds']:.2f}s.")
+
+def iter_dataframe_batches(engine, columns, table_name, where_sql, params, batch_size, read_mode='stream', key_column='complaint_id'):
+    """
+    Yields DataFrames of at most `batch_size` rows from `SELECT columns FROM table_name WHERE where_sql`.
+
+    Reads run on their own connection, so the caller can write on another connection while batches arrive.
+    With 'stream' or 'keyset', client memory is bounded by `batch_size` rather than by the size of the result.
+
+    Args:
+        engine: The SQLAlchemy engine.
+        columns (list): The columns to select; must include `key_column` for 'keyset' reads.
+        table_name (str): The table to read.
+        where_sql (str): The filter, with `:name` bind parameters.
+        params (dict): Values for the bind parameters in `where_sql`.
+        batch_size (int): Maximum rows per yielded DataFrame.
+        read_mode (str): 'stream' (default), 'keyset' or 'buffered'. See `READ_MODES`.
+        key_column (str): The unique, indexed column used for keyset pagination.
+    """
+    cols_str = ', '.join(columns)
+    if read_mode == 'keyset':
+        last_key = None
+        while True:
+            key_filter = f" AND {key_column} > :last_key" if last_key is not None else ""
+            query = text(f"""
+                SELECT {cols_str} FROM {table_name}
+                WHERE {where_sql}{key_filter}
+                ORDER BY {key_column}
+                LIMIT :batch_size
+            """)
+            with engine.connect() as conn:
+                df_batch = pd.read_sql_query(query, conn, params={**params, "last_key": last_key, "batch_size": batch_size})
+            if df_batch.empty:
+                return
+            yield df_batch
+            if len(df_batch) < batch_size:
+                return
+            last_key = int(df_batch[key_column].max())
+    elif read_mode in ('stream', 'buffered'):
+        query = text(f"SELECT {cols_str} FROM {table_name} WHERE {where_sql}")
+        with engine.connect() as conn:
+            previous_timeout = None
+            if read_mode == 'stream':
+                previous_timeout = conn.execute(text("SELECT @@SESSION.net_write_timeout")).scalar_one()
+                conn.execute(text(f"SET SESSION net_write_timeout = {STREAM_NET_WRITE_TIMEOUT_SECONDS}"))
+                conn = conn.execution_options(stream_results=True, max_row_buffer=batch_size)
+            chunks = pd.read_sql_query(query, conn, params=params, chunksize=batch_size)
+            try:
+                yield from chunks
+            finally:
+                # The connection returns to the pool: close the stream and restore the session's timeout.
+                chunks.close()
+                if previous_timeout is not None:
+                    try:
+                        conn.execute(text("SET SESSION net_write_timeout = :timeout"), {"timeout": int(previous_timeout)})
+                    except Exception as e:
+                        logging.warning(f"Could not restore net_write_timeout, discarding the connection: {e}")
+                        conn.invalidate()
+    else:
+        raise ValueError(f"Unknown read mode '{read_mode}'. Expected one of {READ_MODES}.")
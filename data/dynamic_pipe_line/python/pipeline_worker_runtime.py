@@ -0,0 +1,121 @@
+"""
+Worker runtime: one pooled SQLAlchemy engine per worker process.
+
+Worker functions used to call `create_engine(db_url)` for every task and dispose of it afterwards, so each
+task paid for new connections and handshakes, and the pool settings and `connect_args` (such as
+`local_infile`) of the main engine were lost. Now:
+- `create_pipeline_engine` builds every engine, in the main process and in the workers, with the same
+  `QueuePool` settings and connect args.
+- `init_worker` is the pool initializer. It builds the process's engine once, and `get_worker_engine`
+  hands that engine to every task that runs on the process.
+- Each engine counts its new connections, checkouts and the time spent waiting for a checkout
+  (`connection_metrics`). The scheduler collects the counters of every worker process and logs them for
+  each run (see `pipeline_scheduler.run_stage_graph`).
+"""
+import logging
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+# --- Database Engine and Connection Pool Configuration ---
+# A connection pool is used to manage database connections efficiently, reducing the
+# overhead of establishing a new connection for every database operation.
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+POOL_TIMEOUT = 30
+POOL_RECYCLE_SECONDS = 3600
+
+ENGINE_OPTIONS = {
+    "connect_args": {"local_infile": 1},  # Required by the LOAD DATA staging and fact writers.
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_pre_ping": True,  # Checks connection validity before use, preventing errors from stale connections.
+    "pool_recycle": POOL_RECYCLE_SECONDS,  # Automatically replaces connections after 1 hour to prevent timeouts.
+    "pool_timeout": POOL_TIMEOUT,  # Max time to wait for a connection from the pool.
+    "pool_reset_on_return": 'rollback',  # Ensures transactions are rolled back when a connection is returned.
+    "echo": False,
+}
+
+_metrics = {"connects": 0, "checkouts": 0, "checkout_wait_seconds": 0.0}
+_worker_engines = {}
+
+
+class MeteredQueuePool(QueuePool):
+    """A `QueuePool` that records how long each checkout waits for a connection, including new connects."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _metrics["checkout_wait_seconds"] += time.perf_counter() - start
+
+
+def _count_connect(dbapi_connection, connection_record):
+    _metrics["connects"] += 1
+
+
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    _metrics["checkouts"] += 1
+
+
+def create_pipeline_engine(db_url):
+    """
+    Creates an engine with the pipeline's pool settings and connect args.
+
+    Args:
+        db_url (str or URL): The database URL.
+
+    Returns:
+        Engine: A metered, pooled SQLAlchemy engine.
+    """
+    engine = create_engine(db_url, poolclass=MeteredQueuePool, **ENGINE_OPTIONS)
+    event.listen(engine, "connect", _count_connect)
+    event.listen(engine, "checkout", _count_checkout)
+    return engine
+
+
+def _engine_key(db_url):
+    return db_url.render_as_string(hide_password=False) if hasattr(db_url, "render_as_string") else str(db_url)
+
+
+def init_worker(db_url, log_setup=None):
+    """
+    Pool initializer: resets the connection counters, configures logging and builds this process's engine.
+
+    Args:
+        db_url (str or URL): The database URL of the main engine.
+        log_setup (callable, optional): Logging setup to run first in the new process.
+    """
+    # A forked process starts with the parent's counters, which already count the main engine's connections.
+    _metrics.update(connects=0, checkouts=0, checkout_wait_seconds=0.0)
+    if log_setup is not None:
+        log_setup()
+    get_worker_engine(db_url)
+
+
+def get_worker_engine(db_url):
+    """
+    Returns this process's engine for `db_url`, creating it on first use.
+
+    Tasks must not dispose of it: its pooled connections are reused by the next task on the process.
+    """
+    key = _engine_key(db_url)
+    if key not in _worker_engines:
+        _worker_engines[key] = create_pipeline_engine(db_url)
+    return _worker_engines[key]
+
+
+def connection_metrics():
+    """Returns a copy of this process's connection counters."""
+    return dict(_metrics)
+
+
+def log_connection_metrics(metrics, log_prefix="[Worker Runtime]"):
+    """Logs connection counters such as the ones returned by `connection_metrics`."""
+    checkouts = metrics.get("checkouts", 0)
+    average_ms = metrics.get("checkout_wait_seconds", 0.0) / checkouts * 1000 if checkouts else 0.0
+    logging.info(
+        f"{log_prefix} {metrics.get('connects', 0):,} connects, {checkouts:,} checkouts, "
+        f"{metrics.get('checkout_wait_seconds', 0.0):.2f}s waiting for connections ({average_ms:.1f} ms per checkout)."
+    )
@@ -5,22 +5,28 @@ This script manages the execution of the entire ETL process. It handles:
 - Parsing command-line arguments to control pipeline execution.
 - Loading database credentials from a secure environment file.
 - Creating a pooled database connection engine for performance.
-- Orchestrating the execution of the ingestion, processing, and modeling steps.
+- Orchestrating the execution of the ingestion, processing, modeling, and export steps.
 - Centralized timing and logging for each pipeline stage.
 """
 import logging
 import sys
 import time
 import argparse
-from sqlalchemy import create_engine
 from datetime import datetime
-from sqlalchemy.pool import QueuePool
 import os
 import dynamic_pipeline_data_ingestion as ingestion
 import dynamic_pipeline_process_and_insert as process_and_insert
 from pipeline_logger import log_db, setup_logging
-from pipeline_utils import ensure_tables_exist, ensure_indexes_exist
+from pipeline_utils import ensure_tables_exist, ensure_indexes_exist, READ_MODES, INDEX_REBUILD_THRESHOLD
 import dynamic_pipeline_data_modeling as modeling
+import dynamic_pipeline_export as export
+from pipeline_staging_writer import STAGING_WRITERS
+from pipeline_dimension_cache import FACT_BUILDERS
+from pipeline_worker_runtime import create_pipeline_engine
+from pipeline_hashing import HASH_STORAGE_MODES
+from pipeline_sql_cleaning import CLEAN_ENGINES
+from pipeline_duckdb_backend import BACKENDS, DEFAULT_DUCKDB_PATH, DuckDBBackend, is_duckdb
+from pipeline_run_manifest import DEFAULT_MANIFEST_DIR
 from dotenv import load_dotenv
 
 # Load database configuration from a .env file for security and portability.
@@ -33,25 +39,17 @@ db_name = os.getenv("DB_NAME")
 connection_string = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
 
 # --- Database Engine and Connection Pool Configuration ---
-# A connection pool is used to manage database connections efficiently, reducing the
-# overhead of establishing a new connection for every database operation.
-POOL_SIZE = 5
-MAX_OVERFLOW = 10
-POOL_TIMEOUT = 30
-POOL_RECYCLE_SECONDS = 3600
-
-engine = create_engine(
-    connection_string,
-    connect_args={"local_infile": 1},
-    poolclass=QueuePool,
-    pool_size=POOL_SIZE,
-    max_overflow=MAX_OVERFLOW,
-    pool_pre_ping=True,  # Checks connection validity before use, preventing errors from stale connections.
-    pool_recycle=POOL_RECYCLE_SECONDS,  # Automatically replaces connections after 1 hour to prevent timeouts.
-    pool_timeout=POOL_TIMEOUT,  # Max time to wait for a connection from the pool.
-    pool_reset_on_return='rollback',  # Ensures transactions are rolled back when a connection is returned.
-    echo=False
-)
+# The pool settings and connect args live in pipeline_worker_runtime, so the worker processes build their
+# engines with exactly the same configuration as this one. The engine is only built for the MySQL backend,
+# so DuckDB runs need no MySQL configuration.
+engine = None
+
+def get_engine():
+    """Returns the pooled MySQL engine, creating it on first use."""
+    global engine
+    if engine is None:
+        engine = create_pipeline_engine(connection_string)
+    return engine
 
 # Initialize the centralized logging system.
 setup_logging()
@@ -67,7 +65,7 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Run CFPB ETL pipeline")
     parser.add_argument(
         "--step",
-        choices=["all", "ingest", "process", "model"],
+        choices=["all", "ingest", "process", "model", "export"],
         default="all",
         help="Which pipeline step to run"
     )
@@ -83,6 +81,120 @@ def parse_args():
         default=100000,
         help="Set the batch size for processing steps like staging and cleaning."
     )
+    parser.add_argument(
+        "--ingest-mode",
+        choices=list(ingestion.INGEST_MODES),
+        default="stream",
+        help="How sanitized rows reach LOAD DATA: 'stream' pipes them as they are parsed, 'file' writes a temporary CSV first, "
+             "'parallel' sanitizes record-aligned chunks in a process pool."
+    )
+    parser.add_argument(
+        "--ingest-workers",
+        type=int,
+        default=None,
+        help="Number of sanitizer processes for '--ingest-mode parallel'. Defaults to all cores but one."
+    )
+    parser.add_argument(
+        "--ingest-delta",
+        action="store_true",
+        help="Only load rows that are new or changed since the last ingestion instead of staging the whole file."
+    )
+    parser.add_argument(
+        "--delta-hwm-only",
+        action="store_true",
+        help="With --ingest-delta, skip loading the known-ID index and drop every row at or below the stored "
+             "high-water mark (faster, but late arrivals and corrections to old complaints are not detected)."
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=ingestion.DOWNLOAD_WORKERS,
+        help="Number of concurrent range requests used to download the source file."
+    )
+    parser.add_argument(
+        "--staging-writer",
+        choices=list(STAGING_WRITERS),
+        default="load_data",
+        help="How cleaning workers stage batches: bulk 'load_data' (default) or pandas 'to_sql'."
+    )
+    parser.add_argument(
+        "--read-mode",
+        choices=list(READ_MODES),
+        default="stream",
+        help="How cleaning workers read raw rows: 'stream' (server-side cursor, default), 'keyset' or 'buffered'."
+    )
+    parser.add_argument(
+        "--hash-storage",
+        choices=list(HASH_STORAGE_MODES),
+        default="hex",
+        help="Store content_hash as 'hex' VARCHAR(64) (default) or compact 'binary' BINARY(32) in content_hash_bin."
+    )
+    parser.add_argument(
+        "--clean-engine",
+        choices=list(CLEAN_ENGINES),
+        default="pandas",
+        help="Clean in the worker processes with 'pandas' (default) or inside the database with 'sql'."
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Skip pending rows whose cleaned output matches the already cleaned complaint."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for the process and model steps (default: cores, capped by free max_connections)."
+    )
+    parser.add_argument(
+        "--model-incremental",
+        action="store_true",
+        help="Find the complaints to model from the persisted modeling watermark plus late arrivals."
+    )
+    parser.add_argument(
+        "--fact-builder",
+        choices=list(FACT_BUILDERS),
+        default="sql",
+        help="Resolve fact dimension keys with SQL joins ('sql', default) or in-process key caches ('python')."
+    )
+    parser.add_argument(
+        "--fact-load",
+        choices=list(modeling.FACT_LOADS),
+        default="direct",
+        help="Write fact rows straight into fact_complaints under a lock ('direct', default) or via per-worker 'staging' tables."
+    )
+    parser.add_argument(
+        "--index-rebuild-threshold",
+        type=float,
+        default=INDEX_REBUILD_THRESHOLD,
+        help="Drop and rebuild the cleaned table's indexes only when a process run targets at least this share of its rows (default: 0.1)."
+    )
+    parser.add_argument(
+        "--backend",
+        choices=list(BACKENDS),
+        default="mysql",
+        help="Run the steps against the MySQL server ('mysql', default) or an embedded DuckDB database file ('duckdb')."
+    )
+    parser.add_argument(
+        "--duckdb-path",
+        default=DEFAULT_DUCKDB_PATH,
+        help=f"Database file of the DuckDB backend (default: {DEFAULT_DUCKDB_PATH})."
+    )
+    parser.add_argument(
+        "--export-dir",
+        default=export.DEFAULT_EXPORT_DIR,
+        help=f"Directory of the Parquet export of the star schema (default: {export.DEFAULT_EXPORT_DIR})."
+    )
+    parser.add_argument(
+        "--export-full",
+        action="store_true",
+        help="Rewrite every fact partition of the Parquet export instead of only the ones changed since the last export."
+    )
+    parser.add_argument(
+        "--manifest-dir",
+        default=DEFAULT_MANIFEST_DIR,
+        help=f"Directory of the JSON run manifests written by the process and model steps (default: {DEFAULT_MANIFEST_DIR})."
+    )
     parser.add_argument(
         "--skip-setup",
         action="store_true",
@@ -105,55 +217,111 @@ def timed_step(label, func):
     step_durations[label] = duration
     logging.info(f"--- {label} completed in {duration} seconds ---")
 
-def initial_setup():
+def initial_setup(target):
     """
     Ensures all database tables, indexes, and schema migrations are in place.
     Called once at the start of the pipeline run unless skipped.
+
+    Args:
+        target: The MySQL engine or the `DuckDBBackend` to set up.
     """
     logging.info("Starting database initial setup and migration check...")
-    ensure_tables_exist(engine)
-    ensure_indexes_exist(engine)
+    if is_duckdb(target):
+        target.ensure_schema()
+    else:
+        ensure_tables_exist(target)
+        ensure_indexes_exist(target)
     logging.info("Database setup and migration check complete.")
 
-def run_pipeline(step, limit=None, batch_size=100000, skip_setup=False):
+def run_pipeline(step, limit=None, batch_size=100000, skip_setup=False, ingest_mode="stream", ingest_workers=None,
+                 ingest_delta=False, delta_hwm_only=False, download_workers=ingestion.DOWNLOAD_WORKERS,
+                 staging_writer="load_data", read_mode="stream", hash_storage="hex",
+                 skip_unchanged=False, clean_engine="pandas", workers=None, model_incremental=False,
+                 fact_builder="sql", fact_load="direct", index_rebuild_threshold=INDEX_REBUILD_THRESHOLD,
+                 backend="mysql", duckdb_path=DEFAULT_DUCKDB_PATH, export_dir=export.DEFAULT_EXPORT_DIR,
+                 export_full=False, manifest_dir=DEFAULT_MANIFEST_DIR):
     """
     The main orchestrator for the ETL pipeline.
 
     Args:
-        step (str): The pipeline step to run ('all', 'ingest', 'process', 'model').
+        step (str): The pipeline step to run ('all', 'ingest', 'process', 'model', 'export').
         limit (int, optional): Limits the number of records to process.
         batch_size (int, optional): The size of batches for processing steps.
         skip_setup (bool): If True, skips the initial database setup checks.
+        ingest_mode (str, optional): The ingestion load mode ('stream', 'file' or 'parallel').
+        ingest_workers (int, optional): Sanitizer processes for the 'parallel' ingestion mode.
+        ingest_delta (bool): If True, ingestion only loads new and changed rows.
+        delta_hwm_only (bool): If True, delta ingestion relies on the high-water mark alone.
+        download_workers (int, optional): Concurrent range requests for the source download.
+        staging_writer (str, optional): The staging writer used by the cleaning workers.
+        read_mode (str, optional): How the cleaning workers read raw rows.
+        hash_storage (str, optional): How `content_hash` is stored in the cleaned table ('hex' or 'binary').
+        skip_unchanged (bool): If True, cleaning skips rows that are unchanged since they were last cleaned.
+        clean_engine (str, optional): Where raw rows are cleaned ('pandas' or 'sql').
+        workers (int, optional): Worker processes for the process and model steps.
+        model_incremental (bool): If True, modeling discovers its queue from the modeling watermark.
+        fact_builder (str, optional): How modeling workers resolve dimension keys ('sql' or 'python').
+        fact_load (str, optional): How modeling workers write fact rows ('direct' or 'staging').
+        index_rebuild_threshold (float, optional): The share of the cleaned table a process run must target
+                                                   before its indexes are dropped and rebuilt.
+        backend (str, optional): The database the steps run against ('mysql' or 'duckdb').
+        duckdb_path (str, optional): The database file of the 'duckdb' backend.
+        export_dir (str, optional): The directory of the Parquet export.
+        export_full (bool): If True, the export rewrites every fact partition.
+        manifest_dir (str, optional): The directory of the run manifests of the process and model steps.
     """
     pipeline_start_time = time.time()
     pipeline_succeeded = False
+    target = DuckDBBackend(duckdb_path) if backend == "duckdb" else get_engine()
     try:
         if not skip_setup:
-            timed_step("Initial DB Setup", initial_setup)
+            timed_step("Initial DB Setup", lambda: initial_setup(target))
 
         if step in ["all", "ingest"]:
-            timed_step("Data Ingestion", lambda: ingestion.run(engine, limit=limit, batch_size=batch_size))
+            timed_step("Data Ingestion", lambda: ingestion.run(
+                target, limit=limit, batch_size=batch_size, ingest_mode=ingest_mode, sanitize_workers=ingest_workers,
+                delta=ingest_delta, use_known_index=not delta_hwm_only, download_workers=download_workers
+            ))
 
         if step in ["all", "process"]:
-            timed_step("Process and Insert", lambda: process_and_insert.run(engine, limit=limit, batch_size=batch_size))
+            timed_step("Process and Insert", lambda: process_and_insert.run(
+                target, limit=limit, batch_size=batch_size, staging_writer=staging_writer, read_mode=read_mode,
+                hash_storage=hash_storage, skip_unchanged=skip_unchanged, clean_engine=clean_engine,
+                workers=workers, index_rebuild_threshold=index_rebuild_threshold, manifest_dir=manifest_dir
+            ))
 
         if step in ["all", "model"]:
-            timed_step("Data Modeling", lambda: modeling.run(engine, limit=limit, batch_size=batch_size))
+            timed_step("Data Modeling", lambda: modeling.run(
+                target, limit=limit, batch_size=batch_size, workers=workers, incremental=model_incremental,
+                fact_builder=fact_builder, fact_load=fact_load, manifest_dir=manifest_dir
+            ))
+
+        if step in ["all", "export"]:
+            timed_step("Export", lambda: export.run(target, export_dir=export_dir, full=export_full))
 
         pipeline_succeeded = True
     except BaseException as e:
         logging.error(f"Pipeline failed: {e}", exc_info=True)
         duration_on_fail = time.time() - pipeline_start_time
-        log_db(engine, "Pipeline", "ERROR", f"Pipeline failed with error: {e}", duration=duration_on_fail, details=step_durations)
+        log_db(target, "Pipeline", "ERROR", f"Pipeline failed with error: {e}", duration=duration_on_fail, details=step_durations)
         sys.exit(1)
     finally:
         if pipeline_succeeded:
             total_duration = time.time() - pipeline_start_time
-            log_db(engine, "Pipeline", "SUCCESS", f"Pipeline completed successfully in {total_duration:.2f} seconds.", duration=total_duration, details=step_durations)
+            log_db(target, "Pipeline", "SUCCESS", f"Pipeline completed successfully in {total_duration:.2f} seconds.", duration=total_duration, details=step_durations)
             logging.info("\nPipeline Summary:")
             for label, duration in step_durations.items():
                 logging.info(f"- {label}: {duration} seconds")
+        if is_duckdb(target):
+            target.close()
 
 if __name__ == "__main__":
     args = parse_args()
-    run_pipeline(args.step, args.limit, args.batch_size, args.skip_setup)
\ No newline at end of file
+    run_pipeline(
+        args.step, args.limit, args.batch_size, args.skip_setup, args.ingest_mode, args.ingest_workers,
+        args.ingest_delta, args.delta_hwm_only, args.download_workers, args.staging_writer,
+        args.read_mode, args.hash_storage, args.skip_unchanged, args.clean_engine,
+        args.workers, args.model_incremental, args.fact_builder,
+        args.fact_load, args.index_rebuild_threshold, args.backend, args.duckdb_path,
+        args.export_dir, args.export_full, args.manifest_dir
+    )
\ No newline at end of file
@@ -0,0 +1,3 @@
+-- Add a compact 32-byte content hash column used when content_hash is stored in binary mode.
+ALTER TABLE consumer_complaints_cleaned
+ADD COLUMN content_hash_bin BINARY(32) NULL;
@@ -0,0 +1,3 @@
+-- Add the digest of every cleaned output column, used to skip re-queued rows whose cleaned output is unchanged.
+ALTER TABLE consumer_complaints_cleaned
+ADD COLUMN output_hash BIGINT UNSIGNED NULL;
@@ -0,0 +1,3 @@
+-- Add a per-row change hash so delta ingestion can detect corrected complaints without reloading the file.
+ALTER TABLE consumer_complaints_raw
+ADD COLUMN row_hash BIGINT UNSIGNED NULL;
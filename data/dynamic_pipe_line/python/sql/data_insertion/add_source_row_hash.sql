@@ -0,0 +1,3 @@
+-- Add the raw row_hash a cleaned record was built from, used to skip unchanged rows on reprocessing.
+ALTER TABLE consumer_complaints_cleaned
+ADD COLUMN source_row_hash BIGINT UNSIGNED NULL;
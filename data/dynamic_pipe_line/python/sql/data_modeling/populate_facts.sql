@@ -1,8 +1,9 @@
--- This script ONLY populates the fact table and updates the source table's timestamp.
--- Populates the fact table for a specific batch of records.
+-- Resolves the dimension keys of the fact rows for a specific batch of records.
 -- This script is designed to be executed by a parallel worker. It selects its own
 -- batch of records to process based on the worker's assigned ID range and the last
--- ID processed in the previous batch.
+-- ID processed in the previous batch. The worker then writes temp_fact_staging to its target: a per-worker
+-- staging table with `--fact-load staging`, or fact_complaints itself under the fact load lock with
+-- `--fact-load direct` (see modeling_worker).
 
 -- Step 1: Create a small, batch-specific temporary table (`temp_modeling_batch`).
 -- This table holds the `complaint_id`s for the current batch. It is created by selecting
@@ -60,15 +61,3 @@ LEFT JOIN dim_consent dcn ON c.consumer_consent_provided_standardized = dcn.cons
 LEFT JOIN dim_public_response dpr ON c.company_public_response_standardized = dpr.response_text
 LEFT JOIN dim_disputed cd ON c.consumer_disputed_standardized = cd.disputed_status
 LEFT JOIN dim_tag dt ON c.tags_standardized = dt.tag_name;
-
--- Step 3: Insert into the final fact table from the pre-joined staging table.
--- This operation is now a simple, fast, direct insert.
--- Using INSERT IGNORE makes this operation idempotent, preventing errors from duplicate complaint_ids on reruns.
--- The worker will insert into a unique staging table to avoid deadlocks. The main process will consolidate.
-INSERT IGNORE INTO {fact_staging_table} (
-    complaint_id, date_received_key, date_sent_key, product_key, sub_product_key, 
-    issue_key, sub_issue_key, company_key, state_key, zip_code_key, origin_key, 
-    consent_key, public_response_key, company_response_key, tag_key, disputed_key,
-    timely_response, consumer_complaint_narrative
-)
-SELECT * FROM temp_fact_staging;
\ No newline at end of file
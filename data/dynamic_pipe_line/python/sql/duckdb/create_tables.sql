@@ -0,0 +1,275 @@
+-- Schema of the embedded DuckDB backend (`--backend duckdb`, see pipeline_duckdb_backend.py).
+-- Mirrors the MySQL tables the pipeline and the dashboard read. AUTO_INCREMENT keys are sequences, and the
+-- MySQL-only bookkeeping (staging run IDs, index journal, watermarks, mapping tables) is left out because
+-- every DuckDB step runs as a few set-based statements in one process.
+
+CREATE TABLE IF NOT EXISTS consumer_complaints_raw (
+    date_received VARCHAR,
+    product VARCHAR,
+    sub_product VARCHAR,
+    issue VARCHAR,
+    sub_issue VARCHAR,
+    consumer_complaint_narrative VARCHAR,
+    company_public_response VARCHAR,
+    company VARCHAR,
+    state_code VARCHAR,
+    zip_code VARCHAR,
+    tags VARCHAR,
+    consumer_consent_provided VARCHAR,
+    submitted_via VARCHAR,
+    date_sent_to_company VARCHAR,
+    company_response_to_consumer VARCHAR,
+    timely_response VARCHAR,
+    consumer_disputed VARCHAR,
+    complaint_id INTEGER PRIMARY KEY,
+    row_hash UBIGINT,
+    ingestion_date DATE,
+    source_file_name VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS record_processing_status (
+    complaint_id INTEGER PRIMARY KEY,
+    status TINYINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS consumer_complaints_cleaned (
+    date_received DATE,
+    product VARCHAR,
+    product_standardized VARCHAR,
+    sub_product VARCHAR,
+    sub_product_standardized VARCHAR,
+    issue VARCHAR,
+    issue_standardized VARCHAR,
+    sub_issue VARCHAR,
+    sub_issue_standardized VARCHAR,
+    consumer_complaint_narrative VARCHAR,
+    company_public_response VARCHAR,
+    company VARCHAR,
+    state_code VARCHAR,
+    zip_code VARCHAR,
+    tags VARCHAR,
+    tags_standardized VARCHAR,
+    consumer_consent_provided VARCHAR,
+    consumer_consent_provided_standardized VARCHAR,
+    submitted_via VARCHAR,
+    date_sent_to_company DATE,
+    company_response_to_consumer VARCHAR,
+    company_response_to_consumer_standardized VARCHAR,
+    timely_response TINYINT,
+    consumer_disputed VARCHAR,
+    consumer_disputed_standardized VARCHAR,
+    company_public_response_standardized VARCHAR,
+    complaint_id INTEGER PRIMARY KEY,
+    content_hash VARCHAR,
+    source_row_hash UBIGINT
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_quarantine_id;
+CREATE TABLE IF NOT EXISTS consumer_complaints_quarantined (
+    quarantine_id INTEGER PRIMARY KEY DEFAULT nextval('seq_quarantine_id'),
+    complaint_id VARCHAR,
+    date_received VARCHAR,
+    product VARCHAR,
+    sub_product VARCHAR,
+    issue VARCHAR,
+    sub_issue VARCHAR,
+    consumer_complaint_narrative VARCHAR,
+    company_public_response VARCHAR,
+    company VARCHAR,
+    state_code VARCHAR,
+    zip_code VARCHAR,
+    tags VARCHAR,
+    consumer_consent_provided VARCHAR,
+    submitted_via VARCHAR,
+    date_sent_to_company VARCHAR,
+    company_response_to_consumer VARCHAR,
+    timely_response VARCHAR,
+    consumer_disputed VARCHAR,
+    quarantine_reason VARCHAR,
+    quarantined_at TIMESTAMP DEFAULT current_timestamp
+);
+
+-- Dimension Tables
+CREATE SEQUENCE IF NOT EXISTS seq_dim_date;
+CREATE TABLE IF NOT EXISTS dim_date (
+    date_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_date'),
+    full_date DATE UNIQUE,
+    "year" INTEGER,
+    "month" INTEGER,
+    "day" INTEGER,
+    "quarter" INTEGER,
+    day_of_week_number INTEGER,
+    month_name VARCHAR,
+    day_name VARCHAR,
+    week_of_year INTEGER,
+    day_of_year INTEGER,
+    is_weekend BOOLEAN,
+    is_month_end BOOLEAN,
+    is_quarter_end BOOLEAN,
+    is_year_end BOOLEAN,
+    fiscal_year INTEGER,
+    fiscal_quarter INTEGER,
+    fiscal_month INTEGER
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_company;
+CREATE TABLE IF NOT EXISTS dim_company (
+    company_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_company'),
+    company_name VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_consent;
+CREATE TABLE IF NOT EXISTS dim_consent (
+    consent_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_consent'),
+    consent_status VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_disputed;
+CREATE TABLE IF NOT EXISTS dim_disputed (
+    disputed_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_disputed'),
+    disputed_status VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_issue;
+CREATE TABLE IF NOT EXISTS dim_issue (
+    issue_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_issue'),
+    issue_name VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_origin;
+CREATE TABLE IF NOT EXISTS dim_origin (
+    origin_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_origin'),
+    origin_method VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_product;
+CREATE TABLE IF NOT EXISTS dim_product (
+    product_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_product'),
+    product_name VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_public_response;
+CREATE TABLE IF NOT EXISTS dim_public_response (
+    response_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_public_response'),
+    response_text VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_company_response;
+CREATE TABLE IF NOT EXISTS dim_company_response (
+    response_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_company_response'),
+    response_description VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_state;
+CREATE TABLE IF NOT EXISTS dim_state (
+    state_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_state'),
+    state_code VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_sub_issue;
+CREATE TABLE IF NOT EXISTS dim_sub_issue (
+    sub_issue_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_sub_issue'),
+    sub_issue_name VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_sub_product;
+CREATE TABLE IF NOT EXISTS dim_sub_product (
+    sub_product_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_sub_product'),
+    sub_product_name VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_tag;
+CREATE TABLE IF NOT EXISTS dim_tag (
+    tag_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_tag'),
+    tag_name VARCHAR UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_zip_code;
+CREATE TABLE IF NOT EXISTS dim_zip_code (
+    zip_code_key INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_zip_code'),
+    zip_code VARCHAR UNIQUE
+);
+
+-- Fact Table. complaint_id is the conflict target of the upsert. The dimension keys carry no foreign keys:
+-- they come from the joins that build the rows.
+CREATE SEQUENCE IF NOT EXISTS seq_fact_complaints;
+CREATE TABLE IF NOT EXISTS fact_complaints (
+    complaint_fact_key INTEGER DEFAULT nextval('seq_fact_complaints'),
+    complaint_id INTEGER PRIMARY KEY,
+    date_received_key INTEGER,
+    date_sent_key INTEGER,
+    product_key INTEGER,
+    sub_product_key INTEGER,
+    issue_key INTEGER,
+    sub_issue_key INTEGER,
+    company_key INTEGER,
+    state_key INTEGER,
+    zip_code_key INTEGER,
+    origin_key INTEGER,
+    company_response_key INTEGER,
+    public_response_key INTEGER,
+    consent_key INTEGER,
+    tag_key INTEGER,
+    disputed_key INTEGER,
+    timely_response BOOLEAN,
+    consumer_complaint_narrative VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS agg_daily_complaints (
+    date_received_key INTEGER NOT NULL,
+    product_key INTEGER NOT NULL,
+    company_key INTEGER NOT NULL,
+    state_key INTEGER NOT NULL,
+    company_response_key INTEGER NOT NULL,
+    disputed_key INTEGER NOT NULL,
+    timely_response TINYINT NOT NULL,
+    complaint_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT current_timestamp,
+    PRIMARY KEY (date_received_key, product_key, company_key, state_key, company_response_key, disputed_key, timely_response)
+);
+
+CREATE TABLE IF NOT EXISTS fact_partition_changes (
+    partition_year INTEGER NOT NULL,
+    partition_month INTEGER NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT current_timestamp,
+    PRIMARY KEY (partition_year, partition_month)
+);
+
+CREATE TABLE IF NOT EXISTS ingestion_metadata (
+    source_file_name VARCHAR NOT NULL,
+    file_hash VARCHAR NOT NULL PRIMARY KEY,
+    row_count INTEGER NOT NULL,
+    max_complaint_id BIGINT NOT NULL,
+    ingested_at TIMESTAMP DEFAULT current_timestamp,
+    last_modified_date TIMESTAMP
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_pipeline_logs;
+CREATE TABLE IF NOT EXISTS pipeline_logs (
+    log_id INTEGER PRIMARY KEY DEFAULT nextval('seq_pipeline_logs'),
+    "timestamp" TIMESTAMP DEFAULT current_timestamp,
+    pipeline_step VARCHAR,
+    status VARCHAR,
+    message VARCHAR,
+    duration_seconds DECIMAL(10, 2),
+    details JSON
+);
+
+CREATE SEQUENCE IF NOT EXISTS seq_pipeline_run_manifest;
+CREATE TABLE IF NOT EXISTS pipeline_run_manifest (
+    run_id BIGINT PRIMARY KEY DEFAULT nextval('seq_pipeline_run_manifest'),
+    pipeline_step VARCHAR NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT current_timestamp,
+    rows_written INTEGER NOT NULL,
+    range_start DATE,
+    range_end DATE,
+    manifest JSON NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pipeline_run_date_ranges (
+    run_id BIGINT NOT NULL,
+    range_start DATE NOT NULL,
+    range_end DATE NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, range_start)
+);
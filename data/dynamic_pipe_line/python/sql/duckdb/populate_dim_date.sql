@@ -0,0 +1,29 @@
+-- Adds the calendar rows of every received or sent date of the queued complaints that dim_date lacks.
+-- The derived columns match populate_dimensions.sql: day_of_week_number counts from 1 = Sunday like MySQL's
+-- DAYOFWEEK, week_of_year is the ISO week like WEEKOFYEAR, and the fiscal year starts in October.
+INSERT INTO dim_date (
+    full_date, "year", "month", "day", "quarter", day_of_week_number,
+    month_name, day_name, week_of_year, day_of_year, is_weekend,
+    is_month_end, is_quarter_end, is_year_end,
+    fiscal_year, fiscal_quarter, fiscal_month
+)
+SELECT
+    full_date,
+    year(full_date), month(full_date), day(full_date), quarter(full_date),
+    dayofweek(full_date) + 1, monthname(full_date), dayname(full_date),
+    weekofyear(full_date), dayofyear(full_date), dayofweek(full_date) IN (0, 6),
+    last_day(full_date) = full_date,
+    last_day(full_date) = full_date AND month(full_date) % 3 = 0,
+    month(full_date) = 12 AND day(full_date) = 31,
+    CASE WHEN month(full_date) >= 10 THEN year(full_date) + 1 ELSE year(full_date) END,
+    CASE WHEN month(full_date) >= 10 THEN quarter(full_date) - 3 ELSE quarter(full_date) + 1 END,
+    (month(full_date) - 10 + 12) % 12 + 1
+FROM (
+    SELECT c.date_received AS full_date
+    FROM consumer_complaints_cleaned c JOIN {queue_table} q ON c.complaint_id = q.complaint_id
+    UNION
+    SELECT c.date_sent_to_company
+    FROM consumer_complaints_cleaned c JOIN {queue_table} q ON c.complaint_id = q.complaint_id
+) AS dates
+WHERE full_date IS NOT NULL
+  AND full_date NOT IN (SELECT full_date FROM dim_date WHERE full_date IS NOT NULL);
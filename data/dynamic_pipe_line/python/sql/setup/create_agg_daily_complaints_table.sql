@@ -0,0 +1,15 @@
+-- Daily complaint counts at the grain of the dashboard's headline measures, maintained incrementally by the
+-- modeling step (see pipeline_aggregates.py). Unknown dimension keys are stored as 0 and an unknown
+-- timely_response as -1, because NULLs would let the primary key hold duplicate groups.
+CREATE TABLE IF NOT EXISTS agg_daily_complaints (
+    date_received_key INT NOT NULL,
+    product_key INT NOT NULL,
+    company_key INT NOT NULL,
+    state_key INT NOT NULL,
+    company_response_key INT NOT NULL,
+    disputed_key INT NOT NULL,
+    timely_response TINYINT NOT NULL,
+    complaint_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (date_received_key, product_key, company_key, state_key, company_response_key, disputed_key, timely_response)
+) ENGINE=InnoDB;
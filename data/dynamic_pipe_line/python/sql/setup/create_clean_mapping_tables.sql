@@ -0,0 +1,20 @@
+-- Lookup tables used by the in-database cleaning engine (--clean-engine sql).
+-- Both are regenerated from Python before each run; keys use a binary, no-pad collation so that lookups
+-- are exact like the Python dict lookups they replace.
+
+-- Standardization mappings, generated from data_standardization_mappings.py (upper-cased key -> value).
+CREATE TABLE IF NOT EXISTS clean_standardization_map (
+    mapping_name VARCHAR(64) NOT NULL,
+    map_key VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_bin NOT NULL,
+    standardized_value VARCHAR(255) NOT NULL,
+    PRIMARY KEY (mapping_name, map_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Per distinct raw value results of transformations with no exact MySQL equivalent (title case, strict dates).
+CREATE TABLE IF NOT EXISTS clean_value_dictionary (
+    column_name VARCHAR(64) NOT NULL,
+    raw_value VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_bin NOT NULL,
+    clean_value VARCHAR(255),
+    is_valid TINYINT(1) NOT NULL DEFAULT 1,
+    PRIMARY KEY (column_name, raw_value)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -26,5 +26,8 @@ CREATE TABLE IF NOT EXISTS consumer_complaints_cleaned (
     consumer_disputed_standardized VARCHAR(255), -- Standardized category
     company_public_response_standardized VARCHAR(255), -- Standardized category
     complaint_id INT PRIMARY KEY,    
-    content_hash VARCHAR(64)
+    content_hash VARCHAR(64),
+    content_hash_bin BINARY(32), -- Compact digest when content_hash is stored in binary mode
+    source_row_hash BIGINT UNSIGNED, -- row_hash of the raw row this record was cleaned from
+    output_hash BIGINT UNSIGNED -- First 64 bits of the SHA256 over every cleaned output column
 );
\ No newline at end of file
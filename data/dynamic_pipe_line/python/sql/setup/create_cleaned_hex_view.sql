@@ -0,0 +1,32 @@
+CREATE OR REPLACE VIEW consumer_complaints_cleaned_hex AS
+SELECT
+    date_received,
+    product,
+    product_standardized,
+    sub_product,
+    sub_product_standardized,
+    issue,
+    issue_standardized,
+    sub_issue,
+    sub_issue_standardized,
+    consumer_complaint_narrative,
+    company_public_response,
+    company,
+    state_code,
+    zip_code,
+    tags,
+    tags_standardized,
+    consumer_consent_provided,
+    consumer_consent_provided_standardized,
+    submitted_via,
+    date_sent_to_company,
+    company_response_to_consumer,
+    company_response_to_consumer_standardized,
+    timely_response,
+    consumer_disputed,
+    consumer_disputed_standardized,
+    company_public_response_standardized,
+    complaint_id,
+    COALESCE(content_hash, LOWER(HEX(content_hash_bin))) AS content_hash,
+    source_row_hash
+FROM consumer_complaints_cleaned;
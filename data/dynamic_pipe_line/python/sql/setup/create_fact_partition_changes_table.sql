@@ -0,0 +1,10 @@
+-- The year/month partitions of fact_complaints changed by the modeling step (pipeline_partitions.py).
+-- The export step rewrites the Parquet partitions whose changed_at is later than its last export.
+-- Fact rows without a received date are tracked as partition (0, 0).
+CREATE TABLE IF NOT EXISTS fact_partition_changes (
+    partition_year INT NOT NULL,
+    partition_month INT NOT NULL,
+    changed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (partition_year, partition_month),
+    INDEX idx_changed_at (changed_at)
+) ENGINE=InnoDB;
@@ -0,0 +1,10 @@
+-- Indexes that manage_indexes (pipeline_utils.py) has dropped for a bulk operation and not yet rebuilt.
+-- A row is written before its index is dropped and deleted once the index is back, so indexes left dropped
+-- by a crashed run are found and rebuilt by restore_dropped_indexes at the next startup.
+CREATE TABLE IF NOT EXISTS index_rebuild_journal (
+    table_name VARCHAR(64) NOT NULL,
+    index_name VARCHAR(64) NOT NULL,
+    index_definition VARCHAR(512) NOT NULL,
+    dropped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, index_name)
+) ENGINE=InnoDB;
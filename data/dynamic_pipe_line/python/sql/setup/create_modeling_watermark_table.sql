@@ -0,0 +1,22 @@
+-- Persisted modeling watermark: every complaint at or below last_modeled_id has been modeled (or quarantined),
+-- except the late arrivals in modeling_late_arrivals. Incremental modeling (--model-incremental) queues the
+-- cleaned complaints above it, with a seek on the (status, complaint_id) index of record_processing_status, plus
+-- the cleaned late arrivals (see pipeline_modeling_watermark.py).
+CREATE TABLE IF NOT EXISTS modeling_watermark (
+    watermark_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    last_modeled_id INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+-- Complaints at or below the watermark that ingestion re-queued or registered late, until they are modeled.
+CREATE TABLE IF NOT EXISTS modeling_late_arrivals (
+    complaint_id INT NOT NULL PRIMARY KEY,
+    recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+-- Seeds the late arrivals re-queued before the table existed; a no-op once they are recorded.
+INSERT IGNORE INTO modeling_late_arrivals (complaint_id)
+SELECT p.complaint_id
+FROM record_processing_status p
+JOIN modeling_watermark w ON w.watermark_name = 'fact_complaints'
+WHERE p.status IN (0, 1) AND p.complaint_id <= w.last_modeled_id;
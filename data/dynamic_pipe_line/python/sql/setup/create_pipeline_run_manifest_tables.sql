@@ -0,0 +1,22 @@
+-- Run manifests written by the process and modeling steps (pipeline_run_manifest.py).
+-- Each run with changes gets one manifest row and one row per contiguous range of changed received dates,
+-- from which dirty_partitions_since derives the partitions a BI refresh has to reload.
+CREATE TABLE IF NOT EXISTS pipeline_run_manifest (
+    run_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    pipeline_step VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    rows_written INT NOT NULL,
+    range_start DATE NULL,
+    range_end DATE NULL,
+    manifest JSON NOT NULL,
+    INDEX idx_manifest_step_run (pipeline_step, run_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS pipeline_run_date_ranges (
+    run_id BIGINT NOT NULL,
+    range_start DATE NOT NULL,
+    range_end DATE NOT NULL,
+    row_count INT NOT NULL,
+    PRIMARY KEY (run_id, range_start),
+    FOREIGN KEY (run_id) REFERENCES pipeline_run_manifest(run_id)
+) ENGINE=InnoDB;
@@ -17,6 +17,7 @@ CREATE TABLE IF NOT EXISTS consumer_complaints_raw (
     timely_response VARCHAR(10),
     consumer_disputed VARCHAR(10),
     complaint_id INT PRIMARY KEY,
+    row_hash BIGINT UNSIGNED,
     ingestion_date DATE,
     source_file_name VARCHAR(255),
     staging_run_id VARCHAR(255),
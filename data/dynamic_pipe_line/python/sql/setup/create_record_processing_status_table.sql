@@ -0,0 +1,18 @@
+-- Narrow, ID-keyed processing status of every raw complaint (see pipeline_processing_status.py).
+-- Replaces the per-row cleaned_timestamp/modeling_timestamp UPDATEs on the wide raw table: finding pending
+-- work is an index-only range scan on (status, complaint_id), and the per-status counts are kept in
+-- record_processing_status_counts so pending counts are a primary key lookup.
+-- status: 0 = pending cleaning, 1 = cleaned (pending modeling), 2 = modeled, 3 = quarantined while cleaning.
+CREATE TABLE IF NOT EXISTS record_processing_status (
+    complaint_id INT NOT NULL PRIMARY KEY,
+    status TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY idx_status_complaint_id (status, complaint_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS record_processing_status_counts (
+    status TINYINT UNSIGNED NOT NULL PRIMARY KEY,
+    record_count BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO record_processing_status_counts (status, record_count) VALUES (0, 0), (1, 0), (2, 0), (3, 0);